@@ -0,0 +1,92 @@
+"""Vergleicht die eingebaute .gitignore-Auswertung mit der git check-ignore-Engine.
+
+Beide Engines durchlaufen denselben Baum; gemessen wird die gesamte
+Traversierung inklusive Pruning. Ohne Pfadangabe wird ein synthetisches
+Repository erzeugt.
+
+    poetry run python benchmarks/bench_ignore_engines.py [PFAD] [--repeat N]
+"""
+import argparse
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from clipcode.file_utils import find_all_files
+from clipcode.git_check_ignore import start_check_ignore
+from clipcode.gitignore_utils import GitignoreScopes
+
+
+def _create_synthetic_repo(root: Path, packages: int, files_per_dir: int):
+    subprocess.run(["git", "init", "-q", str(root)], check=True)
+    (root / ".gitignore").write_text(
+        "*.log\n*.tmp\nbuild/\nnode_modules/\n__pycache__/\n/dist\n!keep.log\n", encoding="utf-8"
+    )
+    for p in range(packages):
+        pkg = root / "src" / f"pkg{p:03d}"
+        for sub in ("", "core", "util", "build", "__pycache__"):
+            directory = pkg / sub
+            directory.mkdir(parents=True, exist_ok=True)
+            for i in range(files_per_dir):
+                suffix = (".py", ".log", ".tmp", ".txt")[i % 4]
+                (directory / f"file{i:03d}{suffix}").write_text("x\n", encoding="utf-8")
+        (pkg / ".gitignore").write_text("*.txt\n!README.txt\n", encoding="utf-8")
+
+
+def _time(label: str, run, repeat: int) -> list[str]:
+    best = float("inf")
+    result: list[str] = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<10} {best * 1000:9.1f} ms  ({len(result)} Dateien)")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", nargs="?", help="Zu durchlaufender Baum (Standard: synthetisches Repository)")
+    parser.add_argument("--repeat", type=int, default=5, help="Wiederholungen, gemessen wird das Minimum")
+    parser.add_argument("--packages", type=int, default=200, help="Pakete im synthetischen Repository")
+    parser.add_argument("--files", type=int, default=20, help="Dateien pro Verzeichnis im synthetischen Repository")
+    args = parser.parse_args()
+
+    temp_dir = None
+    if args.path is None:
+        temp_dir = tempfile.mkdtemp(prefix="clipcode-bench-")
+        _create_synthetic_repo(Path(temp_dir), args.packages, args.files)
+        root = temp_dir
+    else:
+        root = args.path
+
+    try:
+        builtin = _time("builtin", lambda: find_all_files(root, GitignoreScopes(root)), args.repeat)
+
+        def run_git():
+            engine = start_check_ignore(root)
+            if engine is None:
+                print("git check-ignore nicht verfügbar", file=sys.stderr)
+                sys.exit(1)
+            try:
+                return find_all_files(root, engine)
+            finally:
+                engine.close()
+
+        git = _time("git", run_git, args.repeat)
+
+        if sorted(builtin) != sorted(git):
+            only_builtin = sorted(set(builtin) - set(git))
+            only_git = sorted(set(git) - set(builtin))
+            print(f"⚠️ Abweichende Ergebnisse: {len(only_builtin)} nur builtin, {len(only_git)} nur git")
+            for path in (only_builtin + only_git)[:10]:
+                print(f"  {path}")
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    main()
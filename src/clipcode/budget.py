@@ -0,0 +1,213 @@
+import fnmatch
+import math
+import os
+
+from clipcode.loader import LoadedFile
+
+TOKENS = "tokens"
+BYTES = "bytes"
+
+ORDER = "order"
+SMALLEST = "smallest"
+PRIORITIES = (ORDER, SMALLEST)
+
+# Bytes pro Token, wenn nur die Dateigröße bekannt ist (Quelltext, BPE-Tokenizer)
+_STAT_BYTES_PER_TOKEN = 3.5
+# Kleinere Restbudgets lohnen keine angeschnittene Datei mehr
+_MIN_PARTIAL_TOKENS = 64
+# Reserve je vollständig geplanter Datei als Anteil ihrer größenbasierten
+# Schätzung; Quelltext liegt beim Inhalt meist unter dem 1,5-Fachen (nur bei
+# Tokens, Bytes sind exakt)
+_ESTIMATE_SLACK = 0.5
+
+# Byte-Klassen für die Schätzung; Zählung per bytes.translate mit Löschtabelle
+_WORD_BYTES = b"_" + bytes(range(0x30, 0x3A)) + bytes(range(0x41, 0x5B)) + bytes(range(0x61, 0x7B))
+_SPACE_BYTES = b" \t\r\n\f\v"
+_NON_ASCII_BYTES = bytes(range(0x80, 0x100))
+
+
+def estimate_tokens(data: bytes) -> int:
+    """Schätzt die Tokenzahl eines Textes anhand seiner Byte-Klassen.
+
+    Faustwerte für gängige BPE-Tokenizer: Wortzeichen fassen sich zu etwa
+    vier Bytes pro Token zusammen, Satzzeichen ergeben fast je ein Token,
+    Leerraum wird größtenteils mit dem Folgetoken verschmolzen und
+    Mehrbyte-Zeichen kosten etwa ein Token je zwei Bytes.
+    """
+    total = len(data)
+    words = total - len(data.translate(None, _WORD_BYTES))
+    spaces = total - len(data.translate(None, _SPACE_BYTES))
+    non_ascii = total - len(data.translate(None, _NON_ASCII_BYTES))
+    punctuation = total - words - spaces - non_ascii
+    return math.ceil(words / 4 + punctuation / 1.3 + spaces / 6 + non_ascii / 2)
+
+
+class Budget:
+    """Verteilt ein festes Token- oder Byte-Budget auf die zu exportierenden Dateien.
+
+    plan() wählt vor dem Lesen anhand der stat-Größen aus, welche Dateien
+    vollständig, gekürzt oder gar nicht aufgenommen werden; die Reihenfolge
+    der Auswahl bestimmen priority und prefer. Zu große Dateien werden
+    zunächst übersprungen, ein verbleibender Rest kürzt die wichtigste davon. fit() prüft danach jede
+    geladene Datei gegen ihren Anteil und kürzt sie bei Bedarf an einer
+    Zeilengrenze. Nicht vergebenes Budget und nicht verbrauchte Anteile
+    gehen an die folgenden Dateien.
+
+    Die Schätzung aus der Dateigröße weicht von der aus dem Inhalt ab. plan()
+    hält daher für jede vollständig geplante Datei eine Reserve zurück, bevor
+    der Rest an die gekürzte Datei geht; fit() bedient daraus zu niedrig
+    geschätzte Dateien, statt sie zu kürzen. Was von der Reserve übrig bleibt,
+    geht nach der letzten vollständig geplanten Datei an die folgenden.
+    """
+
+    def __init__(
+        self,
+        limit: int,
+        unit: str = TOKENS,
+        priority: str = ORDER,
+        prefer: list[str] | None = None,
+    ):
+        self.limit = limit
+        self.unit = unit
+        self.priority = priority
+        self.prefer = prefer or []
+        self.dropped: list[str] = []
+        self.cut: list[str] = []
+        self._allowances: dict[str, int] = {}
+        # Pfad -> Kosten des Abschnittsrahmens, die plan() bereits abgezogen hat
+        self._frames: dict[str, int] = {}
+        # Vollständig geplante Dateien und die Reserve für ihre Schätzfehler
+        self._full: set[str] = set()
+        self._slack = 0
+        self._carry = 0
+
+    def cost(self, text: str) -> int:
+        data = text.encode("utf-8", "surrogateescape")
+        if self.unit == BYTES:
+            return len(data)
+        return estimate_tokens(data)
+
+    def cost_of_size(self, size: int) -> int:
+        if self.unit == BYTES:
+            return size
+        return math.ceil(size / _STAT_BYTES_PER_TOKEN)
+
+    def _min_partial(self) -> int:
+        if self.unit == BYTES:
+            return math.ceil(_MIN_PARTIAL_TOKENS * _STAT_BYTES_PER_TOKEN)
+        return _MIN_PARTIAL_TOKENS
+
+    def _preference(self, path: str) -> int:
+        """Index des ersten passenden prefer-Musters (Dateiname oder Pfadende), sonst ans Ende."""
+        name = os.path.basename(path)
+        posix_path = path.replace(os.sep, "/")
+        for index, pattern in enumerate(self.prefer):
+            if (
+                fnmatch.fnmatch(name, pattern)
+                or fnmatch.fnmatch(posix_path, pattern)
+                or fnmatch.fnmatch(posix_path, "*/" + pattern)
+            ):
+                return index
+        return len(self.prefer)
+
+    def plan(self, files: list[str], overheads: dict[str, str], reserved: int = 0) -> list[str]:
+        """Teilt das Budget auf und gibt die aufzunehmenden Dateien in Eingabereihenfolge zurück.
+
+        overheads enthält je Datei den Rahmentext ihres Abschnitts (Überschrift,
+        Codeblock), der unabhängig vom Inhalt Budget kostet; reserved wird
+        vorab abgezogen (z. B. für die Gesamtüberschrift).
+        """
+        sizes = []
+        for path in files:
+            try:
+                sizes.append(os.stat(path).st_size)
+            except OSError:
+                sizes.append(0)
+
+        def key(index: int):
+            rank = sizes[index] if self.priority == SMALLEST else index
+            return self._preference(files[index]), rank, index
+
+        remaining = self.limit - reserved
+        ordered = sorted(range(len(files)), key=key)
+        # Erst alle Dateien vollständig aufnehmen, die noch passen ...
+        skipped = []
+        slack = 0
+        for index in ordered:
+            path = files[index]
+            estimate = self.cost_of_size(sizes[index])
+            needed = self.cost(overheads[path]) + estimate
+            reserve = math.ceil(estimate * _ESTIMATE_SLACK) if self.unit == TOKENS else 0
+            if needed + reserve <= remaining:
+                self._allowances[path] = estimate
+                self._frames[path] = needed - estimate
+                self._full.add(path)
+                slack += reserve
+                remaining -= needed + reserve
+            else:
+                skipped.append(path)
+        # ... dann mit dem Rest die wichtigsten übrigen Dateien gekürzt
+        min_partial = self._min_partial()
+        for path in skipped:
+            frame = self.cost(overheads[path])
+            available = remaining - frame
+            if available >= min_partial:
+                self._allowances[path] = available
+                self._frames[path] = frame
+                remaining = 0
+            else:
+                self.dropped.append(path)
+        # Nicht vergebenes Budget fängt zu niedrige Schätzungen auf; die Reserve
+        # ist vollständig geplanten Dateien vorbehalten, solange noch eine folgt
+        self._carry = remaining
+        self._slack = slack
+        self._settle()
+
+        return [path for path in files if path in self._allowances]
+
+    def _settle(self) -> None:
+        """Gibt die Reserve frei, sobald keine vollständig geplante Datei mehr aussteht."""
+        if not self._full:
+            self._carry += self._slack
+            self._slack = 0
+
+    def release(self, path: str) -> None:
+        """Gibt den Anteil einer Datei, die doch nicht exportiert wird, an die folgenden Dateien weiter."""
+        self._carry += self._allowances.pop(path, 0) + self._frames.pop(path, 0)
+        self._full.discard(path)
+        self._settle()
+
+    def fit(self, path: str, loaded: LoadedFile, render) -> LoadedFile:
+        """Kürzt eine geladene Datei auf ihren Anteil plus den Rest vorheriger Dateien.
+
+        render liefert den Codeblock-Inhalt einer LoadedFile; gekürzt wird nur
+        der Kopfbereich, ein Endbereich entfällt dabei.
+        """
+        allowance = self._allowances.get(path, 0) + self._carry
+        text = render(loaded)
+        used = self.cost(text)
+        if used > allowance and path in self._full:
+            # Schätzfehler vollständig geplanter Dateien trägt die Reserve
+            extra = min(used - allowance, self._slack)
+            self._slack -= extra
+            allowance += extra
+        self._full.discard(path)
+        if used <= allowance:
+            self._carry = allowance - used
+            self._settle()
+            return loaded
+
+        self._carry = 0
+        self._settle()
+        # Anteilig schneiden und auf die letzte vollständige Zeile zurückgehen;
+        # passt der Kopfbereich allein, entfällt nur der Endbereich
+        head = loaded.content
+        limit = len(text) * allowance // used
+        if limit >= len(head):
+            kept = loaded.head_lines
+        else:
+            end = head.rfind("\n", 0, limit)
+            head = head[:end] if end > 0 else ""
+            kept = head.count("\n") + 1 if head else 0
+        self.cut.append(path)
+        return LoadedFile(head, loaded.line_count, kept)
@@ -0,0 +1,281 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+from clipcode import loader
+from clipcode.file_utils import RACY_NS, DirCache
+from clipcode.loader import LoadedFile
+
+# Bei Änderungen am Tabellenaufbau oder an der Bedeutung der Einträge erhöhen
+_SCHEMA_VERSION = 4
+# Obergrenze für den Inhalt aller Einträge, darüber werden die am längsten
+# nicht genutzten Einträge verdrängt
+DEFAULT_MAX_BYTES = 256 << 20
+
+_TEXT = "text"
+_SKIP = "skip"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    dev INTEGER NOT NULL,
+    ino INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    options TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    line_count INTEGER NOT NULL,
+    kept_lines INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    tail TEXT NOT NULL,
+    tail_lines INTEGER NOT NULL,
+    digest BLOB,
+    bytes INTEGER NOT NULL,
+    last_used INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_last_used ON files (last_used);
+CREATE TABLE IF NOT EXISTS trees (
+    root TEXT PRIMARY KEY,
+    key TEXT NOT NULL,
+    entries TEXT NOT NULL,
+    last_used INTEGER NOT NULL
+);
+"""
+
+
+def default_cache_path() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "clipcode", "metadata.sqlite3")
+
+
+class MetadataCache:
+    """Persistenter Cache der Ladeergebnisse je Datei in SQLite (WAL).
+
+    Ein Eintrag gilt, solange (Gerät, Inode, Größe, mtime_ns) der Datei und
+    die Kürzungsoptionen übereinstimmen; dann genügt ein stat, die Datei wird
+    nicht geöffnet. Gespeichert werden das Urteil (Text oder nicht
+    exportierbar), die Zeilenzahl, der geladene Inhalt und der Inhalts-Hash
+    für die Duplikaterkennung. Zusätzlich hält
+    er je Wurzelverzeichnis die gefilterten Verzeichnislisten des letzten
+    Laufs (DirCache), sodass die Traversierung unveränderte Verzeichnisse
+    nicht neu listet.
+
+    Lesezugriffe laufen sofort, neue Einträge und Zugriffszeiten werden
+    gesammelt und beim Schließen in einer einzigen Transaktion geschrieben;
+    danach werden die am längsten ungenutzten Einträge verdrängt, bis der
+    Inhalt unter max_bytes liegt. WAL und busy_timeout erlauben mehrere
+    gleichzeitige clipcode-Prozesse. Jeder SQLite-Fehler schaltet den Cache
+    für den Rest des Laufs ab, der Export selbst läuft weiter.
+    """
+
+    def __init__(self, path: str | None = None, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._pending: list[tuple] = []
+        self._touched: list[str] = []
+        self._pending_trees: list[tuple] = []
+        self._now = time.time_ns()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db: sqlite3.Connection | None = sqlite3.connect(
+            self.path, timeout=10, check_same_thread=False, isolation_level=None
+        )
+        try:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            if self._db.execute("PRAGMA user_version").fetchone()[0] != _SCHEMA_VERSION:
+                self._db.executescript(
+                    "BEGIN IMMEDIATE;\nDROP TABLE IF EXISTS files;\n"
+                    + _SCHEMA
+                    + f"PRAGMA user_version = {_SCHEMA_VERSION};\nCOMMIT;"
+                )
+        except sqlite3.Error:
+            self._db.close()
+            raise
+
+    @classmethod
+    def open_default(cls) -> "MetadataCache | None":
+        """Öffnet den Cache unter $XDG_CACHE_HOME/clipcode oder gibt None zurück, wenn das nicht geht."""
+        try:
+            return cls()
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️ Cache nicht nutzbar ({e}), exportiere ohne Cache.", file=sys.stderr)
+            return None
+
+    def _disable(self, error: sqlite3.Error) -> None:
+        print(f"⚠️ Cache nicht nutzbar ({error}), exportiere ohne Cache.", file=sys.stderr)
+        self._db.close()
+        self._db = None
+
+    def dir_cache(self, root_path: str, key: str) -> DirCache:
+        """DirCache des letzten Laufs für root_path; leer, wenn sich der Filter geändert hat."""
+        row = None
+        with self._lock:
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT key, entries FROM trees WHERE root = ?", (os.path.abspath(root_path),)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._disable(e)
+        if row is None or row[0] != key:
+            return DirCache(key)
+        return DirCache(key, {rel_dir: tuple(entry) for rel_dir, entry in json.loads(row[1]).items()})
+
+    def store_dir_cache(self, root_path: str, dir_cache: DirCache) -> None:
+        """Merkt die Verzeichnislisten dieses Laufs zum Schreiben beim Schließen vor."""
+        if dir_cache.changed:
+            with self._lock:
+                self._pending_trees.append(
+                    (os.path.abspath(root_path), dir_cache.key, json.dumps(dir_cache.visited), self._now)
+                )
+
+    def load(
+        self, path: str, truncate_from: int, truncate_to: int, truncate_tail: int, hash_content: bool = False
+    ) -> LoadedFile | None:
+        """Wie loader.load_file, aber bei unveränderter Datei aus dem Cache.
+
+        Fehlt einem Eintrag der angeforderte Inhalts-Hash, wird die Datei neu geladen.
+        """
+        options = f"{truncate_from}:{truncate_to}+{truncate_tail}"
+        key = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            row = None
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        "SELECT dev, ino, size, mtime_ns, options, kind, line_count, kept_lines,"
+                        " content, tail, tail_lines, digest FROM files WHERE path = ?",
+                        (key,),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    self._disable(e)
+            if (
+                row is not None
+                and tuple(row[:5]) == (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, options)
+                and not (hash_content and row[5] == _TEXT and row[11] is None)
+            ):
+                self.hits += 1
+                self._touched.append(key)
+                if row[5] == _SKIP:
+                    return None
+                return LoadedFile(row[8], row[6], row[7], row[9], row[10], row[11])
+            self.misses += 1
+
+        loaded = loader.load_file(
+            path, truncate_from, truncate_to, truncate_tail=truncate_tail, hash_content=hash_content
+        )
+        if self._now - st.st_mtime_ns > RACY_NS:
+            if loaded is None:
+                entry = (_SKIP, 0, 0, "", "", 0, None)
+            else:
+                entry = (
+                    _TEXT, loaded.line_count, loaded.kept_lines, loaded.content, loaded.tail, loaded.tail_lines,
+                    loaded.digest,
+                )
+            size = len(key) + len(entry[3]) + len(entry[4])
+            with self._lock:
+                self._pending.append(
+                    (key, st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, options, *entry, size, self._now)
+                )
+        return loaded
+
+    def close(self) -> None:
+        """Schreibt gesammelte Einträge, aktualisiert Zugriffszeiten und verdrängt alte Einträge."""
+        with self._lock:
+            if self._db is None:
+                return
+            try:
+                self._db.execute("BEGIN IMMEDIATE")
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending,
+                )
+                self._db.executemany("INSERT OR REPLACE INTO trees VALUES (?, ?, ?, ?)", self._pending_trees)
+                self._db.executemany(
+                    "UPDATE files SET last_used = ? WHERE path = ?",
+                    ((self._now, key) for key in self._touched),
+                )
+                # LRU: alles jenseits der Größengrenze, gezählt ab dem zuletzt genutzten Eintrag
+                self._db.execute(
+                    "DELETE FROM files WHERE rowid IN ("
+                    " SELECT rowid FROM (SELECT rowid, SUM(bytes) OVER"
+                    " (ORDER BY last_used DESC, rowid DESC) AS running FROM files)"
+                    " WHERE running > ?)",
+                    (self.max_bytes,),
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error as e:
+                self._disable(e)
+                return
+            self._db.close()
+            self._db = None
+
+
+class MemoryCache:
+    """Wie MetadataCache, aber nur im Speicher eines langlebigen Prozesses (clipcode serve).
+
+    Einträge gelten unter denselben Bedingungen; über max_bytes Inhalt wird
+    der am längsten nicht genutzte Eintrag verdrängt.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Pfad -> (Schlüssel, LoadedFile | None, Größe); älteste Nutzung zuerst
+        self._entries: OrderedDict[str, tuple[tuple, LoadedFile | None, int]] = OrderedDict()
+        self._bytes = 0
+
+    def load(
+        self, path: str, truncate_from: int, truncate_to: int, truncate_tail: int, hash_content: bool = False
+    ) -> LoadedFile | None:
+        key = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        identity = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns, truncate_from, truncate_to, truncate_tail)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if (
+                entry is not None
+                and entry[0] == identity
+                and not (hash_content and entry[1] is not None and entry[1].digest is None)
+            ):
+                self.hits += 1
+                self._entries.move_to_end(key)
+                return entry[1]
+            self.misses += 1
+
+        loaded = loader.load_file(
+            path, truncate_from, truncate_to, truncate_tail=truncate_tail, hash_content=hash_content
+        )
+        if time.time_ns() - st.st_mtime_ns > RACY_NS:
+            size = len(key) + (len(loaded.content) + len(loaded.tail) if loaded is not None else 0)
+            with self._lock:
+                old = self._entries.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[2]
+                self._entries[key] = (identity, loaded, size)
+                self._bytes += size
+                while self._bytes > self.max_bytes:
+                    _, (_, _, evicted) = self._entries.popitem(last=False)
+                    self._bytes -= evicted
+        return loaded
+
+    def close(self) -> None:
+        """Nichts zu schreiben; der Inhalt bleibt für den nächsten Export erhalten."""
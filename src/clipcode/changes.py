@@ -0,0 +1,213 @@
+import difflib
+import hashlib
+import json
+import os
+import subprocess
+import tempfile
+import zlib
+from typing import NamedTuple
+
+from clipcode.file_utils import decode_content, normalize_extensions
+
+
+class ChangesError(Exception):
+    """git ist nicht verfügbar, der Pfad liegt in keinem Repository oder die Referenz ist unbekannt."""
+
+
+class ChangeSet(NamedTuple):
+    # Vorhandene, geänderte oder neue Dateien
+    changed: list[str]
+    deleted: list[str]
+    # Pfad -> Unified Diff für geänderte Dateien, zu denen der alte Stand bekannt ist
+    diffs: dict[str, str]
+
+
+def _git(root_path: str, *args: str) -> bytes:
+    try:
+        result = subprocess.run(["git", "-C", root_path, *args], capture_output=True)
+    except OSError as e:
+        raise ChangesError(f"git nicht startbar: {e}") from e
+    if result.returncode != 0:
+        message = result.stderr.decode(errors="replace").strip()
+        raise ChangesError(message or f"git {args[0]} fehlgeschlagen (Exit-Code {result.returncode})")
+    return result.stdout
+
+
+def _split_diff(patch: str, paths: list[str]) -> dict[str, str]:
+    """Ordnet die Dateiabschnitte eines git-Diffs ihren Pfaden zu.
+
+    Abschnitte mit quotierten Pfaden (Sonderzeichen) werden nicht erkannt;
+    diese Dateien erscheinen dann mit vollem Inhalt.
+    """
+    headers = {f"diff --git a/{path} b/{path}": path for path in paths}
+    diffs: dict[str, str] = {}
+    for chunk in patch.split("\ndiff --git "):
+        if not chunk.startswith("diff --git "):
+            chunk = "diff --git " + chunk
+        header, _, body = chunk.partition("\n")
+        path = headers.get(header)
+        if path is not None:
+            diffs[path] = body.rstrip("\n")
+    return diffs
+
+
+def changed_since_ref(root_path: str, ref: str, diff: bool = False, respect_gitignore: bool = True) -> ChangeSet:
+    """Ermittelt per git die Dateien unterhalb von root_path, die sich seit ref geändert haben.
+
+    Verglichen wird der Arbeitsbaum (inkl. nicht committeter Änderungen) mit
+    ref; neue, unversionierte Dateien zählen als geändert. Pfade sind relativ
+    zu root_path (POSIX). Das Dateisystem wird dafür nicht durchlaufen.
+
+    Raises:
+        ChangesError: Wenn git fehlt, root_path in keinem Repository liegt
+            oder ref unbekannt ist.
+    """
+    fields = _git(root_path, "diff", "--name-status", "-z", "--relative", "--no-renames", ref, "--").split(b"\0")
+    changed, deleted = [], []
+    for status, path in zip(fields[0::2], fields[1::2]):
+        (deleted if status == b"D" else changed).append(os.fsdecode(path))
+    modified = list(changed)
+
+    others = ["ls-files", "--others", "-z"] + (["--exclude-standard"] if respect_gitignore else [])
+    changed.extend(os.fsdecode(path) for path in _git(root_path, *others).split(b"\0") if path)
+    changed.sort()
+
+    diffs = {}
+    if diff and modified:
+        patch = _git(root_path, "diff", "--relative", "--no-renames", "--no-color", "--no-ext-diff", ref, "--", *modified)
+        diffs = _split_diff(decode_content(patch), modified)
+    return ChangeSet(changed, deleted, diffs)
+
+
+def _content_digest(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.file_digest(f, hashlib.blake2b).hexdigest()
+    except OSError:
+        return None
+
+
+def default_state_dir() -> str:
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "clipcode")
+
+
+class ExportState:
+    """Stand der zuletzt exportierten Dateien eines Wurzelverzeichnisses.
+
+    Pro Datei werden Größe, mtime_ns und Inhalts-Hash in einer JSON-Datei
+    unter $XDG_STATE_HOME/clipcode/<Hash>/ gehalten; der Hash umfasst neben
+    der Wurzel auch Endungen, Ignore-Patterns und den .gitignore-Respekt,
+    sodass Läufe mit anderen Filtern einen eigenen Stand haben. Dateien mit
+    unveränderter Größe und mtime gelten ohne Lesen als unverändert; bei
+    abweichender mtime entscheidet der Hash. Mit diff werden zusätzlich die
+    exportierten Inhalte komprimiert abgelegt, damit der nächste Lauf Diffs
+    erzeugen kann.
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        state_dir: str | None = None,
+        extensions: list[str] | None = None,
+        ignore_patterns: list[str] | None = None,
+        respect_gitignore: bool = True,
+    ):
+        key = json.dumps([
+            os.path.abspath(root_path),
+            sorted(normalize_extensions(extensions)) if extensions is not None else None,
+            ignore_patterns or [],
+            respect_gitignore,
+        ])
+        state_hash = hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+        self.root = os.path.abspath(root_path)
+        self.dir = os.path.join(state_dir or default_state_dir(), state_hash)
+        self.path = os.path.join(self.dir, "state.json")
+        self.files: dict[str, list] = {}
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self.files = json.load(f)["files"]
+        except (OSError, ValueError, KeyError):
+            pass
+        self._next: dict[str, list] = {}
+        self._blobs: dict[str, bytes] = {}
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.dir, digest)
+
+    def changes(self, files: list[str], diff: bool = False) -> ChangeSet:
+        """Vergleicht files mit dem letzten Stand; Pfade bleiben in der übergebenen Form."""
+        changed, diffs = [], {}
+        seen = set()
+        for path in files:
+            key = os.path.abspath(path)
+            seen.add(key)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            old = self.files.get(key)
+            if old is not None and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+                self._next[key] = old
+                continue
+            digest = _content_digest(path)
+            self._next[key] = [st.st_size, st.st_mtime_ns, digest]
+            if old is not None and digest is not None and digest == old[2]:
+                continue
+            changed.append(path)
+            if diff and digest is not None:
+                old_digest = old[2] if old is not None else None
+                patch = self._diff(path, old_digest, digest)
+                if patch is not None:
+                    diffs[path] = patch
+
+        # Nicht mehr gelistete, aber vorhandene Dateien (z. B. neu ignoriert) gelten nicht als gelöscht
+        deleted = sorted(key for key in self.files if key not in seen and not os.path.exists(key))
+        return ChangeSet(changed, deleted, diffs)
+
+    def _diff(self, path: str, old_digest: str | None, digest: str) -> str | None:
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if b"\0" in data:
+            return None
+        self._blobs[digest] = data
+        if old_digest is None:
+            return None
+        try:
+            with open(self._blob_path(old_digest), "rb") as f:
+                old_data = zlib.decompress(f.read())
+        except (OSError, zlib.error):
+            return None
+        # Kopfzeilen wie bei git (und --changed-since) relativ zur Wurzel
+        rel_path = os.path.relpath(os.path.abspath(path), self.root).replace(os.sep, "/")
+        lines = difflib.unified_diff(
+            decode_content(old_data).splitlines(keepends=True),
+            decode_content(data).splitlines(keepends=True),
+            fromfile=f"a/{rel_path}",
+            tofile=f"b/{rel_path}",
+        )
+        return "".join(lines).rstrip("\n")
+
+    def save(self) -> None:
+        """Schreibt den neuen Stand atomar; nicht mehr referenzierte Inhalte werden entfernt."""
+        os.makedirs(self.dir, exist_ok=True)
+        referenced = {entry[2] for entry in self._next.values()}
+        for digest, data in self._blobs.items():
+            blob_path = self._blob_path(digest)
+            if not os.path.exists(blob_path):
+                with open(blob_path, "wb") as f:
+                    f.write(zlib.compress(data))
+        fd, tmp_path = tempfile.mkstemp(dir=self.dir, prefix=".state.")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"files": self._next}, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        for name in os.listdir(self.dir):
+            if name != "state.json" and not name.startswith(".") and name not in referenced:
+                os.unlink(os.path.join(self.dir, name))
@@ -0,0 +1,106 @@
+import os
+from typing import NamedTuple
+
+TEXT = "text"
+BINARY = "binary"
+SKIP = "skip"
+
+# Bytes, die in Textdateien erwartet werden (ASCII-Druckzeichen und übliche Steuerzeichen)
+_TEXT_BYTES = b"\t\n\r\f\b" + bytes(range(0x20, 0x7F))
+
+# Bekannte Binärformate anhand ihrer Magic Numbers
+DEFAULT_MAGIC_NUMBERS: tuple[tuple[bytes, str], ...] = (
+    (b"\x89PNG\r\n\x1a\n", "png"),
+    (b"\xff\xd8\xff", "jpeg"),
+    (b"GIF87a", "gif"),
+    (b"GIF89a", "gif"),
+    (b"\x7fELF", "elf"),
+    (b"PK\x03\x04", "zip"),
+    (b"PK\x05\x06", "zip"),
+    (b"%PDF-", "pdf"),
+    (b"\x1f\x8b", "gzip"),
+    (b"SQLite format 3\x00", "sqlite"),
+)
+
+# Byte Order Marks; UTF-32-LE vor UTF-16-LE prüfen, da es mit dessen BOM beginnt
+_BOMS: tuple[tuple[bytes, str], ...] = (
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe\x00\x00", "utf-32-le"),
+    (b"\x00\x00\xfe\xff", "utf-32-be"),
+    (b"\xff\xfe", "utf-16-le"),
+    (b"\xfe\xff", "utf-16-be"),
+)
+
+# Regeln nach Dateiendung, die vor jedem Lesen greifen.
+# SVG ist zwar Text, aber für Clipboard-Exporte meist groß und wenig aussagekräftig.
+DEFAULT_SUFFIX_RULES: dict[str, str] = {
+    ".svg": SKIP,
+}
+
+
+class Classification(NamedTuple):
+    """Ergebnis einer Klassifizierung; encoding ist nur bei erkanntem BOM gesetzt."""
+
+    kind: str
+    encoding: str | None = None
+    reason: str = ""
+
+
+class ContentClassifier:
+    """Wiederverwendbarer Klassifizierer für Dateiinhalte.
+
+    Alle Tabellen werden einmalig beim Erzeugen aufgebaut. Die Zählung
+    untypischer Bytes läuft über bytes.translate mit Löschtabelle, also
+    vollständig in C.
+    """
+
+    def __init__(
+        self,
+        suffix_rules: dict[str, str] | None = None,
+        magic_numbers: tuple[tuple[bytes, str], ...] = DEFAULT_MAGIC_NUMBERS,
+        sniff_size: int = 4096,
+        max_non_text_ratio: float = 0.30,
+    ):
+        self.suffix_rules = dict(DEFAULT_SUFFIX_RULES if suffix_rules is None else suffix_rules)
+        self.magic_numbers = magic_numbers
+        self.sniff_size = sniff_size
+        self.max_non_text_ratio = max_non_text_ratio
+
+    def classify_name(self, path: str) -> Classification | None:
+        """Entscheidet allein anhand der Endung, falls eine Regel greift."""
+        kind = self.suffix_rules.get(os.path.splitext(path)[1].lower())
+        if kind is None:
+            return None
+        return Classification(kind, reason="suffix")
+
+    def classify(self, data: bytes, path: str | None = None) -> Classification:
+        """Klassifiziert einen Puffer; ausgewertet werden nur die ersten sniff_size Bytes."""
+        if path is not None:
+            by_name = self.classify_name(path)
+            if by_name is not None:
+                return by_name
+
+        chunk = data[:self.sniff_size]
+        if not chunk:
+            return Classification(TEXT)
+
+        for bom, encoding in _BOMS:
+            if chunk.startswith(bom):
+                return Classification(TEXT, encoding, "bom")
+
+        for magic, name in self.magic_numbers:
+            if chunk.startswith(magic):
+                return Classification(BINARY, reason=name)
+
+        # Fast binary indicator
+        if b"\x00" in chunk:
+            return Classification(BINARY, reason="nul")
+
+        # Heuristic: count non-text bytes
+        non_text = len(chunk.translate(None, _TEXT_BYTES))
+        if non_text / len(chunk) > self.max_non_text_ratio:
+            return Classification(BINARY, reason="heuristic")
+        return Classification(TEXT)
+
+
+DEFAULT_CLASSIFIER = ContentClassifier()
@@ -1,27 +1,105 @@
 import argparse
-from clipcode.exporter import export_files_to_clipboard
+import sys
 
+# Exporter, Watch-Modus und Daemon werden erst beim Aufruf importiert, damit
+# --help, Fehler in den Argumenten und Aufrufe über den Daemon den Exporter
+# (und damit git-, Cache- und Thread-Module) nicht laden
 
-def _parse_truncate_lines(value: str, parser: argparse.ArgumentParser) -> tuple[int, int]:
+# Auswahlwerte der Optionen; müssen exporter.CLIPBOARD_BACKENDS,
+# budget.PRIORITIES und compact.LEVELS entsprechen (siehe test_cli)
+_CLIPBOARD_BACKENDS = ("auto", "wl-copy", "xclip", "xsel", "osc52")
+_PRIORITIES = ("order", "smallest")
+_COMPACT_LEVELS = (0, 1, 2, 3)
+
+# Optionen, die nur bei expliziter Angabe an den Exporter weitergereicht werden;
+# ansonsten gelten dessen Standardwerte.
+_EXPORT_OPTIONS = (
+    "from_index",
+    "include_untracked",
+    "ignore_engine",
+    "walk_threads",
+    "jobs",
+    "output",
+    "to_stdout",
+    "clipboard",
+    "max_tokens",
+    "max_bytes",
+    "priority",
+    "prefer",
+    "dedup",
+    "compact",
+    "split_bytes",
+    "split_tokens",
+    "cache",
+    "changed_since",
+    "changed_since_last",
+    "diff",
+)
+# Optionen, die auch im Beobachtungsmodus gelten
+_WATCH_OPTIONS = {"jobs", "output", "to_stdout", "clipboard", "truncate_tail"}
+
+
+def _parse_truncate_lines(value: str, parser: argparse.ArgumentParser) -> tuple[int, int, int]:
     parts = value.split(":")
     if len(parts) != 2:
-        parser.error("--truncate-lines muss das Format KÜRZENAB:KÜRZENAUF haben (z. B. 3000:500).")
+        parser.error("--truncate-lines muss das Format KÜRZENAB:KÜRZENAUF[+ENDE] haben (z. B. 3000:500).")
 
+    head, plus, tail = parts[1].partition("+")
     try:
         truncate_from = int(parts[0])
-        truncate_to = int(parts[1])
+        truncate_to = int(head)
+        truncate_tail = int(tail) if plus else 0
     except ValueError:
-        parser.error("--truncate-lines erwartet ganze Zahlen im Format KÜRZENAB:KÜRZENAUF.")
+        parser.error("--truncate-lines erwartet ganze Zahlen im Format KÜRZENAB:KÜRZENAUF[+ENDE].")
 
-    if truncate_from < 0 or truncate_to < 0:
+    if truncate_from < 0 or truncate_to < 0 or truncate_tail < 0:
         parser.error("--truncate-lines erlaubt keine negativen Werte.")
 
-    if truncate_to > truncate_from:
-        parser.error("Bei --truncate-lines muss KÜRZENAUF kleiner oder gleich KÜRZENAB sein.")
+    if truncate_to + truncate_tail > truncate_from:
+        parser.error("Bei --truncate-lines muss KÜRZENAUF (+ ENDE) kleiner oder gleich KÜRZENAB sein.")
 
-    return truncate_from, truncate_to
+    return truncate_from, truncate_to, truncate_tail
+
+def _positive_int(value: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"ganze Zahl erwartet, nicht '{value}'")
+    if number < 1:
+        raise argparse.ArgumentTypeError("muss mindestens 1 sein")
+    return number
+
+def _serve(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(
+        prog="clipcode serve",
+        description=(
+            "Hält Ignore-Regeln, Verzeichnislisten und geladene Dateien im Speicher und führt "
+            "clipcode-Aufrufe über einen Unix-Socket aus."
+        ),
+    )
+    parser.add_argument(
+        "--socket",
+        metavar="PFAD",
+        help="Socket-Datei (Standard: $CLIPCODE_SOCKET bzw. $XDG_RUNTIME_DIR/clipcode.sock).",
+    )
+    args = parser.parse_args(argv)
+    from clipcode.daemon import serve
+    return serve(_run, args.socket)
 
 def main():
+    argv = sys.argv[1:]
+    if argv[:1] == ["serve"]:
+        sys.exit(_serve(argv[1:]))
+
+    # Läuft ein Daemon, übernimmt er den Aufruf; sonst wird hier exportiert
+    from clipcode.daemon import forward
+    code = forward(argv)
+    if code is None:
+        _run(argv)
+    elif code:
+        sys.exit(code)
+
+def _run(argv: list[str]):
     parser = argparse.ArgumentParser(
         description="Exportiert rekursiv alle Dateien mit bestimmten Endungen als Markdown-Codeblöcke in die Zwischenablage."
     )
@@ -58,23 +136,236 @@ def main():
     parser.add_argument(
         "--truncate-lines",
         default="3000:500",
-        metavar="KÜRZENAB:KÜRZENAUF",
+        metavar="KÜRZENAB:KÜRZENAUF[+ENDE]",
         help=(
             "Große Dateien ab KÜRZENAB Zeilen kürzen oder ignorieren. "
-            "Beispiel: 3000:500 (Standard), 3000:0 = ignorieren."
+            "Beispiel: 3000:500 (Standard), 3000:300+200 = erste 300 und letzte 200 Zeilen, "
+            "3000:0 = ignorieren."
+        ),
+    )
+
+    parser.add_argument(
+        "--ignore-engine",
+        choices=["builtin", "git"],
+        default=argparse.SUPPRESS,
+        help=(
+            "Auswertung der Ignore-Regeln: 'builtin' (Standard, reines Python) oder 'git' "
+            "(ein git check-ignore-Prozess pro Export, inkl. .git/info/exclude und core.excludesFile)."
+        ),
+    )
+
+    parser.add_argument(
+        "--walk-threads",
+        type=_positive_int,
+        default=argparse.SUPPRESS,
+        metavar="N",
+        help="Verzeichnisse mit N Threads durchsuchen (für NFS/sshfs); Reihenfolge wie mit einem Thread. Standard: 1.",
+    )
+
+    parser.add_argument(
+        "-j", "--jobs",
+        type=_positive_int,
+        default=argparse.SUPPRESS,
+        metavar="N",
+        help="Dateien mit N Threads parallel lesen; die Ausgabe bleibt in Dateireihenfolge. Standard: 1.",
+    )
+
+    parser.add_argument(
+        "--no-dedup",
+        dest="dedup",
+        action="store_false",
+        default=argparse.SUPPRESS,
+        help="Identische Dateien (Hardlinks, gleicher Inhalt) nicht zusammenfassen.",
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help=(
+            "Ladeergebnisse je Datei in $XDG_CACHE_HOME/clipcode zwischenspeichern; "
+            "unveränderte Dateien werden beim nächsten Lauf nicht mehr gelesen."
+        ),
+    )
+
+    parser.add_argument(
+        "--compact",
+        type=int,
+        choices=_COMPACT_LEVELS,
+        default=argparse.SUPPRESS,
+        metavar="STUFE",
+        help=(
+            "Inhalte verkleinern: 1 = Leerraum am Zeilenende und Leerzeilenfolgen, "
+            "2 = zusätzlich wiederholte Lizenzköpfe, 3 = zusätzlich Python-Kommentare und -Docstrings. "
+            "Standard: 0 (aus)."
         ),
     )
 
-    args = parser.parse_args()
+    # Größenbudget für den gesamten Export
+    budget_group = parser.add_mutually_exclusive_group()
+    budget_group.add_argument(
+        "--max-tokens",
+        type=_positive_int,
+        default=argparse.SUPPRESS,
+        metavar="N",
+        help="Export auf geschätzt N Tokens begrenzen; Dateien werden vollständig, gekürzt oder gar nicht aufgenommen.",
+    )
+    budget_group.add_argument(
+        "--max-bytes",
+        type=_positive_int,
+        default=argparse.SUPPRESS,
+        metavar="N",
+        help="Wie --max-tokens, aber mit N Bytes als Grenze.",
+    )
+    parser.add_argument(
+        "--priority",
+        choices=_PRIORITIES,
+        default=argparse.SUPPRESS,
+        help="Reihenfolge, in der das Budget vergeben wird: 'order' (Dateireihenfolge, Standard) oder 'smallest'.",
+    )
+    parser.add_argument(
+        "--prefer",
+        action="append",
+        default=argparse.SUPPRESS,
+        metavar="PATTERN",
+        help="Dateien, die auf PATTERN passen, zuerst ins Budget aufnehmen (mehrfach verwendbar oder als Kommaliste).",
+    )
+
+    # Aufteilung in nummerierte Teile
+    split_group = parser.add_mutually_exclusive_group()
+    split_group.add_argument(
+        "--split-bytes",
+        type=_positive_int,
+        default=argparse.SUPPRESS,
+        metavar="N",
+        help=(
+            "Export in Teile von höchstens N Bytes aufteilen: mit -o als DATEI.001.md, DATEI.002.md, … "
+            "oder nacheinander in die Zwischenablage (weiter mit Enter)."
+        ),
+    )
+    split_group.add_argument(
+        "--split-tokens",
+        type=_positive_int,
+        default=argparse.SUPPRESS,
+        metavar="N",
+        help="Wie --split-bytes, aber mit geschätzt N Tokens pro Teil.",
+    )
+
+    # Ausgabeziel (Standard: Zwischenablage)
+    output_group = parser.add_mutually_exclusive_group()
+    output_group.add_argument(
+        "-o", "--output",
+        default=argparse.SUPPRESS,
+        metavar="DATEI",
+        help="Export in DATEI schreiben statt in die Zwischenablage.",
+    )
+    output_group.add_argument(
+        "--stdout",
+        dest="to_stdout",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Export auf die Standardausgabe schreiben (Statusmeldungen gehen nach stderr).",
+    )
+    output_group.add_argument(
+        "--clipboard",
+        choices=_CLIPBOARD_BACKENDS,
+        default=argparse.SUPPRESS,
+        help=(
+            "Clipboard-Backend: 'auto' (Standard: wl-copy unter Wayland, sonst xclip/xsel unter X11), "
+            "'wl-copy', 'xclip', 'xsel' oder 'osc52' (Escape-Sequenz ans Terminal, z. B. über SSH)."
+        ),
+    )
+
+    # Quelle der Dateiliste
+    parser.add_argument(
+        "--from-index",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Versionierte Dateien direkt aus .git/index lesen, statt das Dateisystem zu durchsuchen."
+    )
+    parser.add_argument(
+        "--include-untracked",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Mit --from-index zusätzlich unversionierte, nicht ignorierte Dateien aufnehmen."
+    )
+    changes_group = parser.add_mutually_exclusive_group()
+    changes_group.add_argument(
+        "--changed-since",
+        metavar="REF",
+        default=argparse.SUPPRESS,
+        help="Nur Dateien exportieren, die sich seit dem git-Commit REF geändert haben (inkl. neuer Dateien).",
+    )
+    changes_group.add_argument(
+        "--changed-since-last",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Nur Dateien exportieren, die sich seit dem letzten Lauf mit dieser Option geändert haben.",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        default=argparse.SUPPRESS,
+        help="Mit --changed-since/--changed-since-last geänderte Dateien als Unified Diff ausgeben.",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Weiterlaufen und nach jeder Änderung (per inotify) erneut exportieren.",
+    )
+    parser.add_argument(
+        "--debounce",
+        type=_positive_int,
+        metavar="MS",
+        help="Mit --watch: so viele Millisekunden Ruhe abwarten, bevor neu exportiert wird (Standard: 300).",
+    )
+
+    args = parser.parse_args(argv)
     extensions = args.extensions if args.extensions else None
     respect_gitignore = not args.no_respect_gitignore
-    truncate_from, truncate_to = _parse_truncate_lines(args.truncate_lines, parser)
+    truncate_from, truncate_to, truncate_tail = _parse_truncate_lines(args.truncate_lines, parser)
+    options = {name: getattr(args, name) for name in _EXPORT_OPTIONS if hasattr(args, name)}
+    if truncate_tail:
+        options["truncate_tail"] = truncate_tail
+
+    if "prefer" in options:
+        options["prefer"] = [p.strip() for item in options["prefer"] for p in item.split(",") if p.strip()]
+
+    if options.get("include_untracked") and not options.get("from_index"):
+        parser.error("--include-untracked ist nur zusammen mit --from-index möglich.")
+
+    if options.get("diff") and "changed_since" not in options and "changed_since_last" not in options:
+        parser.error("--diff ist nur zusammen mit --changed-since oder --changed-since-last möglich.")
 
     # Alle Ignore-Argumente in eine Liste von Mustern umwandeln
     ignore_patterns: list[str] = []
     for item in args.ignore:
         ignore_patterns.extend([p.strip() for p in item.split(",") if p.strip()])
 
+    if args.debounce is not None and not args.watch:
+        parser.error("--debounce ist nur zusammen mit --watch möglich.")
+
+    if args.watch:
+        unsupported = sorted(name for name in options if name not in _WATCH_OPTIONS)
+        if unsupported:
+            flags = {"dedup": "--no-dedup"}
+            names = ", ".join(flags.get(name, "--" + name.replace("_", "-")) for name in unsupported)
+            parser.error(f"--watch unterstützt diese Optionen nicht: {names}")
+        if args.debounce is not None:
+            options["debounce"] = args.debounce / 1000
+        from clipcode.watch import watch_files
+        watch_files(
+            args.path,
+            extensions,
+            respect_gitignore,
+            ignore_patterns,
+            truncate_from,
+            truncate_to,
+            **options,
+        )
+        return
+
+    from clipcode.exporter import export_files_to_clipboard
     export_files_to_clipboard(
         args.path,
         extensions,
@@ -82,4 +373,5 @@ def main():
         ignore_patterns,
         truncate_from,
         truncate_to,
+        **options,
     )
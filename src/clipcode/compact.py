@@ -0,0 +1,125 @@
+import io
+import os
+import re
+import tokenize
+
+from clipcode.loader import LoadedFile
+
+# Stufen: jede schließt die vorherigen ein
+OFF = 0
+WHITESPACE = 1
+LICENSE_HEADERS = 2
+PYTHON_COMMENTS = 3
+LEVELS = (OFF, WHITESPACE, LICENSE_HEADERS, PYTHON_COMMENTS)
+
+_PYTHON_SUFFIXES = {".py", ".pyi", ".pyw"}
+
+# Führender Kommentarblock: Zeilenkommentare oder ein /* ... */-Block, ggf. nach einem Shebang
+_HEADER = re.compile(
+    r"\A(?P<shebang>#![^\n]*\n)?"
+    r"(?P<header>(?:[ \t]*(?:#|//|--|;)[^\n]*\n)+|[ \t]*/\*.*?\*/[ \t]*\n)",
+    re.DOTALL,
+)
+_LICENSE_WORDS = re.compile(r"licen[cs]e|copyright|spdx-license-identifier", re.IGNORECASE)
+_KEPT_COMMENT = re.compile(r"#!|#.*coding[:=]")
+_BLANK_RUNS = re.compile(r"\n{3,}")
+_TRAILING_SPACE = re.compile(r"[ \t]+$", re.MULTILINE)
+
+
+def compact_whitespace(text: str) -> str:
+    """Entfernt Leerraum am Zeilenende, fasst Leerzeilenfolgen zusammen und kürzt Leerzeilen an den Rändern."""
+    text = _TRAILING_SPACE.sub("", text)
+    return _BLANK_RUNS.sub("\n\n", text).strip("\n")
+
+
+def strip_python_comments(source: str) -> str:
+    """Entfernt Kommentare und Docstrings aus Python-Quelltext mit tokenize.
+
+    Als Docstring gilt jeder String, der allein eine Anweisung bildet. Würde
+    dadurch ein Block leer, bleibt '...' stehen. Nicht tokenisierbarer
+    Quelltext (z. B. ein abgeschnittener Kopfbereich) löst die Ausnahmen von
+    tokenize aus; der Aufrufer behält ihn dann unverändert.
+    """
+    lines = source.splitlines(keepends=True)
+    tokens = list(tokenize.generate_tokens(io.StringIO(source).readline))
+    # (Start, Ende, Ersatz) mit 1-basierten Zeilen wie bei tokenize
+    removals: list[tuple[tuple[int, int], tuple[int, int], str]] = []
+    significant = (tokenize.NL, tokenize.COMMENT)
+    prev = None
+    for index, token in enumerate(tokens):
+        if token.type == tokenize.COMMENT:
+            # Shebang und Kodierungsangabe bleiben erhalten
+            if not (token.start[0] <= 2 and _KEPT_COMMENT.match(token.string)):
+                removals.append((token.start, token.end, ""))
+        elif token.type == tokenize.STRING and (
+            prev is None or prev.type in (tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT)
+        ):
+            rest = [t for t in tokens[index + 1:] if t.type not in significant]
+            if rest and rest[0].type in (tokenize.NEWLINE, tokenize.ENDMARKER):
+                after = rest[1] if len(rest) > 1 else rest[0]
+                empty_body = (
+                    prev is not None and prev.type == tokenize.INDENT
+                    and after.type in (tokenize.DEDENT, tokenize.ENDMARKER)
+                )
+                removals.append((token.start, token.end, "..." if empty_body else ""))
+        if token.type not in significant:
+            prev = token
+
+    # Von hinten ersetzen, damit frühere Positionen gültig bleiben
+    for (start_row, start_col), (end_row, end_col), replacement in reversed(removals):
+        line = lines[start_row - 1][:start_col] + replacement + lines[end_row - 1][end_col:]
+        lines[start_row - 1:end_row] = [line] if line.strip() else []
+    return "".join(lines)
+
+
+class Compactor:
+    """Verkleinert geladene Dateien zwischen Lesen und Formatieren.
+
+    Stufe 1 entfernt überflüssigen Leerraum, Stufe 2 zusätzlich Lizenzköpfe,
+    die schon in einer früheren Datei vorkamen, Stufe 3 zusätzlich Kommentare
+    und Docstrings in Python-Dateien. Zeilenangaben in Kürzungshinweisen
+    beziehen sich weiterhin auf die Originaldatei. Die Einsparung wird
+    über alle Dateien in Bytes (UTF-8) mitgezählt.
+    """
+
+    def __init__(self, level: int):
+        self.level = level
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self._seen_headers: set[str] = set()
+
+    def compact(self, path: str, loaded: LoadedFile) -> LoadedFile:
+        content = self._compact_text(path, loaded.content, is_head=True)
+        tail = self._compact_text(path, loaded.tail, is_head=False) if loaded.tail else loaded.tail
+        self.bytes_before += len(loaded.content.encode()) + len(loaded.tail.encode())
+        self.bytes_after += len(content.encode()) + len(tail.encode())
+        return loaded._replace(content=content, tail=tail)
+
+    def _compact_text(self, path: str, text: str, is_head: bool) -> str:
+        if self.level >= PYTHON_COMMENTS and os.path.splitext(path)[1].lower() in _PYTHON_SUFFIXES:
+            try:
+                text = strip_python_comments(text)
+            except (tokenize.TokenError, SyntaxError):
+                pass
+        if self.level >= LICENSE_HEADERS and is_head:
+            text = self._drop_repeated_header(text)
+        return compact_whitespace(text)
+
+    def _drop_repeated_header(self, text: str) -> str:
+        match = _HEADER.match(text)
+        if match is None or not _LICENSE_WORDS.search(match.group("header")):
+            return text
+        # Vergleich ohne Leerraum-Unterschiede (Einrückung, Zeilenenden)
+        key = " ".join(match.group("header").split())
+        if key not in self._seen_headers:
+            self._seen_headers.add(key)
+            return text
+        return (match.group("shebang") or "") + text[match.end():]
+
+    def report(self) -> str:
+        saved = self.bytes_before - self.bytes_after
+        percent = saved * 100 / self.bytes_before if self.bytes_before else 0.0
+        return (
+            f"🗜️ Kompaktierung (Stufe {self.level}): {self.bytes_before} → {self.bytes_after} Bytes "
+            f"({saved} Bytes bzw. {percent:.1f} % gespart)."
+        )
@@ -0,0 +1,246 @@
+import io
+import os
+import struct
+import sys
+from collections.abc import Callable
+from typing import TYPE_CHECKING
+
+# socket, json, threading und traceback werden erst importiert, wenn ein Daemon
+# läuft bzw. gestartet wird; ohne ihn soll forward() den Start von clipcode
+# nicht verlangsamen (Annotationen daher als Zeichenketten)
+if TYPE_CHECKING:
+    import socket
+    import threading
+
+# Kanäle im Antwortstrom: Standardausgabe, Standardfehler, Exit-Code
+_STDOUT = b"o"
+_STDERR = b"e"
+_EXIT = b"x"
+_FRAME_HEADER = struct.Struct("!cI")
+
+# Umgebungsvariablen des Clients, die für einen Export zählen (Clipboard, Caches)
+_FORWARDED_ENV = ("WAYLAND_DISPLAY", "DISPLAY", "XDG_CACHE_HOME", "XDG_STATE_HOME", "HOME")
+# Optionen, die das Terminal des Aufrufers brauchen oder dauerhaft laufen; sie
+# werden immer im Client ausgeführt
+_LOCAL_OPTIONS = ("--watch", "--split-bytes", "--split-tokens", "osc52", "--clipboard=osc52")
+
+# Wie oft ein Stopp-Signal geprüft wird, solange kein Client verbindet
+_ACCEPT_POLL = 0.1
+
+
+def default_socket_path() -> str:
+    """$CLIPCODE_SOCKET, sonst clipcode.sock in $XDG_RUNTIME_DIR bzw. /tmp mit Benutzerkennung."""
+    override = os.environ.get("CLIPCODE_SOCKET")
+    if override:
+        return override
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return os.path.join(runtime_dir, "clipcode.sock")
+    return os.path.join("/tmp", f"clipcode-{os.getuid()}.sock")
+
+
+def _send_frame(conn: "socket.socket", channel: bytes, payload: bytes) -> None:
+    conn.sendall(_FRAME_HEADER.pack(channel, len(payload)) + payload)
+
+
+def _recv_exact(conn: "socket.socket", size: int) -> bytes | None:
+    chunks = []
+    while size:
+        chunk = conn.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+class _FrameWriter(io.RawIOBase):
+    """Schreibt alles als Frames eines Kanals auf die Client-Verbindung."""
+
+    def __init__(self, conn: "socket.socket", channel: bytes):
+        self._conn = conn
+        self._channel = channel
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        _send_frame(self._conn, self._channel, bytes(data))
+        return len(data)
+
+
+def _text_stream(conn: "socket.socket", channel: bytes) -> io.TextIOWrapper:
+    return io.TextIOWrapper(io.BufferedWriter(_FrameWriter(conn, channel), 1 << 16), encoding="utf-8", line_buffering=True)
+
+
+def forward(argv: list[str], socket_path: str | None = None, stdout=None, stderr=None) -> int | None:
+    """Führt einen Aufruf im laufenden Daemon aus und gibt dessen Ausgaben weiter.
+
+    Liefert den Exit-Code oder None, wenn kein Daemon erreichbar ist (keine
+    Socket-Datei, verwaister Socket) oder der Aufruf lokal laufen muss; der
+    Aufrufer führt den Export dann selbst aus.
+    """
+    if any(arg in _LOCAL_OPTIONS or arg.split("=", 1)[0] in _LOCAL_OPTIONS for arg in argv):
+        return None
+    socket_path = socket_path or default_socket_path()
+    if not os.path.exists(socket_path):
+        return None
+    import json
+    import socket
+
+    out = stdout if stdout is not None else sys.stdout.buffer
+    err = stderr if stderr is not None else sys.stderr.buffer
+    try:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(socket_path)
+    except OSError:
+        return None
+    with conn:
+        request = {
+            "argv": argv,
+            "cwd": os.getcwd(),
+            "env": {name: os.environ[name] for name in _FORWARDED_ENV if name in os.environ},
+        }
+        conn.sendall(json.dumps(request).encode() + b"\n")
+        while True:
+            header = _recv_exact(conn, _FRAME_HEADER.size)
+            if header is None:
+                err.write("❌ Verbindung zu clipcode serve abgebrochen.\n".encode())
+                err.flush()
+                return 1
+            channel, length = _FRAME_HEADER.unpack(header)
+            payload = _recv_exact(conn, length) if length else b""
+            if payload is None:
+                return 1
+            if channel == _EXIT:
+                out.flush()
+                err.flush()
+                return int(payload)
+            target = out if channel == _STDOUT else err
+            target.write(payload)
+            if channel == _STDERR:
+                target.flush()
+
+
+def _peer_uid(conn: "socket.socket") -> int | None:
+    import socket
+
+    try:
+        creds = conn.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize("3i"))
+    except (AttributeError, OSError):
+        return None
+    return struct.unpack("3i", creds)[1]
+
+
+def _handle(conn: "socket.socket", run: Callable[[list[str]], None]) -> None:
+    """Bearbeitet eine Anfrage: Arbeitsverzeichnis und Umgebung des Clients, Ausgaben über den Socket."""
+    import json
+    import traceback
+
+    line = b""
+    while not line.endswith(b"\n"):
+        chunk = conn.recv(1 << 16)
+        if not chunk:
+            return
+        line += chunk
+    request = json.loads(line)
+
+    saved_cwd = os.getcwd()
+    saved_env = {name: os.environ.get(name) for name in _FORWARDED_ENV}
+    saved_streams = sys.stdout, sys.stderr, sys.stdin
+    stdout, stderr = _text_stream(conn, _STDOUT), _text_stream(conn, _STDERR)
+    code = 0
+    try:
+        os.chdir(request["cwd"])
+        for name in _FORWARDED_ENV:
+            os.environ.pop(name, None)
+        os.environ.update(request["env"])
+        sys.stdout, sys.stderr, sys.stdin = stdout, stderr, io.StringIO()
+        try:
+            run(request["argv"])
+        except SystemExit as e:
+            code = e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+            if isinstance(e.code, str):
+                print(e.code, file=sys.stderr)
+        except Exception:
+            traceback.print_exc()
+            code = 1
+        stdout.flush()
+        stderr.flush()
+    finally:
+        sys.stdout, sys.stderr, sys.stdin = saved_streams
+        os.chdir(saved_cwd)
+        for name, value in saved_env.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    _send_frame(conn, _EXIT, str(code).encode())
+
+
+def serve(
+    run: Callable[[list[str]], None],
+    socket_path: str | None = None,
+    stop: "threading.Event | None" = None,
+    ready: "threading.Event | None" = None,
+) -> int:
+    """Nimmt Aufrufe über einen Unix-Socket entgegen und führt sie mit run aus.
+
+    Anfragen werden nacheinander bearbeitet; der Zustand der Exporte (siehe
+    exporter.keep_state_resident) bleibt zwischen ihnen erhalten. Nur
+    Prozesse desselben Benutzers werden bedient. Liefert den Exit-Code.
+    """
+    import socket
+
+    from clipcode.exporter import keep_state_resident
+
+    socket_path = socket_path or default_socket_path()
+    if os.path.exists(socket_path):
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            # Verwaister Socket eines beendeten Daemons
+            os.unlink(socket_path)
+        else:
+            probe.close()
+            print(f"❌ clipcode serve läuft bereits unter {socket_path}.", file=sys.stderr)
+            return 1
+
+    keep_state_resident()
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        old_umask = os.umask(0o177)
+        try:
+            server.bind(socket_path)
+        finally:
+            os.umask(old_umask)
+        server.listen()
+        if stop is not None:
+            server.settimeout(_ACCEPT_POLL)
+        print(f"🛰️ clipcode serve lauscht auf {socket_path}", file=sys.stderr)
+        if ready is not None:
+            ready.set()
+        while stop is None or not stop.is_set():
+            try:
+                conn, _ = server.accept()
+            except socket.timeout:
+                continue
+            with conn:
+                conn.settimeout(None)
+                if _peer_uid(conn) not in (None, os.getuid()):
+                    continue
+                try:
+                    _handle(conn, run)
+                except (OSError, ValueError) as e:
+                    # Client vorzeitig beendet oder ungültige Anfrage
+                    print(f"⚠️ Anfrage abgebrochen ({e}).", file=sys.stderr)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except OSError:
+            pass
+    return 0
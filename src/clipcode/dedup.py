@@ -0,0 +1,60 @@
+import os
+from typing import NamedTuple
+
+from clipcode.loader import LoadedFile
+
+
+class Duplicates(NamedTuple):
+    # Pfad -> erstes Vorkommen derselben Datei (gleicher Inode)
+    same_file: dict[str, str]
+    # Übrige Dateien, deren Größe mit der einer anderen übereinstimmt; nur
+    # sie können inhaltsgleiche Kopien sein und brauchen einen Inhalts-Hash
+    same_size: set[str]
+
+
+def find_duplicates(files: list[str]) -> Duplicates:
+    """Ermittelt per stat mehrfach vorkommende Dateien und Kandidaten für inhaltsgleiche Kopien.
+
+    Als identisch gelten Pfade mit gleichem Gerät und Inode (Hardlinks,
+    Symlinks); sie werden ihrem ersten Vorkommen zugeordnet. Dateien mit
+    gleicher Größe (außer leeren) gehen als Kandidaten an ContentIndex, der
+    sie anhand des Hashes beim Laden vergleicht. Keine Datei wird geöffnet.
+    """
+    same_file: dict[str, str] = {}
+    first_by_inode: dict[tuple[int, int], str] = {}
+    by_size: dict[int, list[str]] = {}
+    for path in files:
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        first = first_by_inode.setdefault((st.st_dev, st.st_ino), path)
+        if first != path:
+            same_file[path] = first
+        elif st.st_size:
+            by_size.setdefault(st.st_size, []).append(path)
+    same_size = {path for paths in by_size.values() if len(paths) > 1 for path in paths}
+    return Duplicates(same_file, same_size)
+
+
+class ContentIndex:
+    """Merkt sich je Inhalts-Hash das erste exportierte Vorkommen.
+
+    Der Hash stammt aus demselben Lesevorgang wie der Inhalt
+    (loader.load_file) oder aus dem Cache; für die Duplikaterkennung wird
+    keine Datei ein weiteres Mal geöffnet. Gebildet wird er nur für die
+    Kandidaten aus find_duplicates; Dateien ohne Hash und leere Dateien
+    werden nicht zusammengefasst.
+    """
+
+    def __init__(self, candidates: set[str] | None = None):
+        # Dateien, für die beim Laden ein Hash gebildet werden soll
+        self.candidates = candidates if candidates is not None else set()
+        self._first: dict[bytes, str] = {}
+
+    def original(self, path: str, loaded: LoadedFile) -> str | None:
+        """Erstes Vorkommen mit gleichem Inhalt oder None, wenn path selbst das erste ist."""
+        if loaded.digest is None or loaded.line_count == 0:
+            return None
+        first = self._first.setdefault(loaded.digest, path)
+        return first if first != path else None
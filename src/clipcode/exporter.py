@@ -1,95 +1,773 @@
+import base64
 import subprocess
 import os
-from clipcode.file_utils import find_files_with_extensions, read_file_content, find_all_files
+import shutil
+import sys
+import tempfile
+from collections.abc import Iterator
+from typing import BinaryIO
+from clipcode.file_utils import (
+    DirCache, TreeFilter, find_all_files, matches_extension, normalize_extensions, find_files_with_extensions,
+)
+from clipcode.loader import LoadedFile, load_files
+from clipcode.budget import BYTES, ORDER, TOKENS, Budget, estimate_tokens
+from clipcode.classifier import DEFAULT_CLASSIFIER, TEXT
+from clipcode.dedup import ContentIndex, find_duplicates
+from clipcode.cache import MemoryCache, MetadataCache
+from clipcode.changes import ChangesError, ExportState, changed_since_ref
+from clipcode.compact import Compactor
 from clipcode.syntax import get_syntax_highlight_tag
-from clipcode.gitignore_utils import filter_files_by_gitignore
+from clipcode.gitignore_utils import GitignoreRegistry, GitignoreScopes
+from clipcode.git_index import GitIndexError, find_files_from_index
+from clipcode.git_check_ignore import start_check_ignore
 import fnmatch
-from pathlib import Path
+import re
 
 
-def _should_skip_file_for_export(file_path: str) -> bool:
-    # Skip SVG explicitly (even though it's text, it can be large/noisy for clipboard exports)
-    if Path(file_path).suffix.lower() == ".svg":
-        return True
+class ResidentState:
+    """Zustand, den ein langlebiger Prozess (clipcode serve) zwischen Exporten behält.
 
-    try:
-        with open(file_path, "rb") as f:
-            chunk = f.read(4096)
-    except OSError:
-        # If we can't read it, treat it as non-exportable for safety.
-        return True
+    Geparste .gitignore-Dateien, die gefilterten Verzeichnislisten je Wurzel
+    und die geladenen Dateien bleiben im Speicher; sie werden wie die
+    persistenten Caches über stat-Daten validiert.
+    """
 
-    if not chunk:
-        return False
+    def __init__(self):
+        self.registry = GitignoreRegistry()
+        self.dir_caches: dict[str, DirCache] = {}
+        self.content = MemoryCache()
 
-    # Fast binary indicator
-    if b"\x00" in chunk:
-        return True
+    def dir_cache(self, root_path: str, key: str) -> DirCache:
+        previous = self.dir_caches.get(os.path.abspath(root_path))
+        return DirCache(key, previous.visited if previous is not None and previous.key == key else None)
 
-    # Heuristic: count non-text bytes
-    text_bytes = set(b"\t\n\r\f\b") | set(range(0x20, 0x7F))
-    non_text = sum(byte not in text_bytes for byte in chunk)
-    return (non_text / len(chunk)) > 0.30
+    def store_dir_cache(self, root_path: str, dir_cache: DirCache) -> None:
+        self.dir_caches[os.path.abspath(root_path)] = dir_cache
 
-def export_files_to_clipboard(
+# Gesetzt nur in einem clipcode serve-Prozess
+_resident: ResidentState | None = None
+
+def keep_state_resident() -> ResidentState:
+    """Lässt alle folgenden Exporte dieses Prozesses ihren Zustand im Speicher behalten."""
+    global _resident
+    _resident = ResidentState()
+    return _resident
+
+def _compile_ignore_patterns(patterns: list[str] | None) -> re.Pattern | None:
+    """Fasst alle expliziten Ignore-Patterns zu einem einzigen Ausdruck zusammen."""
+    if not patterns:
+        return None
+    return re.compile('|'.join(f'(?:{fnmatch.translate(os.path.normcase(pat))})' for pat in patterns))
+
+def _matches_ignore(pattern: re.Pattern, file_path: str, name: str) -> bool:
+    """Prüft den Pfad (POSIX) und den Namen gegen die Ignore-Patterns (wie fnmatch)."""
+    return (
+        pattern.match(os.path.normcase(file_path).replace(os.sep, '/')) is not None
+        or pattern.match(os.path.normcase(name)) is not None
+    )
+
+class ExportTreeFilter(TreeFilter):
+    """Schließt Einträge schon während der Traversierung aus.
+
+    Übersprungen werden '.git' und '.gitignore' sowie alles, was auf ein
+    explizites Ignore-Pattern passt (bei Verzeichnissen samt Inhalt). Die
+    verbleibenden Einträge prüft anschließend die Ignore-Engine. Für
+    Verzeichnisse ist das exakt: wie bei git kann eine Negation nichts
+    unterhalb eines ausgeschlossenen Verzeichnisses wieder einschließen.
+    """
+
+    def __init__(self, ignore_patterns: list[str] | None, ignore_engine: TreeFilter | None):
+        self.ignore_pattern = _compile_ignore_patterns(ignore_patterns)
+        self.ignore_engine = ignore_engine
+
+    def enter(self, dir_path, rel_dir, parent_scope):
+        if self.ignore_engine is None:
+            return None
+        return self.ignore_engine.enter(dir_path, rel_dir, parent_scope)
+
+    def filter_entries(self, dir_path, rel_dir, scope, dirnames, filenames):
+        prefix = dir_path if dir_path.endswith(os.sep) else dir_path + os.sep
+        pattern = self.ignore_pattern
+        dirnames = [
+            d for d in dirnames
+            if d != '.git' and not (pattern is not None and _matches_ignore(pattern, prefix + d, d))
+        ]
+        filenames = [
+            f for f in filenames
+            if f != '.git' and f != '.gitignore'
+            and not (pattern is not None and _matches_ignore(pattern, prefix + f, f))
+        ]
+        if self.ignore_engine is not None:
+            dirnames, filenames = self.ignore_engine.filter_entries(dir_path, rel_dir, scope, dirnames, filenames)
+        return dirnames, filenames
+
+    def close(self):
+        if self.ignore_engine is not None:
+            self.ignore_engine.close()
+
+    @property
+    def ignore_file(self):
+        return self.ignore_engine.ignore_file if self.ignore_engine is not None else None
+
+    def cache_key(self) -> str | None:
+        engine_key = self.ignore_engine.cache_key() if self.ignore_engine is not None else "none"
+        if engine_key is None:
+            return None
+        pattern = self.ignore_pattern.pattern if self.ignore_pattern is not None else ""
+        return f"{pattern}\0{engine_key}"
+
+def _create_ignore_engine(root_path: str, ignore_engine: str) -> TreeFilter:
+    """Erzeugt die gewählte Ignore-Engine; 'git' fällt ohne git auf 'builtin' zurück."""
+    if ignore_engine == "git":
+        engine = start_check_ignore(root_path)
+        if engine is not None:
+            return engine
+        print("⚠️ git check-ignore nicht verfügbar, verwende die eingebaute .gitignore-Auswertung.", file=sys.stderr)
+    return GitignoreScopes(root_path, _resident.registry if _resident is not None else None)
+
+def _collect_files(
     root_path: str,
     extensions: list[str] | None,
-    respect_gitignore: bool = True,
-    ignore_patterns: list[str] | None = None,
-    truncate_from: int = 3000,
-    truncate_to: int = 500,
-):
-    if extensions is None:
-        # Wenn extensions None ist, alle Dateien finden
-        files = find_all_files(root_path)
-    else:
-        files = find_files_with_extensions(root_path, extensions)
-
-    # Immer .git-Ordner und .gitignore-Dateien ausschließen
-    files = [f for f in files if '.git' not in Path(f).parts and Path(f).name != '.gitignore']
-
-    # Explizite Ignore-Patterns anwenden (höchste Priorität)
-    if ignore_patterns:
-        def _matches_ignore(patterns: list[str], file_path: str) -> bool:
-            path_posix = file_path.replace(os.sep, '/')
-            return any(
-                fnmatch.fnmatch(path_posix, pat) or fnmatch.fnmatch(Path(file_path).name, pat)
-                for pat in patterns
+    ignore_patterns: list[str] | None,
+    tree_filter: ExportTreeFilter,
+    from_index: bool,
+    include_untracked: bool,
+    walk_threads: int,
+    dir_cache: DirCache | None = None,
+) -> list[str]:
+    """Ermittelt die Kandidatendateien aus dem git-Index oder per Traversierung."""
+    files = None
+    if from_index:
+        try:
+            # Versionierte Dateien unterliegen wie bei git keinen .gitignore-Regeln
+            files = find_files_from_index(
+                root_path,
+                extensions,
+                ExportTreeFilter(ignore_patterns, None),
+                include_untracked=include_untracked,
+                untracked_filter=tree_filter,
             )
-        files = [f for f in files if not _matches_ignore(ignore_patterns, f)]
+        except GitIndexError as e:
+            print(f"⚠️ git-Index nicht verwendbar ({e}), durchsuche stattdessen das Dateisystem.", file=sys.stderr)
+
+    if files is None:
+        if tree_filter.ignore_engine is not None and tree_filter.ignore_engine.is_root_ignored():
+            files = []
+        elif extensions is None:
+            # Wenn extensions None ist, alle Dateien finden
+            files = find_all_files(root_path, tree_filter, walk_threads, dir_cache)
+        else:
+            files = find_files_with_extensions(root_path, extensions, tree_filter, walk_threads, dir_cache)
+    return files
+
+# Markiert im Codeblock die Stelle, an der Zeilen ausgelassen wurden
+_OMISSION_MARKER = "⋮"
+
+def _render_content(loaded: LoadedFile) -> str:
+    """Setzt Kopf- und Endbereich einer gekürzten Datei mit Auslassungszeile zusammen."""
+    if not loaded.tail_lines:
+        return loaded.content
+    if not loaded.head_lines:
+        return f"{_OMISSION_MARKER}\n{loaded.tail}"
+    return f"{loaded.content}\n{_OMISSION_MARKER}\n{loaded.tail}"
+
+def _truncation_notice(loaded: LoadedFile, reason: str) -> str:
+    first, last = loaded.omitted
+    omitted = f"Zeile {first}" if first == last else f"Zeilen {first}–{last}"
+    return (
+        f"⚠️ Datei gekürzt: {loaded.line_count} → {loaded.kept_lines} Zeilen "
+        f"({reason}), ausgelassen: {omitted}.\n"
+    )
+
+def format_section(file_path: str, loaded: LoadedFile, reason: str) -> str:
+    """Markdown-Abschnitt einer geladenen Datei; reason begründet eine Kürzung."""
+    lang = get_syntax_highlight_tag(file_path)
+    file_output = [f"### {file_path}\n```{lang}\n{_render_content(loaded)}\n```\n"]
+    if loaded.truncated:
+        file_output.append(_truncation_notice(loaded, reason))
+    file_output.append("---\n")
+    return "".join(file_output)
+
+def _reference_section(file_path: str, original: str) -> str:
+    return f"### {file_path}\n🔁 Identisch mit {original}\n---\n"
+
+def _exportable_by_name(file_path: str) -> bool:
+    by_name = DEFAULT_CLASSIFIER.classify_name(file_path)
+    return by_name is None or by_name.kind == TEXT
+
+def _section_frame(file_path: str) -> str:
+    """Abschnitt einer Datei ohne Inhalt; kostet unabhängig vom Inhalt Budget."""
+    return f"\n### {file_path}\n```{get_syntax_highlight_tag(file_path)}\n\n```\n---\n"
+
+def _export_file_list(
+    root_path: str,
+    extensions: list[str] | None,
+    respect_gitignore: bool,
+    ignore_patterns: list[str] | None,
+    from_index: bool,
+    include_untracked: bool,
+    ignore_engine: str,
+    walk_threads: int,
+    metadata_cache: MetadataCache | None = None,
+) -> list[str]:
+    # .git, explizite Ignore-Patterns und .gitignore-Regeln (inkl. verschachtelter
+    # .gitignore-Dateien) werden schon während der Traversierung angewendet.
+    engine = _create_ignore_engine(root_path, ignore_engine) if respect_gitignore else None
+    tree_filter = ExportTreeFilter(ignore_patterns, engine)
+    dir_cache = None
+    # Im serve-Prozess bleiben die Verzeichnislisten im Speicher, sonst ggf. im persistenten Cache
+    dir_store = _resident if _resident is not None else metadata_cache
+    # Beim Lesen aus dem git-Index wird (höchstens teilweise) traversiert
+    filter_key = tree_filter.cache_key() if dir_store is not None and not from_index else None
+    if filter_key is not None:
+        # Ignore-Patterns werden gegen die Pfade wie gelistet geprüft, daher zählt die Schreibweise der Wurzel mit
+        dir_cache = dir_store.dir_cache(root_path, f"{root_path}\0{filter_key}")
+    try:
+        files = _collect_files(
+            root_path, extensions, ignore_patterns, tree_filter, from_index, include_untracked, walk_threads,
+            dir_cache,
+        )
+        if dir_cache is not None:
+            dir_store.store_dir_cache(root_path, dir_cache)
+    finally:
+        tree_filter.close()
 
-    # Gitignore-Filterung anwenden, falls aktiviert
     if respect_gitignore:
-        files = filter_files_by_gitignore(files, root_path)
+        # Wie bisher bei aktivem .gitignore-Respekt absolute Pfade ausgeben;
+        # alle Pfade beginnen mit root_path, daher genügt Stringverkettung.
+        abs_prefix = os.path.join(os.path.realpath(root_path), '')
+        root_len = len(root_path)
+        files = [abs_prefix + f[root_len:].lstrip(os.sep) for f in files]
+    return files
 
-    output = []
-    output.append("## Projektdateien\n")
+def _changed_file_list(
+    root_path: str,
+    rel_paths: list[str],
+    extensions: list[str] | None,
+    ignore_patterns: list[str] | None,
+    respect_gitignore: bool,
+) -> dict[str, str]:
+    """Wendet Endungen und Ignore-Patterns auf die von git gemeldeten Pfade an.
 
-    for file_path in files:
-        if _should_skip_file_for_export(file_path):
+    Die Pfade erhalten dieselbe Form wie bei einer Traversierung (absolut bei
+    aktivem .gitignore-Respekt); .gitignore-Regeln hat git bereits angewendet.
+    Liefert relativen Pfad -> Exportpfad.
+    """
+    pattern = _compile_ignore_patterns(ignore_patterns)
+    normalized_exts = normalize_extensions(extensions) if extensions is not None else None
+    base = os.path.join(os.path.realpath(root_path) if respect_gitignore else root_path, '')
+    files = {}
+    for rel in rel_paths:
+        parts = rel.split('/')
+        name = parts[-1]
+        if '.git' in parts or name == '.gitignore':
             continue
-        content = read_file_content(file_path)
-        lines = content.splitlines()
-        line_count = len(lines)
+        if normalized_exts is not None and not matches_extension(name, normalized_exts):
+            continue
+        path = base + os.path.join(*parts)
+        if pattern is not None and any(
+            _matches_ignore(pattern, base + os.path.join(*parts[:i + 1]), parts[i]) for i in range(len(parts))
+        ):
+            continue
+        files[rel] = path
+    return files
 
-        if line_count > truncate_from:
-            if truncate_to == 0:
+def _render_sections(
+    files: list[str],
+    truncate_from: int,
+    truncate_to: int,
+    truncate_tail: int,
+    jobs: int,
+    budget: Budget | None = None,
+    duplicates: dict[str, str] | None = None,
+    compactor: Compactor | None = None,
+    cache: MetadataCache | None = None,
+    diffs: dict[str, str] | None = None,
+    content_index: ContentIndex | None = None,
+) -> Iterator[str]:
+    """Erzeugt die Markdown-Abschnitte der exportierbaren Dateien nacheinander.
+
+    Duplikate (Pfad -> erstes Vorkommen) werden nicht geladen, sondern als
+    Verweis auf ihr erstes Vorkommen ausgegeben, sofern dieses exportiert wurde.
+    Mit content_index werden auch geladene Dateien, deren Inhalt schon
+    exportiert wurde, zu einem solchen Verweis.
+    Für Dateien in diffs (Pfad -> Unified Diff) wird statt des Inhalts der
+    Diff ausgegeben; auch sie werden nicht geladen.
+    """
+    duplicates = duplicates or {}
+    diffs = diffs or {}
+    # Mit jobs > 1 wird parallel geladen; die Abschnitte bleiben in Dateireihenfolge.
+    loaded_files = load_files(
+        [path for path in files if path not in duplicates and path not in diffs],
+        truncate_from, truncate_to, truncate_tail, jobs, cache=cache,
+        hash_paths=content_index.candidates if content_index is not None else (),
+    )
+    emitted: set[str] = set()
+    try:
+        for file_path in files:
+            if file_path in diffs:
+                emitted.add(file_path)
+                yield f"### {file_path}\n```diff\n{diffs[file_path]}\n```\n---\n"
                 continue
-            content = "\n".join(lines[:truncate_to])
 
-        lang = get_syntax_highlight_tag(file_path)
-        file_output = [f"### {file_path}\n```{lang}\n{content}\n```\n"]
-        if line_count > truncate_from and truncate_to > 0:
-            file_output.append(
-                f"⚠️ Datei gekürzt: {line_count} → {truncate_to} Zeilen (Grenze: > {truncate_from}).\n"
-            )
-        file_output.append("---\n")
-        output.append("".join(file_output))
+            original = duplicates.get(file_path)
+            if original is not None:
+                if original in emitted:
+                    yield _reference_section(file_path, original)
+                continue
+
+            _, loaded = next(loaded_files)
+            if loaded is None:
+                if budget is not None:
+                    budget.release(file_path)
+                continue
+            emitted.add(file_path)
+            original = content_index.original(file_path, loaded) if content_index is not None else None
+            if original is not None:
+                if budget is not None:
+                    budget.release(file_path)
+                yield _reference_section(file_path, original)
+                continue
+            if compactor is not None:
+                loaded = compactor.compact(file_path, loaded)
+
+            reason = f"Grenze: > {truncate_from}"
+            if budget is not None:
+                fitted = budget.fit(file_path, loaded, _render_content)
+                if fitted is not loaded:
+                    loaded = fitted
+                    reason = "Token-Budget" if budget.unit == TOKENS else "Byte-Budget"
+
+            yield format_section(file_path, loaded, reason)
+    finally:
+        loaded_files.close()
+
+def _open_spool() -> BinaryIO:
+    """Öffnet eine anonyme Datei im Arbeitsspeicher (memfd) als Zwischenspeicher."""
+    if hasattr(os, "memfd_create"):
+        return open(os.memfd_create("clipcode-export", os.MFD_CLOEXEC), "w+b")
+    return tempfile.TemporaryFile()
+
+# Puffergröße für Schreibzugriffe auf Dateien, Pipes und die Standardausgabe
+_WRITE_BUFFER_SIZE = 1 << 20
+# Vielfaches von 3, damit die Base64-Stücke aneinandergehängt gültig bleiben
+_OSC52_CHUNK_SIZE = 3 << 16
+
+# Clipboard-Programme, die den Export über ihre Standardeingabe erhalten
+_CLIPBOARD_COMMANDS = {
+    "wl-copy": ["wl-copy"],
+    "xclip": ["xclip", "-selection", "clipboard"],
+    "xsel": ["xsel", "--clipboard", "--input"],
+}
+CLIPBOARD_BACKENDS = ("auto", *_CLIPBOARD_COMMANDS, "osc52")
+
+class Sink:
+    """Ziel des Exports.
+
+    Abschnitte werden nacheinander geschrieben und nie zu einem String
+    verbunden. Geöffnet wird ein Ziel vor der Dateisuche, sodass ein
+    fehlendes Programm oder ein ungültiger Pfad sofort auffällt.
+    """
+
+    error_prefix = "❌ Fehler beim Kopieren in die Zwischenablage"
+    success_message: str | None = "✅ Inhalt erfolgreich in die Zwischenablage kopiert."
+    # Landet der Export auf stdout, gehen Statusmeldungen nach stderr
+    status_to_stderr = False
+
+    _stream: BinaryIO
+
+    def begin(self, header: str) -> None:
+        """Schreibt die Überschrift des Exports."""
+        self.write(header)
+
+    def write(self, text: str) -> None:
+        self._stream.write(text.encode())
 
-    formatted_result = '\n'.join(output)
+    def close(self) -> None:
+        """Schließt die Ausgabe ab; Fehler werden als Ausnahme gemeldet."""
+        self._stream.close()
 
+    def abort(self) -> None:
+        """Verwirft die Ausgabe nach einem Fehler, soweit das Ziel es erlaubt."""
+        try:
+            self._stream.close()
+        except OSError:
+            pass
+
+class _ClipboardSink(Sink):
+    """Schreibt den Export abschnittsweise in die Standardeingabe eines Clipboard-Programms.
+
+    Das Programm wird beim Öffnen gestartet, jeder Abschnitt wird sofort
+    kodiert und weitergereicht, sodass nie der ganze Export als String im
+    Speicher liegt.
+    """
+
+    def __init__(self, command: list[str]):
+        self._command = command
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE, bufsize=_WRITE_BUFFER_SIZE)
+        self._stream = self._process.stdin
+
+    def close(self) -> None:
+        try:
+            self._stream.close()
+        finally:
+            returncode = self._process.wait()
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, self._command)
+
+    def abort(self) -> None:
+        # Vor dem Ende der Eingabe beendet, setzt das Programm die Zwischenablage nicht
+        self._process.kill()
+        super().abort()
+        self._process.wait()
+
+class _Osc52Sink(Sink):
+    """Setzt die Zwischenablage per OSC-52-Escape-Sequenz über das Terminal (auch via SSH).
+
+    Die Sequenz braucht den vollständigen Base64-kodierten Inhalt, daher wird
+    zunächst in eine memfd-Datei geschrieben und erst beim Abschließen
+    stückweise kodiert an das Terminal gesendet.
+    """
+
+    def __init__(self, tty: str = "/dev/tty"):
+        self._tty = open(tty, "wb", buffering=_WRITE_BUFFER_SIZE)
+        self._stream = _open_spool()
+
+    def close(self) -> None:
+        with self._tty, self._stream:
+            self._stream.seek(0)
+            self._tty.write(b"\x1b]52;c;")
+            while chunk := self._stream.read(_OSC52_CHUNK_SIZE):
+                self._tty.write(base64.b64encode(chunk))
+            self._tty.write(b"\x07")
+
+    def abort(self) -> None:
+        self._tty.close()
+        super().abort()
+
+class _FileSink(Sink):
+    """Schreibt den Export gepuffert in eine Datei."""
+
+    error_prefix = "❌ Fehler beim Schreiben der Ausgabedatei"
+
+    def __init__(self, path: str):
+        self._stream = open(path, "wb", buffering=_WRITE_BUFFER_SIZE)
+        self.success_message = f"✅ Inhalt nach {path} geschrieben."
+
+class _StdoutSink(Sink):
+    """Schreibt den Export gepuffert auf die Standardausgabe (z. B. für Pipes)."""
+
+    error_prefix = "❌ Fehler beim Schreiben auf die Standardausgabe"
+    success_message = None
+    status_to_stderr = True
+
+    def __init__(self):
+        sys.stdout.flush()
+        try:
+            self._stream = open(sys.stdout.fileno(), "wb", buffering=_WRITE_BUFFER_SIZE, closefd=False)
+        except (OSError, ValueError):
+            # Ersetzte Standardausgabe ohne Dateideskriptor
+            self._stream = sys.stdout.buffer
+
+    def close(self) -> None:
+        self._stream.flush()
+        if self._stream is not sys.stdout.buffer:
+            self._stream.close()
+
+    def abort(self) -> None:
+        try:
+            self.close()
+        except OSError:
+            pass
+
+class _SplitSink(Sink):
+    """Verteilt den Export auf nummerierte Teile mit begrenzter Größe.
+
+    Jeder Teil ist ein eigenes Ziel (nummerierte Datei oder ein neuer
+    Clipboard-Vorgang), das geschlossen wird, sobald der nächste Abschnitt
+    nicht mehr hineinpasst; der erste Teil steht so bereit, während noch
+    Dateien geladen werden. Abschnitte werden nur aufgeteilt, wenn sie allein
+    größer als die Grenze sind, und dann an Zeilengrenzen. Bei der
+    Zwischenablage wartet clipcode vor jedem weiteren Teil auf Enter.
+    """
+
+    def __init__(self, open_part, limit: int, measure, wait_between: bool):
+        self._open_part = open_part
+        self._limit = limit
+        self._measure = measure
+        self._wait_between = wait_between
+        self._header = ""
+        self._number = 1
+        self._part: Sink | None = open_part(1)
+        self._size = self._header_size = 0
+        self.error_prefix = self._part.error_prefix
+        self.status_to_stderr = self._part.status_to_stderr
+        self.success_message = None
+
+    def begin(self, header: str) -> None:
+        self._header = header
+        self._write_header()
+
+    def _write_header(self) -> None:
+        header = self._header.replace("\n", f" (Teil {self._number})\n", 1)
+        self._part.write(header)
+        self._size = self._header_size = self._measure(header)
+
+    def _finish_part(self) -> None:
+        part, self._part = self._part, None
+        part.close()
+        if part.success_message is not None:
+            report(part, f"Teil {self._number}: {part.success_message}")
+
+    def _next_part(self) -> None:
+        self._finish_part()
+        self._number += 1
+        if self._wait_between:
+            try:
+                input(f"⏎ Enter drücken, um Teil {self._number} in die Zwischenablage zu kopieren …")
+            except EOFError:
+                pass
+        self._part = self._open_part(self._number)
+        self._write_header()
+
+    def write(self, text: str) -> None:
+        size = self._measure(text)
+        if self._size + size <= self._limit:
+            self._part.write(text)
+            self._size += size
+            return
+        if size <= self._limit - self._header_size:
+            self._next_part()
+            self._part.write(text)
+            self._size += size
+            return
+        self._write_lines(text.splitlines(keepends=True))
+
+    def _write_lines(self, lines: list[str]) -> None:
+        """Verteilt einen zu großen Abschnitt zeilenweise auf die Teile.
+
+        Wird innerhalb des Codeblocks geschnitten, schließt der Teil mit einem
+        Zaun ab und der nächste beginnt mit "### <Pfad> (Fortsetzung)" und dem
+        gleichen Öffner; beides zählt zur Größe des jeweiligen Teils.
+        """
+        heading, start, end = _fence_bounds(lines)
+        closing_size = self._measure(_FENCE_CLOSE)
+        part_base = self._header_size
+        fence_open = False
+        for index, line in enumerate(lines):
+            line_size = self._measure(line)
+            # Solange der Codeblock offen bleibt, muss sein Abschluss noch hineinpassen
+            reserve = closing_size if start is not None and start <= index < end else 0
+            if self._size + line_size + reserve > self._limit and self._size > part_base:
+                if fence_open:
+                    self._part.write(_FENCE_CLOSE)
+                self._next_part()
+                if fence_open:
+                    continuation = f"### {heading} (Fortsetzung)\n{lines[start]}"
+                    self._part.write(continuation)
+                    self._size += self._measure(continuation)
+                part_base = self._size
+            self._part.write(line)
+            self._size += line_size
+            if index == start:
+                fence_open = True
+            elif index == end:
+                fence_open = False
+
+    def close(self) -> None:
+        self._finish_part()
+        self.success_message = f"✅ Export auf {self._number} Teil(e) verteilt."
+
+    def abort(self) -> None:
+        if self._part is not None:
+            self._part.abort()
+
+_FENCE_CLOSE = "```\n"
+
+def _fence_bounds(lines: list[str]) -> tuple[str | None, int | None, int | None]:
+    """Überschrift sowie Zeilenindex von Öffner und Abschluss des Codeblocks eines Abschnitts.
+
+    Der Öffner folgt direkt auf "### <Pfad>", der Abschluss ist die letzte
+    Zeile "```"; Zäune im Dateiinhalt selbst werden so nicht mitgezählt.
+    """
+    for index, line in enumerate(lines):
+        if line.startswith("### "):
+            if index + 1 < len(lines) and lines[index + 1].startswith("```"):
+                end = max(i for i, candidate in enumerate(lines) if candidate == _FENCE_CLOSE)
+                if end > index + 1:
+                    return line[4:].rstrip("\n"), index + 1, end
+            break
+    return None, None, None
+
+def _numbered_path(path: str, number: int) -> str:
+    """export.md -> export.001.md"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.{number:03d}{ext}"
+
+def _open_split_sink(
+    sink_class: type[Sink], sink_args: tuple, split_bytes: int | None, split_tokens: int | None
+) -> _SplitSink:
+    def open_part(number: int) -> Sink:
+        if sink_class is _FileSink:
+            return _FileSink(_numbered_path(*sink_args, number))
+        return sink_class(*sink_args)
+
+    def measure(text: str) -> int:
+        data = text.encode()
+        return estimate_tokens(data) if split_tokens is not None else len(data)
+
+    limit = split_tokens if split_tokens is not None else split_bytes
+    # Nur die Zwischenablage muss zwischen den Teilen geleert werden; Dateien
+    # und Standardausgabe nehmen die Teile direkt nacheinander auf
+    return _SplitSink(open_part, limit, measure, wait_between=sink_class not in (_FileSink, _StdoutSink))
+
+def _detect_clipboard() -> str:
+    """Wählt das Clipboard-Programm passend zur Sitzung (Wayland vor X11, sonst wl-copy)."""
+    if os.environ.get("WAYLAND_DISPLAY") and shutil.which("wl-copy"):
+        return "wl-copy"
+    if os.environ.get("DISPLAY"):
+        for name in ("xclip", "xsel"):
+            if shutil.which(name):
+                return name
+    return "wl-copy"
+
+def select_sink(output: str | None, to_stdout: bool, clipboard: str) -> tuple[type[Sink], tuple]:
+    """Wählt das Ausgabeziel; liefert Klasse und Argumente, geöffnet wird es vom Aufrufer."""
+    if output is not None:
+        return _FileSink, (output,)
+    if to_stdout:
+        return _StdoutSink, ()
+    if clipboard == "auto":
+        clipboard = _detect_clipboard()
+    if clipboard == "osc52":
+        return _Osc52Sink, ()
+    return _ClipboardSink, (_CLIPBOARD_COMMANDS[clipboard],)
+
+def report(sink: Sink | type[Sink], message: str) -> None:
+    """Gibt eine Statusmeldung aus; nach stderr, wenn das Ziel die Standardausgabe belegt."""
+    print(message, file=sys.stderr if sink.status_to_stderr else None)
+
+def export_files_to_clipboard(
+    root_path: str,
+    extensions: list[str] | None,
+    respect_gitignore: bool = True,
+    ignore_patterns: list[str] | None = None,
+    truncate_from: int = 3000,
+    truncate_to: int = 500,
+    from_index: bool = False,
+    include_untracked: bool = False,
+    ignore_engine: str = "builtin",
+    walk_threads: int = 1,
+    truncate_tail: int = 0,
+    jobs: int = 1,
+    output: str | None = None,
+    to_stdout: bool = False,
+    clipboard: str = "auto",
+    max_tokens: int | None = None,
+    max_bytes: int | None = None,
+    priority: str = ORDER,
+    prefer: list[str] | None = None,
+    dedup: bool = True,
+    compact: int = 0,
+    split_bytes: int | None = None,
+    split_tokens: int | None = None,
+    cache: bool = False,
+    changed_since: str | None = None,
+    changed_since_last: bool = False,
+    diff: bool = False,
+):
+    # Das Ziel wird zuerst geöffnet: ein fehlendes Clipboard-Programm oder ein
+    # ungültiger Ausgabepfad fällt auf, bevor Dateien gesucht und gelesen werden.
+    sink_class, sink_args = select_sink(output, to_stdout, clipboard)
+    try:
+        if split_bytes is not None or split_tokens is not None:
+            sink = _open_split_sink(sink_class, sink_args, split_bytes, split_tokens)
+        else:
+            sink = sink_class(*sink_args)
+    except (OSError, subprocess.SubprocessError) as e:
+        report(sink_class, f"{sink_class.error_prefix}: {e}")
+        return
+
+    metadata_cache = None
+    state = None
+    diffs: dict[str, str] = {}
+    deleted: list[str] = []
     try:
-        subprocess.run(["wl-copy"], input=formatted_result.encode(), check=True)
-        print("✅ Inhalt erfolgreich in die Zwischenablage kopiert.")
-    except Exception as e:
-        print(f"❌ Fehler beim Kopieren in die Zwischenablage: {e}")
+        if cache:
+            metadata_cache = MetadataCache.open_default()
+        if changed_since is not None:
+            # git liefert die geänderten Pfade; das Dateisystem wird nicht durchlaufen
+            change_set = changed_since_ref(root_path, changed_since, diff, respect_gitignore)
+            changed = _changed_file_list(root_path, change_set.changed, extensions, ignore_patterns, respect_gitignore)
+            files = list(changed.values())
+            diffs = {changed[rel]: patch for rel, patch in change_set.diffs.items() if rel in changed}
+            deleted = list(_changed_file_list(
+                root_path, change_set.deleted, extensions, ignore_patterns, respect_gitignore
+            ).values())
+            header = f"## Geänderte Projektdateien (seit {changed_since})\n"
+        else:
+            files = _export_file_list(
+                root_path, extensions, respect_gitignore, ignore_patterns,
+                from_index, include_untracked, ignore_engine, walk_threads, metadata_cache,
+            )
+            header = "## Projektdateien\n"
+            if changed_since_last:
+                state = ExportState(
+                    root_path, extensions=extensions, ignore_patterns=ignore_patterns,
+                    respect_gitignore=respect_gitignore,
+                )
+                files, deleted, diffs = state.changes(files, diff)
+                header = "## Geänderte Projektdateien (seit dem letzten Export)\n"
+        compactor = Compactor(compact) if compact else None
+        # Hardlinks und inhaltsgleiche Dateien nur einmal exportieren: dieselbe
+        # Datei (Inode) vor dem Laden, gleiche Inhalte über den Hash beim Laden;
+        # gehasht werden nur Dateien, deren Größe auch eine andere hat
+        duplicates, same_size = find_duplicates(files) if dedup else ({}, set())
+
+        budget = None
+        if max_tokens is not None or max_bytes is not None:
+            # Auswahl vor dem Lesen anhand der Dateigrößen; nicht ausgewählte Dateien werden nie geöffnet
+            unit, limit = (TOKENS, max_tokens) if max_tokens is not None else (BYTES, max_bytes)
+            budget = Budget(limit, unit, priority, prefer)
+            # Was schon an der Endung scheitert (z. B. SVG), bekommt keinen Anteil
+            unique = [path for path in files if path not in duplicates and _exportable_by_name(path)]
+            selected = set(budget.plan(unique, {path: _section_frame(path) for path in unique}, budget.cost(header)))
+            files = [path for path in files if path in selected or duplicates.get(path) in selected]
+
+        sink.begin(header)
+        for section in _render_sections(
+            files, truncate_from, truncate_to, truncate_tail, jobs, budget, duplicates, compactor,
+            _resident.content if _resident is not None else metadata_cache, diffs,
+            ContentIndex(same_size) if dedup else None,
+        ):
+            sink.write("\n" + section)
+        for file_path in deleted:
+            sink.write(f"\n### {file_path}\n🗑️ Gelöscht\n---\n")
+        sink.close()
+    except ChangesError as e:
+        sink.abort()
+        print(f"❌ Änderungen seit {changed_since} nicht ermittelbar: {e}", file=sys.stderr)
+        return
+    except (OSError, subprocess.SubprocessError) as e:
+        sink.abort()
+        report(sink, f"{sink.error_prefix}: {e}")
+        return
+    except BaseException:
+        sink.abort()
+        raise
+    finally:
+        if metadata_cache is not None:
+            metadata_cache.close()
+    if state is not None:
+        # Erst nach erfolgreichem Export gilt der neue Stand als übergeben
+        try:
+            state.save()
+        except OSError as e:
+            print(f"⚠️ Exportstand nicht gespeichert ({e}).", file=sys.stderr)
+    if compactor is not None:
+        report(sink, compactor.report())
+    if budget is not None and (budget.dropped or budget.cut):
+        report(sink, f"⚠️ {budget.limit} {'Tokens' if budget.unit == TOKENS else 'Bytes'} reichen nicht für alles: "
+                      f"{len(budget.dropped)} Datei(en) ausgelassen, {len(budget.cut)} gekürzt.")
+    if sink.success_message is not None:
+        report(sink, sink.success_message)
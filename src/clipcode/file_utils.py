@@ -1,28 +1,436 @@
+import hashlib
 import os
+import threading
+import time
+from collections import deque
+from typing import Any, Iterator
 
-def find_files_with_extensions(root_path: str, extensions: list[str]) -> list[str]:
+
+class TreeFilter:
+    """Schnittstelle, über die eine Traversierung Einträge ausschließen kann.
+
+    Beim Betreten eines Verzeichnisses liefert `enter` einen Bereich (z. B. die
+    aktiven .gitignore-Regeln), der an die Filtermethoden dieses Verzeichnisses
+    und an `enter` seiner Unterverzeichnisse weitergereicht wird. Pfade werden
+    sowohl so wie gelistet (`path`) als auch relativ zur Wurzel im POSIX-Format
+    (`rel`) übergeben.
+    """
+
+    def enter(self, dir_path: str, rel_dir: str, parent_scope: Any) -> Any:
+        return parent_scope
+
+    def skip_dir(self, path: str, rel: str, scope: Any) -> bool:
+        return False
+
+    def skip_file(self, path: str, rel: str, scope: Any) -> bool:
+        return False
+
+    def filter_entries(
+        self,
+        dir_path: str,
+        rel_dir: str,
+        scope: Any,
+        dirnames: list[str],
+        filenames: list[str],
+    ) -> tuple[list[str], list[str]]:
+        """Filtert alle Einträge eines Verzeichnisses auf einmal."""
+        prefix = rel_dir + '/' if rel_dir else ''
+        dirs = [d for d in dirnames if not self.skip_dir(os.path.join(dir_path, d), prefix + d, scope)]
+        files = [f for f in filenames if not self.skip_file(os.path.join(dir_path, f), prefix + f, scope)]
+        return dirs, files
+
+    def close(self):
+        """Gibt vom Filter gehaltene Ressourcen (z. B. Hilfsprozesse) frei."""
+
+    # Name der Regeldatei je Verzeichnis (z. B. '.gitignore'), deren Änderung
+    # die Entscheidungen für den Teilbaum ändert; für den DirCache
+    ignore_file: str | None = None
+
+    def cache_key(self) -> str | None:
+        """Kennung aller übrigen Eingaben des Filters für den DirCache; None: nicht cachebar."""
+        return None
+
+
+def stat_fingerprint(path: str) -> str:
+    """Kurzkennung einer Datei aus Inode, Größe und mtime_ns; leer, wenn sie fehlt."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return ''
+    return f"{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+
+
+# Dateien und Verzeichnisse, die jünger sind, werden in keinem Cache
+# gespeichert: eine weitere Änderung innerhalb derselben Zeitstempel-Auflösung
+# wäre sonst nicht von der gespeicherten Fassung zu unterscheiden (wie "racy git")
+RACY_NS = 2_000_000_000
+
+
+class DirCache:
+    """Gefilterte Verzeichnislisten eines früheren Laufs (wie gits untracked cache).
+
+    entries bildet rel_dir auf (mtime_ns, ignore_stat, fingerprint, dirnames,
+    filenames) ab. Ein Eintrag gilt weiter, solange sich die mtime des
+    Verzeichnisses nicht geändert hat und sein fingerprint – die Kennung des
+    Filters und der Regeldateien aller Verzeichnisse bis zur Wurzel – gleich
+    ist. Dann kostet das Verzeichnis nur ein stat (plus eines für eine
+    vorhandene Regeldatei). visited sammelt die Einträge des aktuellen Laufs.
+    """
+
+    def __init__(self, key: str, entries: dict[str, tuple] | None = None):
+        self.key = key
+        self.entries = entries or {}
+        self.visited: dict[str, tuple] = {}
+        self.relisted = 0
+
+    @property
+    def changed(self) -> bool:
+        return self.relisted > 0 or self.visited.keys() != self.entries.keys()
+
+
+class _LazyScope:
+    """Bereich eines Verzeichnisses, der erst bei Bedarf per enter() ermittelt wird."""
+
+    __slots__ = ('tree_filter', 'dir_path', 'rel_dir', 'parent', 'scope', 'resolved')
+
+    def __init__(self, tree_filter: TreeFilter, dir_path: str, rel_dir: str, parent: '_LazyScope | None'):
+        self.tree_filter = tree_filter
+        self.dir_path = dir_path
+        self.rel_dir = rel_dir
+        self.parent = parent
+        self.scope = None
+        self.resolved = False
+
+    def get(self) -> Any:
+        if not self.resolved:
+            parent_scope = self.parent.get() if self.parent is not None else None
+            self.scope = self.tree_filter.enter(self.dir_path, self.rel_dir, parent_scope)
+            self.resolved = True
+        return self.scope
+
+
+def _scan_dir(dir_path: str) -> tuple[list[str], list[str], set[str]] | None:
+    """Listet ein Verzeichnis mit einem einzigen os.scandir-Aufruf.
+
+    Die Typinformation stammt aus den DirEntry-Objekten, sodass in der Regel
+    kein zusätzlicher stat-Aufruf nötig ist. Wie bei os.walk zählen symbolische
+    Links auf Verzeichnisse als Verzeichnisse, werden aber nicht betreten;
+    sie werden daher separat zurückgegeben. Nicht lesbare Verzeichnisse
+    liefern None.
+    """
+    dirnames: list[str] = []
+    filenames: list[str] = []
+    links: set[str] = set()
+    try:
+        with os.scandir(dir_path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                if is_dir:
+                    dirnames.append(entry.name)
+                    if entry.is_symlink():
+                        links.add(entry.name)
+                else:
+                    filenames.append(entry.name)
+    except OSError:
+        return None
+    return dirnames, filenames, links
+
+def list_dir(
+    dir_path: str,
+    rel_dir: str,
+    tree_filter: TreeFilter | None,
+    parent_scope: Any,
+) -> tuple[Any, list[str], list[str]] | None:
+    """Listet und filtert ein einzelnes Verzeichnis wie bei der Traversierung.
+
+    Liefert (scope, dirnames, filenames); dirnames enthält nur Verzeichnisse,
+    in die abgestiegen wird (keine symbolischen Links). Nicht lesbare
+    Verzeichnisse liefern None.
+    """
+    listing = _scan_dir(dir_path)
+    if listing is None:
+        return None
+    dirnames, filenames, links = listing
+    scope = None
+    if tree_filter is not None:
+        scope = tree_filter.enter(dir_path, rel_dir, parent_scope)
+        dirnames, filenames = tree_filter.filter_entries(dir_path, rel_dir, scope, dirnames, filenames)
+    if links:
+        dirnames = [name for name in dirnames if name not in links]
+    return scope, dirnames, filenames
+
+def _walk(root_path: str, tree_filter: TreeFilter | None = None) -> Iterator[tuple[str, str, list[str]]]:
+    """Durchläuft den Baum in derselben Reihenfolge wie os.walk (top-down).
+
+    Liefert (dirpath, rel_dir, filenames) mit rel_dir relativ zur Wurzel im
+    POSIX-Format. Einträge, die tree_filter ausschließt, werden entfernt, bevor
+    in sie abgestiegen wird, sodass ihr Inhalt gar nicht erst gelistet wird.
+    Pfade werden ausschließlich per Stringverkettung gebildet.
+    """
+    # Stapel noch nicht betretener Verzeichnisse samt Bereich des Elternverzeichnisses;
+    # bei der Tiefensuche bleibt er auf die Geschwister entlang des aktuellen Pfads begrenzt.
+    stack: list[tuple[str, str, Any]] = [(root_path, '', None)]
+    while stack:
+        dirpath, rel_dir, parent_scope = stack.pop()
+        listing = list_dir(dirpath, rel_dir, tree_filter, parent_scope)
+        if listing is None:
+            continue
+        scope, dirnames, filenames = listing
+
+        yield dirpath, rel_dir, filenames
+
+        path_prefix = dirpath if dirpath.endswith(os.sep) else dirpath + os.sep
+        rel_prefix = rel_dir + '/' if rel_dir else ''
+        for name in reversed(dirnames):
+            stack.append((path_prefix + name, rel_prefix + name, scope))
+
+def _walk_cached(
+    root_path: str,
+    tree_filter: TreeFilter | None,
+    dir_cache: DirCache,
+) -> Iterator[tuple[str, str, list[str]]]:
+    """Wie _walk, listet aber nur Verzeichnisse neu, deren DirCache-Eintrag nicht mehr gilt.
+
+    Für unveränderte Verzeichnisse werden Liste und Ignore-Entscheidungen des
+    letzten Laufs übernommen; ihre .gitignore-Bereiche werden nur ermittelt,
+    wenn ein Unterverzeichnis neu gefiltert werden muss.
+    """
+    ignore_file = tree_filter.ignore_file if tree_filter is not None else None
+    now = time.time_ns()
+    stack: list[tuple[str, str, _LazyScope | None, str]] = [(root_path, '', None, dir_cache.key)]
+    while stack:
+        dirpath, rel_dir, parent, parent_fingerprint = stack.pop()
+        try:
+            mtime_ns = os.stat(dirpath).st_mtime_ns
+        except OSError:
+            continue
+        path_prefix = dirpath if dirpath.endswith(os.sep) else dirpath + os.sep
+        cached = dir_cache.entries.get(rel_dir)
+        unchanged = cached is not None and cached[0] == mtime_ns
+
+        # Eine neu angelegte Regeldatei ändert die mtime des Verzeichnisses;
+        # eine bestehende kann auch ohne das bearbeitet worden sein
+        ignore_stat = ''
+        if ignore_file is not None and (not unchanged or cached[1]):
+            ignore_stat = stat_fingerprint(path_prefix + ignore_file)
+        fingerprint = hashlib.blake2b(
+            f"{parent_fingerprint}\0{ignore_stat}".encode(), digest_size=16
+        ).hexdigest()
+
+        scope = _LazyScope(tree_filter, dirpath, rel_dir, parent) if tree_filter is not None else None
+        if unchanged and cached[2] == fingerprint:
+            entry = cached
+        else:
+            listing = _scan_dir(dirpath)
+            if listing is None:
+                continue
+            dirnames, filenames, links = listing
+            if tree_filter is not None:
+                dirnames, filenames = tree_filter.filter_entries(
+                    dirpath, rel_dir, scope.get(), dirnames, filenames
+                )
+            dir_cache.relisted += 1
+            entry = (mtime_ns, ignore_stat, fingerprint, [d for d in dirnames if d not in links], filenames)
+        if now - mtime_ns > RACY_NS:
+            dir_cache.visited[rel_dir] = entry
+
+        yield dirpath, rel_dir, entry[4]
+
+        rel_prefix = rel_dir + '/' if rel_dir else ''
+        for name in reversed(entry[3]):
+            stack.append((path_prefix + name, rel_prefix + name, scope, fingerprint))
+
+def _walk_parallel(
+    root_path: str,
+    tree_filter: TreeFilter | None,
+    workers: int,
+) -> list[tuple[str, str, list[str]]]:
+    """Durchläuft den Baum mit mehreren Threads (für langsame/Netz-Dateisysteme).
+
+    Jeder Thread hat eine eigene Warteschlange von Verzeichnissen, die er von
+    hinten abarbeitet (Tiefensuche, gute Lokalität); ist sie leer, stiehlt er
+    von vorne aus den Warteschlangen der anderen. Da jedes Verzeichnis den
+    Bereich seines Elternverzeichnisses mitführt, greift das Pruning wie bei
+    der seriellen Traversierung pro Verzeichnis. Die Threads liefern die
+    Verzeichnisse in beliebiger Reihenfolge; zurückgegeben werden sie in der
+    Reihenfolge von _walk, sodass das Ergebnis nicht von der Thread-Anzahl abhängt.
+    """
+    queues: list[deque] = [deque() for _ in range(workers)]
+    queues[0].append((root_path, '', None))
+    # dirpath -> (rel_dir, filenames, Pfade der Unterverzeichnisse in Listenreihenfolge)
+    listings: dict[str, tuple[str, list[str], list[str]]] = {}
+    errors: list[BaseException] = []
+    condition = threading.Condition()
+    # Anzahl eingereihter, noch nicht vollständig bearbeiteter Verzeichnisse
+    outstanding = [1]
+
+    def take(index: int):
+        try:
+            return queues[index].pop()
+        except IndexError:
+            pass
+        for offset in range(1, workers):
+            try:
+                return queues[(index + offset) % workers].popleft()
+            except IndexError:
+                continue
+        return None
+
+    def run(index: int):
+        while not errors:
+            task = take(index)
+            if task is None:
+                with condition:
+                    if outstanding[0] == 0 or errors:
+                        return
+                    condition.wait(0.05)
+                continue
+
+            dirpath, rel_dir, parent_scope = task
+            children = []
+            try:
+                listing = _scan_dir(dirpath)
+                if listing is not None:
+                    dirnames, filenames, links = listing
+                    scope = None
+                    if tree_filter is not None:
+                        scope = tree_filter.enter(dirpath, rel_dir, parent_scope)
+                        dirnames, filenames = tree_filter.filter_entries(dirpath, rel_dir, scope, dirnames, filenames)
+                    path_prefix = dirpath if dirpath.endswith(os.sep) else dirpath + os.sep
+                    rel_prefix = rel_dir + '/' if rel_dir else ''
+                    children = [
+                        (path_prefix + name, rel_prefix + name, scope)
+                        for name in reversed(dirnames) if name not in links
+                    ]
+                    listings[dirpath] = (rel_dir, filenames, [child[0] for child in reversed(children)])
+            except BaseException as e:
+                with condition:
+                    errors.append(e)
+                    condition.notify_all()
+                return
+
+            with condition:
+                queues[index].extend(children)
+                outstanding[0] += len(children) - 1
+                condition.notify_all()
+
+    threads = [threading.Thread(target=run, args=(i,), daemon=True) for i in range(workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errors:
+        raise errors[0]
+
+    # Tiefensuche über die gesammelten Listen wie in _walk
+    results: list[tuple[str, str, list[str]]] = []
+    stack = [root_path]
+    while stack:
+        dirpath = stack.pop()
+        listing = listings.get(dirpath)
+        if listing is None:
+            continue
+        rel_dir, filenames, children = listing
+        results.append((dirpath, rel_dir, filenames))
+        stack.extend(reversed(children))
+    return results
+
+def _walk_entries(
+    root_path: str,
+    tree_filter: TreeFilter | None,
+    workers: int,
+    dir_cache: DirCache | None = None,
+):
+    # Mit gültigem Cache kostet ein Verzeichnis nur ein stat; Threads lohnen dann nicht
+    if dir_cache is not None:
+        return _walk_cached(root_path, tree_filter, dir_cache)
+    if workers > 1:
+        return _walk_parallel(root_path, tree_filter, workers)
+    return _walk(root_path, tree_filter)
+
+def normalize_extensions(extensions: list[str]) -> set[str]:
+    """Wandelt Endungen ohne Punkt (z. B. 'py') in kleingeschriebene Suffixe um."""
+    return {f".{ext.lower()}" for ext in extensions}
+
+def matches_extension(filename: str, normalized_exts: set[str]) -> bool:
+    """Prüft per Mengenzugriff, ob ein Suffix ab einem Punkt zu den Endungen gehört.
+
+    Geprüft wird jeder Suffix ab einem Punkt, womit auch mehrteilige Endungen
+    wie '.d.ts' oder '.test.py' ohne Vergleich gegen jede Endung erkannt werden.
+    """
+    name = filename.lower()
+    dot = name.find('.')
+    while dot != -1:
+        if name[dot:] in normalized_exts:
+            return True
+        dot = name.find('.', dot + 1)
+    return False
+
+def find_files_with_extensions(
+    root_path: str,
+    extensions: list[str],
+    tree_filter: TreeFilter | None = None,
+    workers: int = 1,
+    dir_cache: DirCache | None = None,
+) -> list[str]:
     matches = []
-    normalized_exts = {f".{ext.lower()}" for ext in extensions}
-    for dirpath, _, filenames in os.walk(root_path):
-        for filename in filenames:
-            if any(filename.lower().endswith(ext) for ext in normalized_exts):
-                matches.append(os.path.join(dirpath, filename))
+    normalized_exts = normalize_extensions(extensions)
+    for dirpath, _, filenames in _walk_entries(root_path, tree_filter, workers, dir_cache):
+        prefix = dirpath if dirpath.endswith(os.sep) else dirpath + os.sep
+        matches.extend(prefix + f for f in filenames if matches_extension(f, normalized_exts))
     return matches
 
+def read_file_bytes(path: str) -> bytes:
+    """Liest eine Datei mit einem einzigen open/read vollständig ein."""
+    with open(path, 'rb') as file:
+        return file.read()
+
+def decode_content(data: bytes, encoding: str | None = None) -> str:
+    """Dekodiert bereits gelesene Bytes als UTF-8, ersatzweise als latin1.
+
+    Ist die Kodierung bekannt (z. B. per BOM erkannt), wird sie zuerst
+    versucht. Die Fallback-Kette arbeitet auf dem vorhandenen Puffer; die
+    Datei wird dafür nicht erneut gelesen. Zeilenumbrüche (\\r\\n, \\r)
+    werden wie beim Lesen im Textmodus zu \\n.
+    """
+    text = None
+    if encoding is not None:
+        try:
+            # Das BOM selbst gehört nicht zum Inhalt
+            text = data.decode(encoding).removeprefix('\ufeff')
+        except (UnicodeDecodeError, LookupError):
+            pass
+    if text is None:
+        try:
+            text = data.decode('utf-8')
+        except UnicodeDecodeError:
+            text = data.decode('latin1')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
 def read_file_content(path: str) -> str:
     try:
-        with open(path, 'r', encoding='utf-8') as file:
-            return file.read()
-    except UnicodeDecodeError:
-        with open(path, 'r', encoding='latin1') as file:
-            return file.read()
+        return decode_content(read_file_bytes(path))
     except Exception as e:
         return f"[Fehler beim Lesen der Datei: {e}]"
 
-def find_all_files(root_path: str) -> list[str]:
-    """Findet alle Dateien rekursiv ab dem angegebenen Wurzelverzeichnis."""
+def find_all_files(
+    root_path: str,
+    tree_filter: TreeFilter | None = None,
+    workers: int = 1,
+    dir_cache: DirCache | None = None,
+) -> list[str]:
+    """Findet alle Dateien rekursiv ab dem angegebenen Wurzelverzeichnis.
+
+    Mit workers > 1 wird parallel traversiert; die Reihenfolge bleibt dieselbe.
+    Mit dir_cache werden nur geänderte Verzeichnisse neu gelistet (seriell).
+    """
     matches = []
-    for dirpath, _, filenames in os.walk(root_path):
-        for filename in filenames:
-            matches.append(os.path.join(dirpath, filename))
+    for dirpath, _, filenames in _walk_entries(root_path, tree_filter, workers, dir_cache):
+        prefix = dirpath if dirpath.endswith(os.sep) else dirpath + os.sep
+        matches.extend(prefix + f for f in filenames)
     return matches
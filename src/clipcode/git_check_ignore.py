@@ -0,0 +1,146 @@
+import os
+import subprocess
+import threading
+from typing import Any
+
+from clipcode.file_utils import TreeFilter
+
+
+# Stapel bis zu dieser Größe werden direkt geschrieben statt in einem eigenen
+# Thread; kleiner als der kleinste übliche Pipe-Puffer (macOS: 16 KiB)
+_INLINE_WRITE_MAX = 16 << 10
+
+
+class GitCheckIgnoreError(Exception):
+    """Der git check-ignore-Prozess ist nicht verfügbar oder unerwartet beendet."""
+
+
+class GitCheckIgnore(TreeFilter):
+    """Ignore-Engine auf Basis eines langlebigen `git check-ignore`-Prozesses.
+
+    Pro Export wird genau ein Prozess gestartet; alle Einträge eines
+    Verzeichnisses werden als ein Stapel über stdin geschickt. Dadurch gelten
+    exakt die Regeln von git, inklusive .git/info/exclude und core.excludesFile.
+    Mit --no-index werden wie bei der eingebauten Engine nur die Regeln
+    ausgewertet, unabhängig davon, ob eine Datei versioniert ist.
+    """
+
+    def __init__(self, root_path: str, git: str = "git"):
+        env = dict(os.environ, GIT_FLUSH="1")
+        try:
+            self._proc = subprocess.Popen(
+                [git, "-C", root_path, "check-ignore", "--stdin", "-z", "--non-matching", "-v", "--no-index"],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                env=env,
+            )
+        except OSError as e:
+            raise GitCheckIgnoreError(f"git nicht startbar: {e}") from e
+        self._pending = b""
+        # Ein Prozess, eine Pipe: parallele Traversierungen prüfen nacheinander
+        self._lock = threading.Lock()
+        # Probe: außerhalb eines Repositorys beendet sich git sofort
+        try:
+            self.check(["."])
+        except GitCheckIgnoreError:
+            self.close()
+            raise
+
+    def check(self, rel_paths: list[str]) -> list[bool]:
+        """Prüft einen Stapel von Pfaden (relativ zur Wurzel, POSIX)."""
+        if not rel_paths:
+            return []
+        with self._lock:
+            return self._check_locked(rel_paths)
+
+    def _check_locked(self, rel_paths: list[str]) -> list[bool]:
+        payload = b"".join(os.fsencode(p) + b"\0" for p in rel_paths)
+        if len(payload) <= _INLINE_WRITE_MAX:
+            # Passt sicher in die (nach dem letzten Stapel leere) stdin-Pipe:
+            # das Schreiben blockiert nicht, auch wenn git schon antwortet.
+            try:
+                self._proc.stdin.write(payload)
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError, ValueError) as e:
+                raise GitCheckIgnoreError(f"git check-ignore nicht erreichbar: {e}") from e
+            return self._parse_verdicts(self._read_fields(4 * len(rel_paths)))
+
+        # Größere Stapel in eigenem Thread schreiben, damit sich volle Pipes in
+        # beide Richtungen nicht gegenseitig blockieren.
+        write_error: list[BaseException] = []
+
+        def _write():
+            try:
+                self._proc.stdin.write(payload)
+                self._proc.stdin.flush()
+            except (BrokenPipeError, OSError, ValueError) as e:
+                write_error.append(e)
+
+        writer = threading.Thread(target=_write, daemon=True)
+        writer.start()
+        try:
+            fields = self._read_fields(4 * len(rel_paths))
+        finally:
+            writer.join()
+        if write_error:
+            raise GitCheckIgnoreError(f"git check-ignore nicht erreichbar: {write_error[0]}")
+        return self._parse_verdicts(fields)
+
+    @staticmethod
+    def _parse_verdicts(fields: list[bytes]) -> list[bool]:
+        # Je Pfad: Quelle, Zeile, Pattern, Pfad. Leeres Pattern = kein Treffer.
+        return [bool(fields[i + 2]) and not fields[i + 2].startswith(b"!") for i in range(0, len(fields), 4)]
+
+    def _read_fields(self, count: int) -> list[bytes]:
+        """Liest genau count NUL-terminierte Felder aus stdout."""
+        buffer = bytearray(self._pending)
+        available = buffer.count(b"\0")
+        while available < count:
+            chunk = self._proc.stdout.read1(65536)
+            if not chunk:
+                self._pending = b""
+                raise GitCheckIgnoreError("git check-ignore wurde unerwartet beendet")
+            buffer += chunk
+            available += chunk.count(b"\0")
+        parts = bytes(buffer).split(b"\0", count)
+        self._pending = parts[count]
+        return parts[:count]
+
+    def filter_entries(self, dir_path, rel_dir, scope, dirnames, filenames):
+        prefix = rel_dir + "/" if rel_dir else ""
+        verdicts = self.check([prefix + d for d in dirnames] + [prefix + f for f in filenames])
+        dirs = [d for d, ignored in zip(dirnames, verdicts) if not ignored]
+        files = [f for f, ignored in zip(filenames, verdicts[len(dirnames):]) if not ignored]
+        return dirs, files
+
+    def is_root_ignored(self) -> bool:
+        # Der Prozess läuft in der Wurzel; git prüft keine Pfade oberhalb davon.
+        return False
+
+    def close(self):
+        try:
+            self._proc.stdin.close()
+        except OSError:
+            pass
+        if self._proc.poll() is None:
+            try:
+                self._proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self._proc.kill()
+                self._proc.wait()
+        self._proc.stdout.close()
+
+    def __enter__(self) -> "GitCheckIgnore":
+        return self
+
+    def __exit__(self, *exc: Any):
+        self.close()
+
+
+def start_check_ignore(root_path: str) -> GitCheckIgnore | None:
+    """Startet die git-Engine oder gibt None zurück, wenn git nicht nutzbar ist."""
+    try:
+        return GitCheckIgnore(root_path)
+    except GitCheckIgnoreError:
+        return None
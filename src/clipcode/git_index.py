@@ -0,0 +1,242 @@
+import os
+import struct
+from typing import Iterator, NamedTuple
+
+from clipcode.file_utils import TreeFilter, find_all_files, matches_extension, normalize_extensions
+
+_HEADER = struct.Struct(">4sII")
+_ENTRY = struct.Struct(">10I20sH")
+
+_FLAG_EXTENDED = 0x4000
+_FLAG_STAGE_MASK = 0x3000
+_FLAG_NAME_MASK = 0x0FFF
+_EXT_FLAG_SKIP_WORKTREE = 0x4000
+
+_MODE_TYPE_MASK = 0o170000
+_MODE_DIR = 0o040000       # Sparse-Index-Verzeichniseintrag
+_MODE_GITLINK = 0o160000   # Submodul
+
+# Markiert Verzeichnisse, die der TreeFilter ausschließt
+_EXCLUDED = object()
+
+
+class GitIndexError(Exception):
+    """Die Index-Datei fehlt, ist beschädigt oder verwendet ein nicht unterstütztes Format."""
+
+
+class IndexEntry(NamedTuple):
+    """Ein Eintrag aus .git/index (Pfad relativ zum Worktree, POSIX)."""
+
+    path: str
+    mode: int
+    size: int
+    mtime_ns: int
+
+
+def find_git_dir(start_path: str) -> tuple[str, str] | None:
+    """Sucht ab start_path aufwärts nach einem Repository.
+
+    Gibt (git_dir, worktree) zurück oder None. Unterstützt sowohl ein
+    .git-Verzeichnis als auch eine .git-Datei mit 'gitdir:'-Verweis
+    (Worktrees, Submodule).
+    """
+    current = os.path.abspath(start_path)
+    while True:
+        candidate = os.path.join(current, ".git")
+        if os.path.isdir(candidate):
+            return candidate, current
+        if os.path.isfile(candidate):
+            try:
+                with open(candidate, "r", encoding="utf-8") as f:
+                    line = f.readline().strip()
+            except OSError:
+                line = ""
+            if line.startswith("gitdir:"):
+                git_dir = line[len("gitdir:"):].strip()
+                return os.path.normpath(os.path.join(current, git_dir)), current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    """Liest eine Offset-Zahl im Varint-Format von Index v4."""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def read_index(index_path: str) -> Iterator[IndexEntry]:
+    """Liest die Einträge einer git-Index-Datei (Version 2 bis 4).
+
+    Konflikteinträge (Stage > 0) werden nur einmal geliefert; Einträge mit
+    skip-worktree, Submodule und Sparse-Verzeichnisse werden übersprungen, da
+    sie keiner Datei im Arbeitsverzeichnis entsprechen.
+    """
+    try:
+        with open(index_path, "rb") as f:
+            data = f.read()
+    except OSError as e:
+        raise GitIndexError(f"Index nicht lesbar: {e}") from e
+
+    if len(data) < _HEADER.size:
+        raise GitIndexError("Index ist zu kurz")
+    signature, version, count = _HEADER.unpack_from(data, 0)
+    if signature != b"DIRC":
+        raise GitIndexError("Keine git-Index-Datei")
+    if version not in (2, 3, 4):
+        raise GitIndexError(f"Index-Version {version} wird nicht unterstützt")
+
+    offset = _HEADER.size
+    previous_name = b""
+    last_path = None
+    try:
+        for _ in range(count):
+            (_, _, mtime_s, mtime_ns, _, _, mode, _, _, size, _, flags) = _ENTRY.unpack_from(data, offset)
+            name_offset = offset + _ENTRY.size
+            extended_flags = 0
+            if version >= 3 and flags & _FLAG_EXTENDED:
+                (extended_flags,) = struct.unpack_from(">H", data, name_offset)
+                name_offset += 2
+
+            if version == 4:
+                strip, name_offset = _read_varint(data, name_offset)
+                end = data.index(b"\0", name_offset)
+                name = previous_name[:len(previous_name) - strip] + data[name_offset:end]
+                offset = end + 1
+            else:
+                name_length = flags & _FLAG_NAME_MASK
+                if name_length < _FLAG_NAME_MASK:
+                    end = name_offset + name_length
+                else:
+                    end = data.index(b"\0", name_offset)
+                name = data[name_offset:end]
+                # Einträge sind mit 1 bis 8 NUL-Bytes auf ein Vielfaches von 8 aufgefüllt
+                offset += ((name_offset - offset) + len(name) + 8) & ~7
+            previous_name = name
+
+            mode_type = mode & _MODE_TYPE_MASK
+            if mode_type in (_MODE_DIR, _MODE_GITLINK) or extended_flags & _EXT_FLAG_SKIP_WORKTREE:
+                continue
+            path = name.decode("utf-8", "surrogateescape")
+            if flags & _FLAG_STAGE_MASK and path == last_path:
+                continue
+            last_path = path
+            yield IndexEntry(path, mode, size, mtime_s * 1_000_000_000 + mtime_ns)
+    except (struct.error, ValueError, IndexError) as e:
+        raise GitIndexError(f"Index ist beschädigt: {e}") from e
+
+    _check_extensions(data, offset)
+
+
+def _check_extensions(data: bytes, offset: int):
+    """Lehnt Index-Erweiterungen ab, ohne die die Eintragsliste unvollständig ist."""
+    # Am Ende steht die Prüfsumme (SHA-1 oder SHA-256)
+    while offset + 8 <= len(data) - 20:
+        signature = data[offset:offset + 4]
+        (size,) = struct.unpack_from(">I", data, offset + 4)
+        if signature == b"link":
+            raise GitIndexError("Split-Index wird nicht unterstützt")
+        offset += 8 + size
+
+
+class _TrackedFilter(TreeFilter):
+    """Überspringt bei der Suche nach unversionierten Dateien alle versionierten."""
+
+    def __init__(self, inner: TreeFilter | None, tracked: set[str]):
+        self.inner = inner
+        self.tracked = tracked
+
+    def enter(self, dir_path, rel_dir, parent_scope):
+        if self.inner is None:
+            return None
+        return self.inner.enter(dir_path, rel_dir, parent_scope)
+
+    def filter_entries(self, dir_path, rel_dir, scope, dirnames, filenames):
+        if self.inner is not None:
+            dirnames, filenames = self.inner.filter_entries(dir_path, rel_dir, scope, dirnames, filenames)
+        prefix = rel_dir + "/" if rel_dir else ""
+        return dirnames, [f for f in filenames if prefix + f not in self.tracked]
+
+
+def find_files_from_index(
+    root_path: str,
+    extensions: list[str] | None = None,
+    tree_filter: TreeFilter | None = None,
+    include_untracked: bool = False,
+    untracked_filter: TreeFilter | None = None,
+) -> list[str]:
+    """Listet die versionierten Dateien unterhalb von root_path aus .git/index.
+
+    Es wird weder das Dateisystem durchlaufen noch git aufgerufen. tree_filter
+    wird wie bei einer Traversierung pro Verzeichnis angewendet. Mit
+    include_untracked werden zusätzlich unversionierte Dateien ergänzt, die
+    untracked_filter (typischerweise inkl. .gitignore-Regeln) nicht ausschließt.
+
+    Raises:
+        GitIndexError: Wenn root_path in keinem Repository liegt oder der Index
+            nicht gelesen werden kann.
+    """
+    found = find_git_dir(root_path)
+    if found is None:
+        raise GitIndexError(f"{root_path} liegt in keinem git-Repository")
+    git_dir, worktree = found
+
+    rel_root = os.path.relpath(os.path.abspath(root_path), worktree).replace(os.sep, "/")
+    prefix = "" if rel_root == "." else rel_root + "/"
+    normalized_exts = normalize_extensions(extensions) if extensions is not None else None
+
+    # Verzeichnisurteile und -bereiche werden pro Verzeichnis einmal ermittelt
+    scopes: dict[str, object] = {}
+    if tree_filter is not None:
+        scopes[""] = tree_filter.enter(root_path, "", None)
+
+    def dir_scope(rel_dir: str):
+        """Bereich des Verzeichnisses oder None-Marker, falls es ausgeschlossen ist."""
+        if rel_dir in scopes:
+            return scopes[rel_dir]
+        parent, _, name = rel_dir.rpartition("/")
+        parent_scope = dir_scope(parent)
+        scope = _EXCLUDED
+        if parent_scope is not _EXCLUDED:
+            parent_path = os.path.join(root_path, *parent.split("/")) if parent else root_path
+            kept, _ = tree_filter.filter_entries(parent_path, parent, parent_scope, [name], [])
+            if kept:
+                scope = tree_filter.enter(os.path.join(parent_path, name), rel_dir, parent_scope)
+        scopes[rel_dir] = scope
+        return scope
+
+    matches = []
+    tracked: set[str] = set()
+    for entry in read_index(os.path.join(git_dir, "index")):
+        if not entry.path.startswith(prefix):
+            continue
+        rel = entry.path[len(prefix):]
+        tracked.add(rel)
+        rel_dir, _, name = rel.rpartition("/")
+        if normalized_exts is not None and not matches_extension(name, normalized_exts):
+            continue
+        path = os.path.join(root_path, *rel.split("/"))
+        if tree_filter is not None:
+            scope = dir_scope(rel_dir)
+            if scope is _EXCLUDED:
+                continue
+            dir_path = os.path.dirname(path)
+            _, kept = tree_filter.filter_entries(dir_path, rel_dir, scope, [], [name])
+            if not kept:
+                continue
+        matches.append(path)
+
+    if include_untracked:
+        for path in find_all_files(root_path, _TrackedFilter(untracked_filter, tracked)):
+            if normalized_exts is None or matches_extension(os.path.basename(path), normalized_exts):
+                matches.append(path)
+
+    return matches
+
@@ -1,7 +1,9 @@
 import os
-import fnmatch
+import re
 from pathlib import Path
-from typing import List, Set
+from typing import Dict, List, Set, Tuple
+
+from clipcode.file_utils import TreeFilter, stat_fingerprint
 
 
 class GitignoreParser:
@@ -12,6 +14,7 @@ class GitignoreParser:
         self.base_dir = self.gitignore_path.parent
         self.patterns = []
         self._parse_gitignore()
+        self._compile()
     
     def _parse_gitignore(self):
         """Parst die .gitignore-Datei und extrahiert die Patterns."""
@@ -40,90 +43,208 @@ class GitignoreParser:
             # Bei Fehlern beim Lesen der .gitignore-Datei, ignoriere sie
             pass
     
-    def is_ignored(self, file_path: str) -> bool:
+    def _compile(self):
+        """Übersetzt die Patterns in vorkompilierte reguläre Ausdrücke.
+
+        Aufeinanderfolgende Regeln mit gleicher Negation werden zu einer Gruppe
+        zusammengefasst und als ein einziger Ausdruck kompiliert. Da bei git die
+        letzte passende Regel gewinnt, reicht es, die Gruppen von hinten nach
+        vorne zu prüfen: die erste Gruppe mit Treffer entscheidet.
+        """
+        self._groups: List[_RuleGroup] = []
+        for pattern_info in self.patterns:
+            regex = _pattern_to_regex(pattern_info['pattern'])
+            negated = pattern_info['negated']
+            if not self._groups or self._groups[-1].negated != negated:
+                self._groups.append(_RuleGroup(negated))
+            self._groups[-1].add(regex, pattern_info['is_dir'])
+
+        for group in self._groups:
+            group.compile()
+
+        # Urteile für Verzeichnisse (relativ zu base_dir) werden zwischengespeichert,
+        # da sie für jede Datei darunter erneut benötigt werden.
+        self._dir_cache: Dict[str, bool] = {}
+
+    def match(self, rel_path: str, is_dir: bool) -> bool | None:
+        """Wendet die Regeln auf einen relativen POSIX-Pfad an.
+
+        Gibt True (ignoriert), False (explizit wieder eingeschlossen) oder None
+        (keine Regel passt) zurück. Übergeordnete Verzeichnisse werden hier nicht
+        berücksichtigt.
+        """
+        for group in reversed(self._groups):
+            regex = group.dir_regex if is_dir else group.file_regex
+            if regex is not None and regex.match(rel_path):
+                return not group.negated
+        return None
+
+    def is_dir_ignored(self, rel_dir: str) -> bool:
+        """Prüft, ob ein Verzeichnis (relativ, POSIX) samt Inhalt ignoriert wird."""
+        cached = self._dir_cache.get(rel_dir)
+        if cached is not None:
+            return cached
+
+        parent, _, _ = rel_dir.rpartition('/')
+        # Ist ein übergeordnetes Verzeichnis ausgeschlossen, kann git nichts darin
+        # wieder einschließen.
+        ignored = (bool(parent) and self.is_dir_ignored(parent)) or self.match(rel_dir, True) is True
+        self._dir_cache[rel_dir] = ignored
+        return ignored
+
+    def is_ignored(self, file_path: str, is_dir: bool | None = None) -> bool:
         """Prüft, ob eine Datei/Verzeichnis von den gitignore-Patterns ignoriert wird."""
-        file_path_obj = Path(file_path)
-        
-        # Konvertiere zu relativem Pfad bezogen auf das .gitignore-Verzeichnis
-        try:
-            rel_path = file_path_obj.relative_to(self.base_dir)
-        except ValueError:
+        base = str(self.base_dir)
+        prefix = base if base.endswith(os.sep) else base + os.sep
+        if not file_path.startswith(prefix):
             # Datei ist nicht im Bereich dieser .gitignore
             return False
-        
-        rel_path_str = str(rel_path)
-        rel_path_posix = rel_path_str.replace(os.sep, '/')
-        
-        ignored = False
-        
-        for pattern_info in self.patterns:
-            pattern = pattern_info['pattern']
-            is_dir_pattern = pattern_info['is_dir']
-            negated = pattern_info['negated']
-            
-            # Entferne trailing slash für Verzeichnis-Patterns
-            if is_dir_pattern:
-                pattern = pattern.rstrip('/')
-            
-            matched = False
-            
-            # Verschiedene Matching-Strategien
-            if '/' in pattern:
-                # Pattern enthält Pfad-Separatoren
-                if pattern.startswith('/'):
-                    # Absoluter Pfad vom Repository-Root
-                    pattern = pattern[1:]
-                    matched = fnmatch.fnmatch(rel_path_posix, pattern)
-                    # Auch für Verzeichnisse: teste ob der Pfad mit dem Pattern beginnt
-                    if not matched and rel_path_posix.startswith(pattern):
-                        matched = True
-                else:
-                    # Relativer Pfad
-                    matched = fnmatch.fnmatch(rel_path_posix, pattern)
-                    # Auch gegen alle Teilpfade testen
-                    if not matched:
-                        path_parts = rel_path_posix.split('/')
-                        for i in range(len(path_parts)):
-                            subpath = '/'.join(path_parts[i:])
-                            if fnmatch.fnmatch(subpath, pattern):
-                                matched = True
-                                break
-            else:
-                # Einfacher Dateiname/Pattern
-                matched = fnmatch.fnmatch(rel_path.name, pattern)
-                # Auch gegen den vollständigen Pfad testen
-                if not matched:
-                    matched = fnmatch.fnmatch(rel_path_posix, pattern)
-                # Teste gegen alle Pfad-Komponenten
-                if not matched:
-                    path_parts = rel_path_posix.split('/')
-                    for part in path_parts:
-                        if fnmatch.fnmatch(part, pattern):
-                            matched = True
-                            break
-            
-            # Für Verzeichnis-Patterns: nur matchen wenn es ein Verzeichnis ist
-            if matched and is_dir_pattern and file_path_obj.is_file():
-                # Prüfe ob ein übergeordnetes Verzeichnis matched
-                parent_matched = False
-                for parent in file_path_obj.parents:
-                    try:
-                        parent_rel = parent.relative_to(self.base_dir)
-                        parent_rel_posix = str(parent_rel).replace(os.sep, '/')
-                        if fnmatch.fnmatch(parent_rel_posix, pattern):
-                            parent_matched = True
-                            break
-                    except ValueError:
-                        break
-                matched = parent_matched
-            
-            if matched:
-                if negated:
-                    ignored = False
+
+        rel_path_posix = file_path[len(prefix):].replace(os.sep, '/')
+        if not rel_path_posix:
+            return False
+
+        parent, _, _ = rel_path_posix.rpartition('/')
+        if parent and self.is_dir_ignored(parent):
+            return True
+
+        if is_dir is None:
+            is_dir = os.path.isdir(file_path)
+        if is_dir:
+            return self.is_dir_ignored(rel_path_posix)
+        return self.match(rel_path_posix, False) is True
+
+
+class _RuleGroup:
+    """Folge von Regeln gleicher Negation, kompiliert zu je einem Ausdruck."""
+
+    __slots__ = ('negated', '_all', '_files', 'dir_regex', 'file_regex')
+
+    def __init__(self, negated: bool):
+        self.negated = negated
+        self._all: List[str] = []
+        self._files: List[str] = []
+        self.dir_regex: re.Pattern | None = None
+        self.file_regex: re.Pattern | None = None
+
+    def add(self, regex: str, dir_only: bool):
+        self._all.append(regex)
+        # Verzeichnis-Patterns ('foo/') gelten nicht für Dateien
+        if not dir_only:
+            self._files.append(regex)
+
+    def compile(self):
+        self.dir_regex = _combine(self._all)
+        self.file_regex = _combine(self._files)
+
+
+def _combine(regexes: List[str]) -> re.Pattern | None:
+    if not regexes:
+        return None
+    return re.compile('(?:' + '|'.join(regexes) + r')\Z', re.DOTALL)
+
+
+def _pattern_to_regex(pattern: str) -> str:
+    """Übersetzt ein gitignore-Pattern in einen regulären Ausdruck (ohne Endanker).
+
+    Patterns mit '/' (außer am Ende) sind relativ zum .gitignore-Verzeichnis
+    verankert, alle anderen passen auf den Namen in beliebiger Tiefe.
+    """
+    pattern = pattern.rstrip('/')
+    if '/' in pattern:
+        return _glob_to_regex(pattern.lstrip('/'))
+    return '(?:.*/)?' + _glob_to_regex(pattern)
+
+
+def _glob_to_regex(glob: str) -> str:
+    """Übersetzt ein Glob nach gitignore-Regeln ('*' überschreitet kein '/')."""
+    out: List[str] = []
+    i, n = 0, len(glob)
+    while i < n:
+        c = glob[i]
+        if c == '*':
+            j = i
+            while j < n and glob[j] == '*':
+                j += 1
+            # '**' hat nur als vollständige Pfadkomponente eine Sonderbedeutung
+            if j - i >= 2 and (i == 0 or glob[i - 1] == '/') and (j == n or glob[j] == '/'):
+                if j == n:
+                    out.append('.*')
+                    i = j
                 else:
-                    ignored = True
-        
-        return ignored
+                    out.append('(?:.*/)?')
+                    i = j + 1
+                continue
+            out.append('[^/]*')
+            i = j
+        elif c == '?':
+            out.append('[^/]')
+            i += 1
+        elif c == '[':
+            j = i + 1
+            if j < n and glob[j] in '!^':
+                j += 1
+            if j < n and glob[j] == ']':
+                j += 1
+            while j < n and glob[j] != ']':
+                j += 1
+            if j >= n:
+                # Keine schließende Klammer: als Literal behandeln
+                out.append(re.escape(c))
+                i += 1
+                continue
+            stuff = glob[i + 1:j]
+            negated = stuff[:1] in ('!', '^')
+            if negated:
+                stuff = stuff[1:]
+            stuff = stuff.replace('\\', '\\\\')
+            if stuff.startswith('^'):
+                stuff = '\\' + stuff
+            out.append(f'[^/{stuff}]' if negated else f'[{stuff}]')
+            i = j + 1
+        elif c == '\\' and i + 1 < n:
+            out.append(re.escape(glob[i + 1]))
+            i += 2
+        else:
+            out.append(re.escape(c))
+            i += 1
+    return ''.join(out)
+
+
+class GitignoreRegistry:
+    """Zwischenspeicher für geparste .gitignore-Dateien.
+
+    Jede Datei wird nur einmal gelesen und geparst. Ändern sich mtime oder
+    Größe, wird sie beim nächsten Zugriff neu geparst, sodass eine Registry
+    auch von langlebigen Aufrufern wiederverwendet werden kann.
+    """
+
+    def __init__(self):
+        self._parsers: Dict[str, Tuple[Tuple[int, int], GitignoreParser]] = {}
+
+    def get(self, gitignore_path: str) -> GitignoreParser:
+        """Liefert den (ggf. zwischengespeicherten) Parser für eine .gitignore-Datei."""
+        key = str(gitignore_path)
+        try:
+            st = os.stat(key)
+            fingerprint = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            fingerprint = (-1, -1)
+
+        cached = self._parsers.get(key)
+        if cached is not None and cached[0] == fingerprint:
+            return cached[1]
+
+        parser = GitignoreParser(key)
+        self._parsers[key] = (fingerprint, parser)
+        return parser
+
+    def clear(self):
+        """Verwirft alle zwischengespeicherten Parser."""
+        self._parsers.clear()
+
+    def __len__(self) -> int:
+        return len(self._parsers)
 
 
 def find_gitignore_files(start_path: str) -> List[str]:
@@ -144,48 +265,167 @@ def find_gitignore_files(start_path: str) -> List[str]:
     return gitignore_files
 
 
-def should_ignore_file(file_path: str, gitignore_files: List[str]) -> bool:
+def should_ignore_file(
+    file_path: str,
+    gitignore_files: List[str],
+    registry: GitignoreRegistry | None = None,
+    is_dir: bool | None = None,
+) -> bool:
     """Prüft, ob eine Datei von einer der .gitignore-Dateien ignoriert werden soll."""
-    file_path_obj = Path(file_path)
-    
     # Hardcoded: .git-Ordner immer ausschließen
-    if '.git' in file_path_obj.parts:
+    if '.git' in file_path.split(os.sep):
         return True
     
+    if registry is None:
+        registry = GitignoreRegistry()
+
     # Prüfe gegen alle .gitignore-Dateien
     for gitignore_file in gitignore_files:
-        parser = GitignoreParser(gitignore_file)
-        if parser.is_ignored(file_path):
+        parser = registry.get(gitignore_file)
+        if parser.is_ignored(file_path, is_dir):
             return True
     
     return False
 
 
-def filter_files_by_gitignore(files: List[str], root_path: str) -> List[str]:
+def filter_files_by_gitignore(
+    files: List[str],
+    root_path: str,
+    registry: GitignoreRegistry | None = None,
+) -> List[str]:
     """Filtert eine Liste von Dateien basierend auf .gitignore-Regeln."""
     # Normalisiere Root- und Dateipfade auf absolute Pfade, damit das Matching konsistent ist
-    abs_root = Path(root_path).resolve()
-    gitignore_files = find_gitignore_files(str(abs_root))
+    abs_root = os.path.realpath(root_path)
+    gitignore_files = find_gitignore_files(abs_root)
+    # Eine Registry für den gesamten Lauf: jede .gitignore wird genau einmal geparst
+    if registry is None:
+        registry = GitignoreRegistry()
 
     filtered_files: List[str] = []
     for file_path in files:
-        p = Path(file_path)
-        abs_file = p if p.is_absolute() else (abs_root / p).resolve()
+        # Reine Stringoperationen statt Path-Objekten pro Datei
+        abs_file = os.path.normpath(file_path if os.path.isabs(file_path) else os.path.join(abs_root, file_path))
+        parts = abs_file.split(os.sep)
 
         # Immer .git-Ordner ausschließen
-        if '.git' in abs_file.parts:
+        if '.git' in parts:
             continue
 
         # .gitignore-Dateien selbst ausschließen
-        if abs_file.name == '.gitignore':
+        if parts[-1] == '.gitignore':
             continue
 
         # Gitignore-Regeln anwenden, falls vorhanden
         if gitignore_files:
-            if not should_ignore_file(str(abs_file), gitignore_files):
-                filtered_files.append(str(abs_file))
+            if not should_ignore_file(abs_file, gitignore_files, registry, is_dir=False):
+                filtered_files.append(abs_file)
         else:
             # Keine .gitignore-Dateien vorhanden, Datei einschließen
-            filtered_files.append(str(abs_file))
+            filtered_files.append(abs_file)
 
     return filtered_files
+
+
+class GitignoreScope:
+    """Glied einer Kette aktiver .gitignore-Dateien während einer Traversierung.
+
+    Pfade werden relativ zur Traversierungswurzel (POSIX) übergeben. `strip`
+    entfernt das Präfix bis zum Verzeichnis der .gitignore (verschachtelte
+    Dateien), `prepend` ergänzt den Weg von einer übergeordneten .gitignore
+    bis zur Wurzel.
+    """
+
+    __slots__ = ('parent', 'parser', 'strip', 'prepend')
+
+    def __init__(self, parent: 'GitignoreScope | None', parser: GitignoreParser, strip: int = 0, prepend: str = ''):
+        self.parent = parent
+        self.parser = parser
+        self.strip = strip
+        self.prepend = prepend
+
+
+class GitignoreScopes(TreeFilter):
+    """Lädt .gitignore-Dateien während einer Traversierung bei Bedarf.
+
+    Die .gitignore eines Verzeichnisses wird erst gelesen, wenn die Traversierung
+    das Verzeichnis betritt, und gilt nur für dessen Teilbaum. Jeder Bereich
+    verweist auf den übergeordneten; verlässt die Traversierung ein Verzeichnis,
+    wird sein Bereich nicht mehr referenziert und samt Parser freigegeben. Nur
+    die .gitignore-Dateien oberhalb der Wurzel und an der Wurzel landen in der
+    (ggf. geteilten) Registry; verschachtelte Parser werden direkt erzeugt, damit
+    der Speicherbedarf nur mit der Tiefe des Baums wächst. Wie bei git hat die
+    tiefste .gitignore mit passender Regel Vorrang.
+    """
+
+    def __init__(self, root_path: str, registry: GitignoreRegistry | None = None):
+        self.registry = registry if registry is not None else GitignoreRegistry()
+        self.abs_root = str(Path(root_path).resolve())
+
+        # .gitignore-Dateien oberhalb der Wurzel (und der Wurzel selbst) bilden
+        # die äußersten Bereiche; die oberste zuerst.
+        self._root_scope: GitignoreScope | None = None
+        self._ancestors: List[Tuple[GitignoreParser, str]] = []
+        for gitignore_file in reversed(find_gitignore_files(self.abs_root)):
+            parser = self.registry.get(gitignore_file)
+            base = str(parser.base_dir)
+            rel_root = os.path.relpath(self.abs_root, base).replace(os.sep, '/')
+            prepend = '' if rel_root == '.' else rel_root + '/'
+            if prepend:
+                self._ancestors.append((parser, prepend[:-1]))
+            self._root_scope = GitignoreScope(self._root_scope, parser, 0, prepend)
+
+    ignore_file = '.gitignore'
+
+    def cache_key(self) -> str:
+        """Kennung der .gitignore-Dateien oberhalb der Wurzel (auch fehlender).
+
+        Die .gitignore der Wurzel und ihrer Unterverzeichnisse prüft der
+        DirCache selbst pro Verzeichnis.
+        """
+        parts = []
+        current = Path(self.abs_root).parent
+        while True:
+            parts.append(f"{current}={stat_fingerprint(str(current / '.gitignore'))}")
+            if current.parent == current:
+                break
+            current = current.parent
+        return "builtin;" + ";".join(parts)
+
+    def root_scope(self) -> GitignoreScope | None:
+        """Bereichskette, die für die Traversierungswurzel gilt."""
+        return self._root_scope
+
+    def is_root_ignored(self) -> bool:
+        """Prüft, ob die Wurzel selbst von einer übergeordneten .gitignore ausgeschlossen ist."""
+        return any(parser.is_dir_ignored(rel_root) for parser, rel_root in self._ancestors)
+
+    def enter(self, dir_path: str, rel_dir: str, parent: GitignoreScope | None) -> GitignoreScope | None:
+        """Betritt ein Unterverzeichnis und lädt ggf. dessen .gitignore."""
+        if not rel_dir:
+            return self._root_scope
+        gitignore_path = os.path.join(dir_path, '.gitignore')
+        if not os.path.isfile(gitignore_path):
+            return parent
+        # Nicht über die Registry: sie hielte den Parser (samt Verzeichnis-Cache)
+        # über das Verlassen des Verzeichnisses hinaus am Leben.
+        parser = GitignoreParser(gitignore_path)
+        # Der Parser kennt nur absolute Pfade; innerhalb der Traversierung wird
+        # direkt mit Pfaden relativ zum .gitignore-Verzeichnis gematcht.
+        return GitignoreScope(parent, parser, len(rel_dir) + 1)
+
+    @staticmethod
+    def is_ignored(rel_path: str, is_dir: bool, scope: GitignoreScope | None) -> bool:
+        """Prüft einen Pfad (relativ zur Wurzel, POSIX) gegen die aktive Bereichskette."""
+        node = scope
+        while node is not None:
+            verdict = node.parser.match(node.prepend + rel_path[node.strip:], is_dir)
+            if verdict is not None:
+                return verdict
+            node = node.parent
+        return False
+
+    def skip_dir(self, path: str, rel: str, scope: GitignoreScope | None) -> bool:
+        return self.is_ignored(rel, True, scope)
+
+    def skip_file(self, path: str, rel: str, scope: GitignoreScope | None) -> bool:
+        return self.is_ignored(rel, False, scope)
@@ -0,0 +1,89 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+
+# Ereignismasken aus <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Änderungen am Inhalt bzw. an der Liste eines Verzeichnisses
+CONTENT_EVENTS = IN_MODIFY | IN_CLOSE_WRITE
+ENTRY_EVENTS = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO
+
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 1 << 16
+
+
+class Inotify:
+    """Dünne Hülle um die inotify-Systemaufrufe der libc (über ctypes).
+
+    Jedes Verzeichnis wird einzeln beobachtet; read() liefert die Ereignisse
+    als (wd, mask, name) mit dem Namen relativ zum beobachteten Verzeichnis.
+
+    Raises:
+        OSError: Wenn inotify nicht verfügbar ist (kein Linux, Limit erreicht).
+    """
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library("c")
+        try:
+            self._libc = ctypes.CDLL(libc_name, use_errno=True)
+            init = self._libc.inotify_init1
+        except (OSError, AttributeError) as e:
+            raise OSError(errno.ENOSYS, f"inotify nicht verfügbar: {e}") from e
+        self.fd = init(os.O_CLOEXEC | os.O_NONBLOCK)
+        if self.fd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error))
+
+    def add_watch(self, path: str, mask: int) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), ctypes.c_uint32(mask))
+        if wd < 0:
+            error = ctypes.get_errno()
+            raise OSError(error, os.strerror(error), path)
+        return wd
+
+    def rm_watch(self, wd: int) -> None:
+        # Bereits vom Kernel entfernte Watches (gelöschte Verzeichnisse) sind kein Fehler
+        self._libc.inotify_rm_watch(self.fd, wd)
+
+    def read(self, timeout: float | None) -> list[tuple[int, int, str]]:
+        """Wartet höchstens timeout Sekunden auf Ereignisse und liefert alle anstehenden."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, _READ_SIZE)
+            except BlockingIOError:
+                return events
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+                offset += length
+                events.append((wd, mask, name))
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,350 @@
+import hashlib
+import mmap
+import threading
+from collections.abc import Container, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, BinaryIO, NamedTuple
+
+from clipcode.classifier import DEFAULT_CLASSIFIER, TEXT, ContentClassifier
+from clipcode.file_utils import decode_content
+
+if TYPE_CHECKING:
+    from clipcode.cache import MetadataCache
+
+# Größe der Lesestücke für Klassifizierung und Kopfbereich
+_CHUNK_SIZE = 1 << 16
+# Größe des wiederverwendeten Puffers, in dem der Rest nur gezählt wird
+_COUNT_BUFFER_SIZE = 1 << 20
+# Obergrenze für geladene, aber noch nicht ausgegebene Inhalte beim parallelen Laden
+MAX_IN_FLIGHT_BYTES = 64 << 20
+# Höchstens so viele Dateien pro Thread gleichzeitig in Arbeit oder im Puffer
+_WINDOW_PER_JOB = 4
+
+
+class LoadedFile(NamedTuple):
+    """Exportierbarer Inhalt einer Datei.
+
+    line_count ist die Zeilenzahl der gesamten Datei, kept_lines die Anzahl
+    der behaltenen Zeilen (bei ungekürzten Dateien identisch). Bei gekürzten
+    Dateien enthält content den Kopfbereich und tail die letzten tail_lines
+    Zeilen; dazwischen liegt der ausgelassene Bereich. digest ist der
+    BLAKE2b-Hash der gesamten Datei, berechnet beim selben Lesevorgang, oder
+    None, wenn er nicht angefordert wurde.
+    """
+
+    content: str
+    line_count: int
+    kept_lines: int
+    tail: str = ""
+    tail_lines: int = 0
+    digest: bytes | None = None
+
+    @property
+    def truncated(self) -> bool:
+        return self.kept_lines < self.line_count
+
+    @property
+    def head_lines(self) -> int:
+        return self.kept_lines - self.tail_lines
+
+    @property
+    def omitted(self) -> tuple[int, int] | None:
+        """Ausgelassene Zeilen als 1-basierter, inklusiver Bereich (erste, letzte)."""
+        if not self.truncated:
+            return None
+        return self.head_lines + 1, self.line_count - self.tail_lines
+
+
+def load_file(
+    path: str,
+    truncate_from: int = 3000,
+    truncate_to: int = 500,
+    classifier: ContentClassifier = DEFAULT_CLASSIFIER,
+    truncate_tail: int = 0,
+    hash_content: bool = False,
+) -> LoadedFile | None:
+    """Öffnet und liest eine Datei genau einmal, klassifiziert und dekodiert sie.
+
+    Dateien mit mehr als truncate_from Zeilen werden auf die ersten
+    truncate_to und die letzten truncate_tail Zeilen gekürzt, ohne die ganze
+    Datei zu dekodieren oder in Zeilen zu zerlegen: gelesen wird in
+    Binärstücken, gepuffert wird höchstens bis zur Grenze, der Rest wird nur
+    auf Zeilenumbrüche gezählt. Der Endbereich wird rückwärts vom Dateiende
+    einer per mmap eingeblendeten Datei gesucht. Sind beide Fenster 0, wird
+    eine Datei verworfen, sobald die Grenze überschritten ist, ohne den Rest
+    zu lesen. Mit hash_content wird nebenbei der Inhalts-Hash für die
+    Duplikaterkennung gebildet, ohne die Datei ein weiteres Mal zu lesen.
+
+    Gibt None zurück, wenn die Datei nicht exportiert werden soll.
+    """
+    # Regeln nach Endung (z. B. SVG) greifen, bevor die Datei geöffnet wird
+    by_name = classifier.classify_name(path)
+    if by_name is not None and by_name.kind != TEXT:
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            chunk = f.read(_CHUNK_SIZE)
+            classification = classifier.classify(chunk)
+            if classification.kind != TEXT:
+                return None
+            if classification.encoding is not None:
+                # Bei Mehrbyte-Kodierungen (BOM) sind Zeilenumbrüche keine einzelnen Bytes
+                return _load_decoded(
+                    chunk + f.read(), classification.encoding, truncate_from, truncate_to, truncate_tail,
+                    hash_content,
+                )
+            return _load_streaming(f, chunk, truncate_from, truncate_to, truncate_tail, hash_content)
+    except OSError:
+        # If we can't read it, treat it as non-exportable for safety.
+        return None
+
+
+class _NoHash:
+    """Steht für den Hasher, wenn kein Inhalts-Hash angefordert wurde."""
+
+    def update(self, data) -> None:
+        pass
+
+    def digest(self) -> None:
+        return None
+
+
+class _NewlineNormalizer:
+    """Wandelt \\r\\n und \\r stückweise in \\n um.
+
+    Ein \\r am Ende eines Stücks wird zurückgehalten, bis das nächste Stück
+    zeigt, ob es zu einem \\r\\n gehört. seen_cr merkt sich, ob die Datei
+    überhaupt \\r enthält.
+    """
+
+    def __init__(self):
+        self.pending_cr = False
+        self.seen_cr = False
+
+    def feed(self, chunk: bytes) -> bytes:
+        if self.pending_cr:
+            self.pending_cr = False
+            if not chunk.startswith(b"\n"):
+                chunk = b"\n" + chunk
+        if b"\r" not in chunk:
+            return chunk
+        self.seen_cr = True
+        if chunk.endswith(b"\r"):
+            self.pending_cr = True
+            chunk = chunk[:-1]
+        return chunk.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+
+    def finish(self) -> bytes:
+        pending, self.pending_cr = self.pending_cr, False
+        return b"\n" if pending else b""
+
+
+def _load_streaming(
+    f: BinaryIO, chunk: bytes, truncate_from: int, truncate_to: int, truncate_tail: int, hash_content: bool
+) -> LoadedFile | None:
+    # Gezählt und gepuffert wird der Inhalt mit \n als einzigem Zeilenumbruch
+    normalizer = _NewlineNormalizer()
+    hasher = hashlib.blake2b(chunk) if hash_content else _NoHash()
+    chunk = normalizer.feed(chunk)
+    buffer = bytearray()
+    newlines = 0
+    at_eof = False
+    while True:
+        buffer += chunk
+        newlines += chunk.count(b"\n")
+        if newlines > truncate_from:
+            break
+        chunk = f.read(_CHUNK_SIZE)
+        hasher.update(chunk)
+        if not chunk:
+            chunk = normalizer.finish()
+            buffer += chunk
+            newlines += chunk.count(b"\n")
+            at_eof = True
+            break
+        chunk = normalizer.feed(chunk)
+
+    if at_eof:
+        line_count = newlines + (1 if buffer and not buffer.endswith(b"\n") else 0)
+        if line_count <= truncate_from:
+            return LoadedFile(decode_content(bytes(buffer)), line_count, line_count, digest=hasher.digest())
+
+    if truncate_to + truncate_tail == 0:
+        # Große Datei ignorieren, ohne den Rest zu lesen
+        return None
+
+    # Kopfbereich: alles bis vor den Umbruch der letzten behaltenen Zeile
+    end = -1
+    for _ in range(truncate_to):
+        end = buffer.find(b"\n", end + 1)
+    head = bytes(buffer[:end]) if truncate_to else b""
+
+    terminated = buffer.endswith(b"\n") or normalizer.pending_cr
+    seen_cr = normalizer.seen_cr
+    if not at_eof:
+        del buffer
+        newlines, terminated, remaining_cr = _count_remaining_newlines(
+            f, newlines, terminated, normalizer.pending_cr, hasher
+        )
+        seen_cr = seen_cr or remaining_cr
+    line_count = newlines + (0 if terminated else 1)
+
+    tail = _read_tail(f, truncate_tail, seen_cr) if truncate_tail else b""
+    return LoadedFile(
+        decode_content(head), line_count, truncate_to + truncate_tail, decode_content(tail), truncate_tail,
+        hasher.digest(),
+    )
+
+
+def _read_tail(f: BinaryIO, lines: int, seen_cr: bool = False) -> bytes:
+    """Liefert die letzten Zeilen der Datei ohne abschließenden Umbruch.
+
+    Die Datei wird per mmap eingeblendet und vom Ende her rückwärts nach
+    Zeilenumbrüchen durchsucht; der Bereich davor wird nicht angefasst.
+    Nur wenn die Datei \\r enthält (seen_cr), zählen auch \\r\\n und \\r.
+    """
+    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        end = len(mm)
+        if mm[end - 1:end] == b"\n":
+            end -= 1
+        if seen_cr and mm[end - 1:end] == b"\r":
+            end -= 1
+        start = search = end
+        for _ in range(lines):
+            found = mm.rfind(b"\n", 0, search)
+            if seen_cr:
+                found = max(found, mm.rfind(b"\r", 0, search))
+            if found < 0:
+                start = 0
+                break
+            start = found + 1
+            # \r\n ist ein einziger Umbruch
+            search = found - 1 if found and mm[found - 1:found + 1] == b"\r\n" else found
+        return mm[start:end]
+
+
+def _count_remaining_newlines(
+    f: BinaryIO, newlines: int, terminated: bool, pending_cr: bool, hasher
+) -> tuple[int, bool, bool]:
+    """Zählt die Zeilenumbrüche (\\n, \\r\\n, \\r) im Rest der Datei in einem wiederverwendeten Puffer.
+
+    pending_cr gibt an, ob das bereits gelesene Stück auf ein noch nicht
+    gezähltes \\r endete, terminated, ob es auf einen Umbruch endete. Liefert
+    die Anzahl, ob die Datei mit einem Umbruch endet und ob im Rest ein \\r
+    vorkam. hasher erhält den Rest der Datei.
+    """
+    count_buffer = bytearray(_COUNT_BUFFER_SIZE)
+    view = memoryview(count_buffer)
+    if pending_cr:
+        newlines += 1
+    previous_cr = pending_cr
+    seen_cr = False
+    while True:
+        n = f.readinto(count_buffer)
+        if not n:
+            return newlines, terminated, seen_cr
+        hasher.update(view[:n])
+        newlines += count_buffer.count(b"\n", 0, n)
+        crs = count_buffer.count(b"\r", 0, n)
+        if crs:
+            seen_cr = True
+            newlines += crs - count_buffer.count(b"\r\n", 0, n)
+        if previous_cr and count_buffer[0] == 0x0A:
+            newlines -= 1
+        previous_cr = count_buffer[n - 1] == 0x0D
+        terminated = count_buffer[n - 1] in (0x0A, 0x0D)
+
+
+def _load_decoded(
+    data: bytes, encoding: str, truncate_from: int, truncate_to: int, truncate_tail: int, hash_content: bool
+) -> LoadedFile | None:
+    content = decode_content(data, encoding)
+    digest = hashlib.blake2b(data).digest() if hash_content else None
+    lines = content.split("\n")
+    if lines[-1] == "":
+        lines.pop()
+    line_count = len(lines)
+    if line_count <= truncate_from:
+        return LoadedFile(content, line_count, line_count, digest=digest)
+    if truncate_to + truncate_tail == 0:
+        return None
+    tail = "\n".join(lines[line_count - truncate_tail:]) if truncate_tail else ""
+    return LoadedFile(
+        "\n".join(lines[:truncate_to]), line_count, truncate_to + truncate_tail, tail, truncate_tail, digest
+    )
+
+
+def load_files(
+    paths: Sequence[str],
+    truncate_from: int = 3000,
+    truncate_to: int = 500,
+    truncate_tail: int = 0,
+    jobs: int = 1,
+    max_in_flight: int = MAX_IN_FLIGHT_BYTES,
+    cache: "MetadataCache | None" = None,
+    hash_paths: Container[str] = (),
+) -> Iterator[tuple[str, LoadedFile | None]]:
+    """Lädt Dateien mit bis zu jobs Threads und liefert sie in Eingabereihenfolge.
+
+    Fertige Dateien, deren Vorgänger noch laden, warten in einem
+    Reihenfolgepuffer. Neue Dateien werden nur angestoßen, solange der Puffer
+    weniger als max_in_flight Bytes hält und höchstens jobs * 4 Dateien
+    unterwegs sind; eine langsame Datei hält so nicht beliebig viel Inhalt
+    im Speicher fest. Mit cache werden unveränderte Dateien aus dem
+    Metadaten-Cache geliefert, statt sie zu lesen. Für Dateien in hash_paths
+    wird der Inhalts-Hash gebildet.
+    """
+    def load(path: str) -> LoadedFile | None:
+        hash_content = path in hash_paths
+        if cache is not None:
+            return cache.load(path, truncate_from, truncate_to, truncate_tail, hash_content)
+        return load_file(path, truncate_from, truncate_to, truncate_tail=truncate_tail, hash_content=hash_content)
+
+    if jobs <= 1:
+        for path in paths:
+            yield path, load(path)
+        return
+
+    condition = threading.Condition()
+    # Index -> (LoadedFile | None, Ausnahme | None) fertiger, noch nicht ausgegebener Dateien
+    finished: dict[int, tuple[LoadedFile | None, BaseException | None]] = {}
+    held = [0]
+    window = jobs * _WINDOW_PER_JOB
+
+    def task(index: int) -> None:
+        loaded, error = None, None
+        try:
+            loaded = load(paths[index])
+        except BaseException as e:
+            error = e
+        with condition:
+            finished[index] = (loaded, error)
+            if loaded is not None:
+                held[0] += len(loaded.content) + len(loaded.tail)
+            condition.notify()
+
+    pool = ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="clipcode-load")
+    next_submit = 0
+    try:
+        for next_yield in range(len(paths)):
+            with condition:
+                while True:
+                    while (
+                        next_submit < len(paths)
+                        and next_submit - next_yield < window
+                        and held[0] < max_in_flight
+                    ):
+                        pool.submit(task, next_submit)
+                        next_submit += 1
+                    if next_yield in finished:
+                        break
+                    condition.wait()
+                loaded, error = finished.pop(next_yield)
+                if loaded is not None:
+                    held[0] -= len(loaded.content) + len(loaded.tail)
+            if error is not None:
+                raise error
+            yield paths[next_yield], loaded
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
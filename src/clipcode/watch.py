@@ -0,0 +1,263 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from clipcode.exporter import ExportTreeFilter, Sink, format_section, report, select_sink
+from clipcode.file_utils import list_dir, matches_extension, normalize_extensions
+from clipcode.gitignore_utils import GitignoreScopes
+from clipcode.inotify import CONTENT_EVENTS, ENTRY_EVENTS, IN_IGNORED, IN_ISDIR, IN_ONLYDIR, IN_Q_OVERFLOW, Inotify
+from clipcode.loader import load_files
+
+# Wartezeit nach dem letzten Ereignis, bevor neu veröffentlicht wird (Sekunden)
+DEFAULT_DEBOUNCE = 0.3
+# Wie oft ein Stopp-Signal geprüft wird, solange keine Ereignisse kommen
+_STOP_POLL = 0.1
+
+_WATCH_MASK = CONTENT_EVENTS | ENTRY_EVENTS | IN_ONLYDIR
+_MISSING = object()
+
+
+class _WatchSession:
+    """Hält Dateiliste und formatierte Abschnitte eines Exports im Speicher.
+
+    Jedes nicht ausgeschlossene Verzeichnis wird per inotify beobachtet.
+    Inhaltsänderungen verwerfen nur den Abschnitt der betroffenen Datei;
+    neue, gelöschte oder verschobene Einträge listen nur ihr Verzeichnis neu,
+    eine geänderte .gitignore den Teilbaum ihres Verzeichnisses. Beim
+    Veröffentlichen werden nur fehlende Abschnitte geladen.
+    """
+
+    def __init__(
+        self,
+        root_path: str,
+        extensions: list[str] | None,
+        respect_gitignore: bool,
+        ignore_patterns: list[str] | None,
+        truncate_from: int,
+        truncate_to: int,
+        truncate_tail: int,
+        jobs: int,
+        inotify: Inotify,
+    ):
+        self.root_path = root_path
+        self.respect_gitignore = respect_gitignore
+        self.ignore_patterns = ignore_patterns
+        self.normalized_exts = normalize_extensions(extensions) if extensions is not None else None
+        self.truncation = (truncate_from, truncate_to, truncate_tail)
+        self.jobs = jobs
+        self.inotify = inotify
+        # Wie bei exporter._export_file_list: absolute Pfade bei aktivem .gitignore-Respekt
+        self.path_prefix = os.path.join(os.path.realpath(root_path) if respect_gitignore else root_path, '')
+        # rel_dir -> (Unterverzeichnisse, exportierbare Dateinamen)
+        self.dirs: dict[str, tuple[list[str], list[str]]] = {}
+        self.watches: dict[int, str] = {}
+        # Exportpfad -> Abschnitt (None: nicht exportierbar)
+        self.sections: dict[str, str | None] = {}
+        self._create_filter()
+        self._scan('', recursive=True)
+
+    def _create_filter(self) -> None:
+        # Die Bereiche oberhalb und an der Wurzel liest GitignoreScopes beim Anlegen
+        engine = GitignoreScopes(self.root_path) if self.respect_gitignore else None
+        self.tree_filter = ExportTreeFilter(self.ignore_patterns, engine)
+        self.root_ignored = engine is not None and engine.is_root_ignored()
+
+    def _dir_path(self, rel_dir: str) -> str:
+        return os.path.join(self.root_path, *rel_dir.split('/')) if rel_dir else self.root_path
+
+    def _export_path(self, rel_dir: str, name: str) -> str:
+        return self.path_prefix + (rel_dir.replace('/', os.sep) + os.sep if rel_dir else '') + name
+
+    def _parent_scope(self, rel_dir: str):
+        """Bereich des Elternverzeichnisses, aufgebaut entlang des Pfads ab der Wurzel."""
+        if not rel_dir:
+            return None
+        scope = self.tree_filter.enter(self.root_path, '', None)
+        rel = ''
+        for part in rel_dir.split('/')[:-1]:
+            rel = rel + '/' + part if rel else part
+            scope = self.tree_filter.enter(self._dir_path(rel), rel, scope)
+        return scope
+
+    def _scan(self, rel_dir: str, recursive: bool) -> bool:
+        """Listet ein Verzeichnis neu, mit recursive samt Teilbaum, sonst nur neue Unterverzeichnisse."""
+        if self.root_ignored:
+            return False
+        changed = False
+        stack = [(rel_dir, self._parent_scope(rel_dir))]
+        while stack:
+            rel, parent_scope = stack.pop()
+            dir_path = self._dir_path(rel)
+            listing = list_dir(dir_path, rel, self.tree_filter, parent_scope)
+            if listing is None:
+                changed |= self._forget(rel)
+                continue
+            scope, dirnames, filenames = listing
+            if self.normalized_exts is not None:
+                filenames = [f for f in filenames if matches_extension(f, self.normalized_exts)]
+
+            old = self.dirs.get(rel)
+            if old is None:
+                self._watch(rel, dir_path)
+            self.dirs[rel] = (dirnames, filenames)
+            changed |= old != (dirnames, filenames)
+
+            prefix = rel + '/' if rel else ''
+            for name in old[0] if old is not None else ():
+                if name not in dirnames:
+                    self._forget(prefix + name)
+            for name in dirnames:
+                if recursive or prefix + name not in self.dirs:
+                    stack.append((prefix + name, scope))
+        return changed
+
+    def _watch(self, rel_dir: str, dir_path: str) -> None:
+        try:
+            self.watches[self.inotify.add_watch(dir_path, _WATCH_MASK)] = rel_dir
+        except OSError as e:
+            print(f"⚠️ Verzeichnis wird nicht beobachtet ({e}).", file=sys.stderr)
+
+    def _forget(self, rel_dir: str) -> bool:
+        """Entfernt ein Verzeichnis samt Teilbaum aus Liste und Beobachtung."""
+        prefix = rel_dir + '/'
+        gone = {d for d in self.dirs if not rel_dir or d == rel_dir or d.startswith(prefix)}
+        for d in gone:
+            del self.dirs[d]
+        for wd, d in list(self.watches.items()):
+            if d in gone:
+                self.inotify.rm_watch(wd)
+                del self.watches[wd]
+        return bool(gone)
+
+    def handle(self, events: list[tuple[int, int, str]]) -> bool:
+        """Wendet inotify-Ereignisse an; True, wenn sich der Export ändert."""
+        changed = False
+        relist: set[str] = set()
+        rescan: set[str] = set()
+        for wd, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # Ereignisse verloren: alles neu aufbauen
+                rescan.add('')
+                self.sections.clear()
+                continue
+            rel_dir = self.watches.get(wd)
+            if rel_dir is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.watches[wd]
+                continue
+            if rel_dir not in self.dirs:
+                continue
+            if name == '.gitignore':
+                rescan.add(rel_dir)
+            elif mask & ENTRY_EVENTS:
+                relist.add(rel_dir)
+            if not mask & IN_ISDIR and self.sections.pop(self._export_path(rel_dir, name), _MISSING) is not _MISSING:
+                changed = True
+
+        for rel_dir in sorted(rescan):
+            if not rel_dir:
+                self._create_filter()
+                if self.root_ignored:
+                    changed |= self._forget('')
+            changed |= self._scan(rel_dir, recursive=True)
+        for rel_dir in sorted(relist):
+            if rel_dir in self.dirs:
+                changed |= self._scan(rel_dir, recursive=False)
+        return changed
+
+    def files(self) -> list[str]:
+        """Aktuelle Dateiliste, Verzeichnisse top-down in Namensreihenfolge."""
+        files = []
+        for rel_dir in sorted(self.dirs, key=lambda rel: rel.split('/')):
+            files.extend(self._export_path(rel_dir, name) for name in self.dirs[rel_dir][1])
+        return files
+
+    def render(self) -> list[str]:
+        """Lädt fehlende Abschnitte und liefert alle in Dateireihenfolge."""
+        files = self.files()
+        missing = [path for path in files if path not in self.sections]
+        truncate_from, truncate_to, truncate_tail = self.truncation
+        for path, loaded in load_files(missing, truncate_from, truncate_to, truncate_tail, self.jobs):
+            self.sections[path] = (
+                format_section(path, loaded, f"Grenze: > {truncate_from}") if loaded is not None else None
+            )
+        self.sections = {path: self.sections[path] for path in files}
+        return [section for section in self.sections.values() if section is not None]
+
+
+def _publish(session: _WatchSession, sink_class: type[Sink], sink_args: tuple) -> None:
+    started = time.monotonic()
+    try:
+        sink = sink_class(*sink_args)
+    except (OSError, subprocess.SubprocessError) as e:
+        report(sink_class, f"{sink_class.error_prefix}: {e}")
+        return
+    try:
+        sections = session.render()
+        sink.begin("## Projektdateien\n")
+        for section in sections:
+            sink.write("\n" + section)
+        sink.close()
+    except (OSError, subprocess.SubprocessError) as e:
+        sink.abort()
+        report(sink, f"{sink.error_prefix}: {e}")
+        return
+    except BaseException:
+        sink.abort()
+        raise
+    elapsed = (time.monotonic() - started) * 1000
+    report(sink, f"🔄 {len(sections)} Datei(en) veröffentlicht ({elapsed:.0f} ms).")
+
+
+def watch_files(
+    root_path: str,
+    extensions: list[str] | None,
+    respect_gitignore: bool = True,
+    ignore_patterns: list[str] | None = None,
+    truncate_from: int = 3000,
+    truncate_to: int = 500,
+    truncate_tail: int = 0,
+    jobs: int = 1,
+    output: str | None = None,
+    to_stdout: bool = False,
+    clipboard: str = "auto",
+    debounce: float = DEFAULT_DEBOUNCE,
+    stop: threading.Event | None = None,
+):
+    """Exportiert einmal und danach nach jeder Änderung erneut, bis stop gesetzt ist oder Strg+C kommt.
+
+    Änderungen werden gesammelt, bis debounce Sekunden lang kein Ereignis
+    mehr kam; dann wird das Ziel neu beschrieben. Unveränderte Dateien werden
+    dabei weder gelistet noch gelesen.
+    """
+    try:
+        inotify = Inotify()
+    except OSError as e:
+        print(f"❌ Beobachtung nicht möglich: {e}", file=sys.stderr)
+        return
+    sink_class, sink_args = select_sink(output, to_stdout, clipboard)
+    with inotify:
+        session = _WatchSession(
+            root_path, extensions, respect_gitignore, ignore_patterns,
+            truncate_from, truncate_to, truncate_tail, jobs, inotify,
+        )
+        _publish(session, sink_class, sink_args)
+        report(sink_class, "👀 Beobachte Änderungen (Strg+C beendet) …")
+        deadline = None
+        try:
+            while stop is None or not stop.is_set():
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if stop is not None:
+                    timeout = _STOP_POLL if timeout is None else min(timeout, _STOP_POLL)
+                events = inotify.read(timeout)
+                if events:
+                    if session.handle(events):
+                        deadline = time.monotonic() + debounce
+                elif deadline is not None and time.monotonic() >= deadline:
+                    _publish(session, sink_class, sink_args)
+                    deadline = None
+        except KeyboardInterrupt:
+            pass
@@ -0,0 +1,7 @@
+"""Hilfen für Tests, die den Clipboard-Prozess (subprocess.Popen) mocken."""
+
+
+def clipboard_text(mock_popen) -> str:
+    """Gibt zurück, was in die Standardeingabe des gemockten Prozesses geschrieben wurde."""
+    stdin = mock_popen.return_value.stdin
+    return b"".join(call.args[0] for call in stdin.write.call_args_list).decode("utf-8")
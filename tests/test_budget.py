@@ -0,0 +1,191 @@
+import builtins
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode.budget import BYTES, SMALLEST, Budget, estimate_tokens
+from clipcode.exporter import export_files_to_clipboard
+from clipcode.loader import LoadedFile
+from tests.clipboard import clipboard_text
+
+
+class TestEstimateTokens(unittest.TestCase):
+
+    def test_byte_classes(self):
+        self.assertEqual(estimate_tokens(b""), 0)
+        # Wortzeichen: etwa vier Bytes pro Token
+        self.assertEqual(estimate_tokens(b"abcd" * 100), 100)
+        # Satzzeichen kosten deutlich mehr als Wortzeichen
+        self.assertGreater(estimate_tokens(b"{}();" * 80), estimate_tokens(b"abcde" * 80))
+        # Mehrbyte-Zeichen
+        self.assertEqual(estimate_tokens("ü".encode("utf-8") * 50), 50)
+
+
+class TestBudgetPlan(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def create_files(self, sizes: dict[str, int]) -> list[str]:
+        paths = []
+        for name, size in sizes.items():
+            path = self.temp_path / name
+            path.write_bytes(b"x" * size)
+            paths.append(str(path))
+        return paths
+
+    def test_order_priority_fills_then_truncates_then_drops(self):
+        """Files that fit come first; the rest of the budget truncates the next one."""
+        files = self.create_files({"a.py": 600, "b.py": 600, "c.py": 600})
+        budget = Budget(1000, BYTES)
+
+        selected = budget.plan(files, {path: "" for path in files})
+
+        self.assertEqual(selected, files[:2])
+        self.assertEqual(budget.dropped, files[2:])
+
+    def test_smallest_priority(self):
+        files = self.create_files({"big.py": 900, "s1.py": 300, "s2.py": 300})
+        budget = Budget(700, BYTES, priority=SMALLEST)
+
+        self.assertEqual(budget.plan(files, {path: "" for path in files}), files[1:])
+
+    def test_prefer_patterns_come_first(self):
+        files = self.create_files({"a.txt": 600, "b.md": 600, "c.py": 600})
+        budget = Budget(900, BYTES, prefer=["*.py", "b.md"])
+
+        self.assertEqual(budget.plan(files, {path: "" for path in files}), [files[1], files[2]])
+        self.assertEqual(budget.dropped, [files[0]])
+
+    def test_fit_cuts_at_line_boundary_and_carries_slack(self):
+        files = self.create_files({"a.py": 10, "b.py": 1000})
+        budget = Budget(300, BYTES)
+        budget.plan(files, {path: "" for path in files})
+
+        small = LoadedFile("12345", 1, 1)
+        self.assertIs(budget.fit(files[0], small, lambda loaded: loaded.content), small)
+
+        text = "\n".join(f"line{i:03}" for i in range(100))
+        fitted = budget.fit(files[1], LoadedFile(text, 100, 100), lambda loaded: loaded.content)
+
+        # Anteil 290 plus 5 ungenutzte Bytes der ersten Datei
+        self.assertLessEqual(len(fitted.content), 295)
+        self.assertGreater(len(fitted.content), 280)
+        self.assertTrue(fitted.content.endswith(f"line{fitted.kept_lines - 1:03}"))
+        self.assertEqual(fitted.omitted, (fitted.kept_lines + 1, 100))
+        self.assertEqual(budget.cut, [files[1]])
+
+
+class TestBudgetExport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    @patch("subprocess.Popen")
+    def test_dropped_files_are_never_opened(self, mock_popen):
+        mock_popen.return_value.wait.return_value = 0
+        (self.temp_path / "a_small.py").write_text("print('small')\n", encoding="utf-8")
+        (self.temp_path / "b_large.py").write_text("x = 1\n" * 5000, encoding="utf-8")
+        real_open = builtins.open
+        opened = []
+
+        def tracking_open(file, *args, **kwargs):
+            opened.append(str(file))
+            return real_open(file, *args, **kwargs)
+
+        with patch("builtins.open", tracking_open), patch("builtins.print") as mock_print:
+            export_files_to_clipboard(str(self.temp_path), None, max_tokens=60)
+
+        content = clipboard_text(mock_popen)
+        self.assertIn("print('small')", content)
+        self.assertNotIn("b_large.py", content)
+        self.assertFalse(any(path.endswith("b_large.py") for path in opened))
+        self.assertTrue(any("1 Datei(en) ausgelassen" in str(c) for c in mock_print.call_args_list))
+
+    @patch("subprocess.Popen")
+    def test_truncated_file_is_marked(self, mock_popen):
+        mock_popen.return_value.wait.return_value = 0
+        (self.temp_path / "log.txt").write_text("".join(f"entry {i}\n" for i in range(500)), encoding="utf-8")
+
+        with patch("builtins.print"):
+            export_files_to_clipboard(str(self.temp_path), None, max_bytes=1000)
+
+        content = clipboard_text(mock_popen)
+        self.assertIn("entry 0\n", content)
+        self.assertNotIn("entry 499", content)
+        self.assertIn("Zeilen (Byte-Budget), ausgelassen: Zeilen", content)
+        self.assertLessEqual(len(content.encode("utf-8")), 1100)
+
+    @patch("subprocess.Popen")
+    def test_skipped_files_pass_their_share_on(self, mock_popen):
+        mock_popen.return_value.wait.return_value = 0
+        (self.temp_path / "a.bin").write_bytes(bytes(range(256)) * 16)
+        (self.temp_path / "a.svg").write_text("<svg>" + " " * 3000 + "</svg>\n", encoding="utf-8")
+        (self.temp_path / "b.py").write_text("x = 1\n" * 600, encoding="utf-8")
+
+        with patch("builtins.print"):
+            export_files_to_clipboard(str(self.temp_path), None, max_bytes=4500)
+
+        content = clipboard_text(mock_popen)
+        self.assertEqual(content.count("x = 1\n"), 600)
+        self.assertNotIn("Byte-Budget", content)
+
+    @patch("subprocess.Popen")
+    def test_files_planned_in_full_are_not_cut(self, mock_popen):
+        """Punctuation-heavy files cost more than their size suggests but stay complete."""
+        mock_popen.return_value.wait.return_value = 0
+        for i in range(8):
+            lines = "".join(f"v{j} = call({j}, '{j}')  # c\n" for j in range(3 + 4 * i))
+            (self.temp_path / f"c{i}.py").write_text(lines, encoding="utf-8")
+
+        for limit in (300, 600, 1200):
+            with self.subTest(limit=limit), patch("builtins.print"):
+                mock_popen.reset_mock()
+                budget = Budget(limit)
+                planned_in_full = []
+                plan = budget.plan
+
+                def recording_plan(*args):
+                    selected = plan(*args)
+                    planned_in_full.extend(budget._full)
+                    return selected
+
+                budget.plan = recording_plan
+                with patch("clipcode.exporter.Budget", return_value=budget):
+                    export_files_to_clipboard(str(self.temp_path), None, max_tokens=limit)
+
+                self.assertTrue(planned_in_full)
+                self.assertFalse(set(planned_in_full) & set(budget.cut))
+                for path in planned_in_full:
+                    self.assertIn(Path(path).read_text(encoding="utf-8"), clipboard_text(mock_popen))
+
+    def test_release_moves_share_to_carry(self):
+        paths = []
+        for name in ("a.py", "b.py"):
+            path = self.temp_path / name
+            path.write_text("x = 1\n" * 100, encoding="utf-8")
+            paths.append(str(path))
+        budget = Budget(900, BYTES)
+        overheads = {path: "### frame\n" for path in paths}
+        self.assertEqual(budget.plan(paths, overheads), paths)
+
+        budget.release(paths[0])
+        # Without the released share, b.py would only get the remaining 280 bytes
+        loaded = LoadedFile("x = 1\n" * 99 + "x = 1", 100, 100)
+
+        self.assertIs(budget.fit(paths[1], loaded, lambda f: f.content), loaded)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,186 @@
+import builtins
+import os
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode import file_utils, loader
+from clipcode.cache import MetadataCache, default_cache_path
+from clipcode.exporter import export_files_to_clipboard
+from tests.clipboard import clipboard_text
+
+# Old enough to be cached (files modified within the last seconds are not)
+_OLD = 1_000_000_000
+
+
+class TestMetadataCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        self.db_path = str(self.temp_path / "cache" / "metadata.sqlite3")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, name: str, content: bytes, old: bool = True) -> str:
+        path = self.temp_path / name
+        path.write_bytes(content)
+        if old:
+            os.utime(path, (_OLD, _OLD))
+        return str(path)
+
+    def run_load(self, path: str, truncate=(3000, 500, 0), **kwargs):
+        cache = MetadataCache(self.db_path, **kwargs)
+        with patch.object(loader, "load_file", wraps=loader.load_file) as mock_load:
+            loaded = cache.load(path, *truncate)
+        cache.close()
+        return loaded, mock_load.call_count
+
+    def test_warm_run_does_not_read_the_file(self):
+        path = self.create_file("a.py", b"x = 1\ny = 2\n")
+
+        cold, cold_reads = self.run_load(path)
+        warm, warm_reads = self.run_load(path)
+
+        self.assertEqual(cold_reads, 1)
+        self.assertEqual(warm_reads, 0)
+        self.assertEqual(warm, cold)
+
+    def test_entry_without_hash_is_reloaded_when_a_hash_is_needed(self):
+        path = self.create_file("a.py", b"x = 1\n")
+
+        unhashed, _ = self.run_load(path)
+        hashed, reads = self.run_load(path, (3000, 500, 0, True))
+        warm, warm_reads = self.run_load(path, (3000, 500, 0, True))
+
+        self.assertIsNone(unhashed.digest)
+        self.assertEqual(reads, 1)
+        self.assertIsNotNone(hashed.digest)
+        self.assertEqual((warm, warm_reads), (hashed, 0))
+
+    def test_binary_verdict_is_cached(self):
+        path = self.create_file("blob.py", b"\x00\x01\x02" * 100)
+
+        self.run_load(path)
+        loaded, reads = self.run_load(path)
+
+        self.assertIsNone(loaded)
+        self.assertEqual(reads, 0)
+
+    def test_changed_file_is_reloaded(self):
+        path = self.create_file("a.py", b"x = 1\n")
+        self.run_load(path)
+        self.create_file("a.py", b"x = 12345\n")
+
+        loaded, reads = self.run_load(path)
+
+        self.assertEqual(reads, 1)
+        self.assertEqual(loaded.content, "x = 12345\n")
+
+    def test_other_truncation_options_miss(self):
+        path = self.create_file("a.py", b"".join(b"line %d\n" % i for i in range(20)))
+        self.run_load(path, (10, 5, 0))
+
+        loaded, reads = self.run_load(path, (10, 3, 0))
+
+        self.assertEqual(reads, 1)
+        self.assertEqual(loaded.kept_lines, 3)
+
+    def test_recently_modified_file_is_not_stored(self):
+        path = self.create_file("a.py", b"x = 1\n", old=False)
+
+        self.run_load(path)
+        _, reads = self.run_load(path)
+
+        self.assertEqual(reads, 1)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        paths = [self.create_file(f"{name}.py", name.encode() * 200 + b"\n") for name in "abc"]
+        # Room for roughly two entries
+        max_bytes = 2 * (len(paths[0]) + 201) + 10
+        for path in paths:
+            self.run_load(path, max_bytes=max_bytes)
+
+        with sqlite3.connect(self.db_path) as db:
+            stored = {row[0] for row in db.execute("SELECT path FROM files")}
+
+        self.assertEqual(stored, set(paths[1:]))
+
+    def test_uses_wal_journal(self):
+        MetadataCache(self.db_path).close()
+
+        with sqlite3.connect(self.db_path) as db:
+            self.assertEqual(db.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+
+    def test_default_path_follows_xdg_cache_home(self):
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": self.temp_dir}):
+            self.assertEqual(default_cache_path(), os.path.join(self.temp_dir, "clipcode", "metadata.sqlite3"))
+
+
+class TestExportWithCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        self.project = self.temp_path / "project"
+        self.project.mkdir()
+        for name, content in (("a.py", "print('a')\n"), ("b.py", "print('b')\n")):
+            (self.project / name).write_text(content)
+            os.utime(self.project / name, (_OLD, _OLD))
+        os.utime(self.project, (_OLD, _OLD))
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    @patch('subprocess.Popen')
+    def export(self, mock_popen):
+        mock_popen.return_value.wait.return_value = 0
+        with patch.dict(os.environ, {"XDG_CACHE_HOME": str(self.temp_path / "cache")}), \
+                patch.object(loader, "load_file", wraps=loader.load_file) as mock_load, \
+                patch('builtins.print'):
+            export_files_to_clipboard(str(self.project), None, cache=True, jobs=2)
+        return clipboard_text(mock_popen), mock_load.call_count
+
+    def test_second_export_is_served_from_cache(self):
+        cold, cold_reads = self.export()
+        warm, warm_reads = self.export()
+
+        self.assertEqual(cold_reads, 2)
+        self.assertEqual(warm_reads, 0)
+        self.assertEqual(warm, cold)
+        self.assertIn("print('b')", warm)
+
+    def test_warm_export_with_copies_opens_no_files(self):
+        (self.project / "copy.py").write_text("print('a')\n")
+        os.utime(self.project / "copy.py", (_OLD, _OLD))
+        os.utime(self.project, (_OLD, _OLD))
+        self.export()
+        real_open = builtins.open
+        opened = []
+
+        def tracking_open(file, *args, **kwargs):
+            opened.append(str(file))
+            return real_open(file, *args, **kwargs)
+
+        with patch("builtins.open", tracking_open):
+            text, _ = self.export()
+
+        self.assertFalse([path for path in opened if path.startswith(str(self.project))])
+        self.assertIn("🔁 Identisch mit", text)
+
+    def test_second_export_does_not_list_unchanged_directories(self):
+        self.export()
+        with patch.object(file_utils, "_scan_dir", wraps=file_utils._scan_dir) as mock_scan:
+            text, _ = self.export()
+
+        mock_scan.assert_not_called()
+        self.assertIn("print('a')", text)
+
+
+if __name__ == '__main__':
+    unittest.main()
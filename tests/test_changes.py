@@ -0,0 +1,208 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode.changes import ChangesError, ExportState, changed_since_ref
+from clipcode.exporter import export_files_to_clipboard
+
+
+def _git(cwd: str, *args: str) -> None:
+    subprocess.run(
+        ["git", "-c", "user.name=t", "-c", "user.email=t@example.com", *args],
+        cwd=cwd, check=True, capture_output=True,
+    )
+
+
+@unittest.skipUnless(shutil.which("git"), "git binary not available")
+class TestChangedSinceRef(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        _git(self.temp_dir, "init", "-q")
+        self.create_file(".gitignore", "*.log\n")
+        self.create_file("src/keep.py", "a = 1\n")
+        self.create_file("src/edit.py", "b = 1\nc = 2\n")
+        self.create_file("src/gone.py", "d = 1\n")
+        self.create_file("docs/readme.md", "# docs\n")
+        _git(self.temp_dir, "add", "-A")
+        _git(self.temp_dir, "commit", "-q", "-m", "base")
+
+        self.create_file("src/edit.py", "b = 1\nc = 3\n")
+        self.create_file("src/new.py", "e = 1\n")
+        self.create_file("src/debug.log", "noise\n")
+        os.remove(self.temp_path / "src" / "gone.py")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, relative_path: str, content: str):
+        file_path = self.temp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding="utf-8")
+
+    def test_lists_modified_new_and_deleted_files(self):
+        change_set = changed_since_ref(self.temp_dir, "HEAD")
+
+        self.assertEqual(change_set.changed, ["src/edit.py", "src/new.py"])
+        self.assertEqual(change_set.deleted, ["src/gone.py"])
+        self.assertEqual(change_set.diffs, {})
+
+    def test_paths_are_relative_to_a_subdirectory_root(self):
+        change_set = changed_since_ref(str(self.temp_path / "src"), "HEAD")
+
+        self.assertEqual(change_set.changed, ["edit.py", "new.py"])
+
+    def test_diffs_for_modified_files(self):
+        change_set = changed_since_ref(self.temp_dir, "HEAD", diff=True)
+
+        self.assertEqual(list(change_set.diffs), ["src/edit.py"])
+        self.assertIn("-c = 2\n+c = 3", change_set.diffs["src/edit.py"])
+
+    def test_unknown_ref(self):
+        with self.assertRaises(ChangesError):
+            changed_since_ref(self.temp_dir, "no-such-ref")
+
+    def test_export_contains_only_changes(self):
+        output = str(self.temp_path / "out.md")
+        with patch('builtins.print'):
+            export_files_to_clipboard(
+                self.temp_dir, ["py"], output=output, changed_since="HEAD", diff=True,
+                ignore_patterns=["out.md"],
+            )
+        text = Path(output).read_text(encoding="utf-8")
+
+        self.assertIn("seit HEAD", text)
+        self.assertIn("```diff\n", text)
+        self.assertIn("+c = 3", text)
+        self.assertIn("e = 1", text)
+        self.assertIn("gone.py\n🗑️ Gelöscht", text)
+        self.assertNotIn("keep.py", text)
+        self.assertNotIn("debug.log", text)
+
+    def test_export_outside_repository_reports_error(self):
+        plain_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, plain_dir)
+        output = str(self.temp_path / "out.md")
+        with patch('builtins.print') as mock_print:
+            export_files_to_clipboard(plain_dir, None, output=output, changed_since="HEAD")
+
+        self.assertIn("nicht ermittelbar", mock_print.call_args.args[0])
+        self.assertNotIn("###", Path(output).read_text(encoding="utf-8"))
+
+
+class TestExportState(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        self.state_dir = str(self.temp_path / "state")
+        self.project = self.temp_path / "project"
+        self.project.mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, name: str, content: str) -> str:
+        path = self.project / name
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def run_state(self, files: list[str], diff: bool = False):
+        state = ExportState(str(self.project), self.state_dir)
+        change_set = state.changes(files, diff)
+        state.save()
+        return change_set
+
+    def test_first_run_reports_everything(self):
+        files = [self.create_file("a.py", "a\n"), self.create_file("b.py", "b\n")]
+
+        self.assertEqual(self.run_state(files).changed, files)
+
+    def test_unchanged_files_are_not_read(self):
+        files = [self.create_file("a.py", "a\n")]
+        self.run_state(files)
+
+        with patch("clipcode.changes._content_digest") as mock_digest:
+            change_set = self.run_state(files)
+
+        self.assertEqual(change_set.changed, [])
+        mock_digest.assert_not_called()
+
+    def test_touched_file_with_same_content_is_unchanged(self):
+        path = self.create_file("a.py", "a\n")
+        self.run_state([path])
+        os.utime(path, ns=(1, 1))
+
+        self.assertEqual(self.run_state([path]).changed, [])
+
+    def test_modified_and_deleted_files(self):
+        a, b = self.create_file("a.py", "a\n"), self.create_file("b.py", "b\n")
+        self.run_state([a, b])
+        self.create_file("a.py", "a2\n")
+        os.remove(b)
+
+        change_set = self.run_state([a])
+
+        self.assertEqual(change_set.changed, [a])
+        self.assertEqual(change_set.deleted, [b])
+
+    def test_unlisted_existing_file_is_not_deleted(self):
+        a, b = self.create_file("a.py", "a\n"), self.create_file("b.py", "b\n")
+        self.run_state([a, b])
+
+        self.assertEqual(self.run_state([a]).deleted, [])
+
+    def test_diff_against_previous_export(self):
+        path = self.create_file("a.py", "x = 1\ny = 2\n")
+        self.run_state([path], diff=True)
+        self.create_file("a.py", "x = 1\ny = 3\n")
+
+        change_set = self.run_state([path], diff=True)
+
+        self.assertIn("-y = 2\n+y = 3", change_set.diffs[path])
+        self.assertTrue(change_set.diffs[path].startswith("--- a/a.py\n+++ b/a.py\n"))
+
+    def test_export_since_last_run(self):
+        self.create_file("a.py", "x = 1\n")
+        self.create_file("b.py", "y = 1\n")
+        output = str(self.temp_path / "out.md")
+
+        def export() -> str:
+            with patch.dict(os.environ, {"XDG_STATE_HOME": self.state_dir}), patch('builtins.print'):
+                export_files_to_clipboard(str(self.project), None, output=output, changed_since_last=True, diff=True)
+            return Path(output).read_text(encoding="utf-8")
+
+        first = export()
+        self.create_file("a.py", "x = 2\n")
+        second = export()
+
+        self.assertIn("b.py", first)
+        self.assertIn("seit dem letzten Export", second)
+        self.assertIn("-x = 1\n+x = 2", second)
+        self.assertNotIn("b.py", second)
+
+    def test_changing_filters_keeps_separate_states(self):
+        self.create_file("a.py", "x = 1\n")
+        self.create_file("b.ts", "let y = 1;\n")
+        output = str(self.temp_path / "out.md")
+
+        def export(extension: str) -> str:
+            with patch.dict(os.environ, {"XDG_STATE_HOME": self.state_dir}), patch('builtins.print'):
+                export_files_to_clipboard(str(self.project), [extension], output=output, changed_since_last=True)
+            return Path(output).read_text(encoding="utf-8")
+
+        self.assertIn("a.py", export("py"))
+        ts_export = export("ts")
+        py_again = export("py")
+
+        self.assertIn("b.ts", ts_export)
+        self.assertNotIn("Gelöscht", ts_export)
+        self.assertNotIn("a.py", py_again)
+
+if __name__ == '__main__':
+    unittest.main()
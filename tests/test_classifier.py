@@ -0,0 +1,71 @@
+import unittest
+
+from clipcode.classifier import BINARY, SKIP, TEXT, ContentClassifier, DEFAULT_CLASSIFIER
+
+
+class TestContentClassifier(unittest.TestCase):
+
+    def test_plain_text(self):
+        self.assertEqual(DEFAULT_CLASSIFIER.classify(b"def main():\n    pass\n").kind, TEXT)
+
+    def test_empty_file_is_text(self):
+        self.assertEqual(DEFAULT_CLASSIFIER.classify(b"").kind, TEXT)
+
+    def test_nul_byte_is_binary(self):
+        self.assertEqual(DEFAULT_CLASSIFIER.classify(b"abc\x00def").kind, BINARY)
+
+    def test_magic_numbers(self):
+        """Common binary formats are recognised by their signature."""
+        samples = {
+            "png": b"\x89PNG\r\n\x1a\n" + b"rest",
+            "elf": b"\x7fELF" + b"\x02\x01\x01",
+            "zip": b"PK\x03\x04" + b"data",
+            "pdf": b"%PDF-1.7\n%text-like header",
+            "gzip": b"\x1f\x8b\x08",
+            "sqlite": b"SQLite format 3\x00",
+        }
+        for name, data in samples.items():
+            with self.subTest(name):
+                result = DEFAULT_CLASSIFIER.classify(data)
+                self.assertEqual(result.kind, BINARY)
+                self.assertEqual(result.reason, name)
+
+    def test_byte_order_marks(self):
+        """UTF-16/32 files are text with the encoding taken from the BOM."""
+        samples = {
+            "utf-16-le": "hallo".encode("utf-16-le"),
+            "utf-16-be": "hallo".encode("utf-16-be"),
+            "utf-32-le": "hallo".encode("utf-32-le"),
+            "utf-32-be": "hallo".encode("utf-32-be"),
+        }
+        boms = {
+            "utf-16-le": b"\xff\xfe", "utf-16-be": b"\xfe\xff",
+            "utf-32-le": b"\xff\xfe\x00\x00", "utf-32-be": b"\x00\x00\xfe\xff",
+        }
+        for encoding, data in samples.items():
+            with self.subTest(encoding):
+                result = DEFAULT_CLASSIFIER.classify(boms[encoding] + data)
+                self.assertEqual(result, (TEXT, encoding, "bom"))
+
+    def test_heuristic_threshold(self):
+        """More than 30 % non-text bytes in the sniffed chunk means binary."""
+        self.assertEqual(DEFAULT_CLASSIFIER.classify(b"a" * 70 + b"\xe9" * 30).kind, TEXT)
+        self.assertEqual(DEFAULT_CLASSIFIER.classify(b"a" * 69 + b"\xe9" * 31).kind, BINARY)
+
+    def test_only_sniff_size_is_inspected(self):
+        """Bytes after the sniffed chunk do not influence the verdict."""
+        classifier = ContentClassifier(sniff_size=16)
+        self.assertEqual(classifier.classify(b"a" * 16 + b"\x00" * 100).kind, TEXT)
+
+    def test_suffix_rules_are_configurable(self):
+        """SVG is skipped by default; the rule table can be replaced."""
+        self.assertEqual(DEFAULT_CLASSIFIER.classify_name("logo.SVG").kind, SKIP)
+        self.assertIsNone(DEFAULT_CLASSIFIER.classify_name("main.py"))
+
+        custom = ContentClassifier(suffix_rules={".lock": SKIP})
+        self.assertIsNone(custom.classify_name("logo.svg"))
+        self.assertEqual(custom.classify(b"text", "poetry.lock").kind, SKIP)
+
+
+if __name__ == "__main__":
+    unittest.main()
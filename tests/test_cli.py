@@ -3,8 +3,9 @@ import tempfile
 import os
 import sys
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 from clipcode.cli import main
+from tests.clipboard import clipboard_text
 
 
 class TestCLI(unittest.TestCase):
@@ -32,7 +33,7 @@ class TestCLI(unittest.TestCase):
             f.write(content)
         return str(gitignore_path)
     
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_basic_usage(self, mock_export):
         """Test basic CLI usage without extensions."""
         test_args = ['clipcode', str(self.temp_path)]
@@ -43,7 +44,7 @@ class TestCLI(unittest.TestCase):
         # Verify export_files_to_clipboard was called with correct arguments
         mock_export.assert_called_once_with(str(self.temp_path), None, True, [], 3000, 500)
     
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_with_extensions(self, mock_export):
         """Test CLI usage with file extensions."""
         test_args = ['clipcode', str(self.temp_path), 'py', 'js', 'ts']
@@ -54,7 +55,7 @@ class TestCLI(unittest.TestCase):
         # Verify export_files_to_clipboard was called with extensions
         mock_export.assert_called_once_with(str(self.temp_path), ['py', 'js', 'ts'], True, [], 3000, 500)
     
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_respect_gitignore_default(self, mock_export):
         """Test that --respect-gitignore is the default behavior."""
         test_args = ['clipcode', str(self.temp_path)]
@@ -65,7 +66,7 @@ class TestCLI(unittest.TestCase):
         # Third argument should be True (respect_gitignore=True)
         mock_export.assert_called_once_with(str(self.temp_path), None, True, [], 3000, 500)
     
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_explicit_respect_gitignore(self, mock_export):
         """Test explicit --respect-gitignore flag."""
         test_args = ['clipcode', '--respect-gitignore', str(self.temp_path)]
@@ -75,7 +76,7 @@ class TestCLI(unittest.TestCase):
         
         mock_export.assert_called_once_with(str(self.temp_path), None, True, [], 3000, 500)
     
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_no_respect_gitignore(self, mock_export):
         """Test --no-respect-gitignore flag."""
         test_args = ['clipcode', '--no-respect-gitignore', str(self.temp_path)]
@@ -86,7 +87,7 @@ class TestCLI(unittest.TestCase):
         # Third argument should be False (respect_gitignore=False)
         mock_export.assert_called_once_with(str(self.temp_path), None, False, [], 3000, 500)
     
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_complex_combination(self, mock_export):
         """Test CLI with extensions and gitignore options."""
         test_args = ['clipcode', '--no-respect-gitignore', str(self.temp_path), 'py', 'md']
@@ -109,7 +110,7 @@ class TestCLI(unittest.TestCase):
         # This test mainly ensures the argument parser is set up correctly
 
 
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_with_ignore_patterns(self, mock_export):
         """Test CLI with explicit ignore patterns."""
         test_args = ['clipcode', '-i', 'foo.py,bar/baz.txt', '-i', '*.log', str(self.temp_path)]
@@ -121,7 +122,7 @@ class TestCLI(unittest.TestCase):
             str(self.temp_path), None, True, ['foo.py', 'bar/baz.txt', '*.log'], 3000, 500
         )
 
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_with_truncate_lines_custom(self, mock_export):
         """Test CLI with custom --truncate-lines values."""
         test_args = ['clipcode', '--truncate-lines', '1200:300', str(self.temp_path)]
@@ -131,7 +132,7 @@ class TestCLI(unittest.TestCase):
 
         mock_export.assert_called_once_with(str(self.temp_path), None, True, [], 1200, 300)
 
-    @patch('clipcode.cli.export_files_to_clipboard')
+    @patch('clipcode.exporter.export_files_to_clipboard')
     def test_cli_with_truncate_lines_ignore_mode(self, mock_export):
         """Test CLI where truncate target is 0 (ignore large files)."""
         test_args = ['clipcode', '--truncate-lines', '3000:0', str(self.temp_path)]
@@ -141,6 +142,205 @@ class TestCLI(unittest.TestCase):
 
         mock_export.assert_called_once_with(str(self.temp_path), None, True, [], 3000, 0)
 
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_with_truncate_lines_head_and_tail(self, mock_export):
+        """KÜRZENAB:KÜRZENAUF+ENDE passes the tail window as keyword."""
+        test_args = ['clipcode', '--truncate-lines', '3000:300+200', str(self.temp_path)]
+
+        with patch.object(sys, 'argv', test_args):
+            main()
+
+        mock_export.assert_called_once_with(str(self.temp_path), None, True, [], 3000, 300, truncate_tail=200)
+
+        test_args = ['clipcode', '--truncate-lines', '100:60+50', str(self.temp_path)]
+        with patch.object(sys, 'argv', test_args):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_from_index(self, mock_export):
+        """--from-index and --include-untracked are passed through as keywords."""
+        test_args = ['clipcode', '--from-index', '--include-untracked', str(self.temp_path)]
+
+        with patch.object(sys, 'argv', test_args):
+            main()
+
+        mock_export.assert_called_once_with(
+            str(self.temp_path), None, True, [], 3000, 500, from_index=True, include_untracked=True
+        )
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_walk_threads(self, mock_export):
+        """--walk-threads is passed through; values below 1 are rejected."""
+        with patch.object(sys, 'argv', ['clipcode', '--walk-threads', '8', str(self.temp_path)]):
+            main()
+
+        self.assertEqual(mock_export.call_args.kwargs, {'walk_threads': 8})
+
+        with patch.object(sys, 'argv', ['clipcode', '--walk-threads', '0', str(self.temp_path)]):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_jobs(self, mock_export):
+        """--jobs is passed through as keyword."""
+        with patch.object(sys, 'argv', ['clipcode', '-j', '4', str(self.temp_path)]):
+            main()
+
+        self.assertEqual(mock_export.call_args.kwargs, {'jobs': 4})
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_output_targets(self, mock_export):
+        """--output, --stdout and --clipboard are passed through and exclude each other."""
+        for args, expected in (
+            (['-o', 'out.md'], {'output': 'out.md'}),
+            (['--stdout'], {'to_stdout': True}),
+            (['--clipboard', 'osc52'], {'clipboard': 'osc52'}),
+        ):
+            with patch.object(sys, 'argv', ['clipcode', *args, str(self.temp_path)]):
+                main()
+            self.assertEqual(mock_export.call_args.kwargs, expected)
+
+        with patch.object(sys, 'argv', ['clipcode', '--stdout', '-o', 'out.md', str(self.temp_path)]):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_budget_options(self, mock_export):
+        """Budget options are passed through; --prefer accepts comma lists."""
+        test_args = [
+            'clipcode', '--max-tokens', '8000', '--priority', 'smallest',
+            '--prefer', '*.py,README.md', '--prefer', 'src/*', str(self.temp_path),
+        ]
+        with patch.object(sys, 'argv', test_args):
+            main()
+
+        self.assertEqual(
+            mock_export.call_args.kwargs,
+            {'max_tokens': 8000, 'priority': 'smallest', 'prefer': ['*.py', 'README.md', 'src/*']},
+        )
+
+        with patch.object(sys, 'argv', ['clipcode', '--max-tokens', '1', '--max-bytes', '1', str(self.temp_path)]):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_no_dedup(self, mock_export):
+        with patch.object(sys, 'argv', ['clipcode', '--no-dedup', str(self.temp_path)]):
+            main()
+
+        self.assertEqual(mock_export.call_args.kwargs, {'dedup': False})
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_changed_since(self, mock_export):
+        with patch.object(sys, 'argv', ['clipcode', '--changed-since', 'main', '--diff', str(self.temp_path)]):
+            main()
+
+        self.assertEqual(mock_export.call_args.kwargs, {'changed_since': 'main', 'diff': True})
+
+    def test_cli_diff_requires_changes_mode(self):
+        with patch.object(sys, 'argv', ['clipcode', '--diff', str(self.temp_path)]):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    @patch('clipcode.watch.watch_files')
+    def test_cli_watch(self, mock_watch, mock_export):
+        test_args = ['clipcode', '--watch', '--debounce', '150', '-o', 'out.md', str(self.temp_path), 'py']
+        with patch.object(sys, 'argv', test_args):
+            main()
+
+        mock_export.assert_not_called()
+        mock_watch.assert_called_once_with(
+            str(self.temp_path), ['py'], True, [], 3000, 500, output='out.md', debounce=0.15
+        )
+
+    @patch('clipcode.watch.watch_files')
+    def test_cli_watch_rejects_unsupported_options(self, mock_watch):
+        with patch.object(sys, 'argv', ['clipcode', '--watch', '--max-tokens', '100', str(self.temp_path)]):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+        mock_watch.assert_not_called()
+
+    def test_cli_debounce_requires_watch(self):
+        with patch.object(sys, 'argv', ['clipcode', '--debounce', '100', str(self.temp_path)]):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    @patch('clipcode.daemon.forward', return_value=0)
+    def test_cli_forwards_to_running_daemon(self, mock_forward, mock_export):
+        with patch.object(sys, 'argv', ['clipcode', str(self.temp_path), 'py']):
+            main()
+
+        mock_forward.assert_called_once_with([str(self.temp_path), 'py'])
+        mock_export.assert_not_called()
+
+    @patch('clipcode.daemon.serve', return_value=0)
+    def test_cli_serve(self, mock_serve):
+        with patch.object(sys, 'argv', ['clipcode', 'serve', '--socket', '/tmp/x.sock']):
+            with self.assertRaises(SystemExit) as cm:
+                main()
+
+        self.assertEqual(cm.exception.code, 0)
+        self.assertEqual(mock_serve.call_args.args[1], '/tmp/x.sock')
+
+    def test_cli_choices_match_modules(self):
+        """The CLI keeps its own copies of the choices so it need not import these modules."""
+        from clipcode import budget, cli, compact, exporter
+
+        self.assertEqual(cli._CLIPBOARD_BACKENDS, exporter.CLIPBOARD_BACKENDS)
+        self.assertEqual(cli._PRIORITIES, budget.PRIORITIES)
+        self.assertEqual(cli._COMPACT_LEVELS, compact.LEVELS)
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_cache(self, mock_export):
+        with patch.object(sys, 'argv', ['clipcode', '--cache', str(self.temp_path)]):
+            main()
+
+        self.assertEqual(mock_export.call_args.kwargs, {'cache': True})
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_compact(self, mock_export):
+        """--compact takes a level between 0 and 3."""
+        with patch.object(sys, 'argv', ['clipcode', '--compact', '2', str(self.temp_path)]):
+            main()
+
+        self.assertEqual(mock_export.call_args.kwargs, {'compact': 2})
+
+        with patch.object(sys, 'argv', ['clipcode', '--compact', '4', str(self.temp_path)]):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+    @patch('clipcode.exporter.export_files_to_clipboard')
+    def test_cli_split_options(self, mock_export):
+        with patch.object(sys, 'argv', ['clipcode', '--split-bytes', '50000', '-o', 'x.md', str(self.temp_path)]):
+            main()
+
+        self.assertEqual(mock_export.call_args.kwargs, {'split_bytes': 50000, 'output': 'x.md'})
+
+        with patch.object(sys, 'argv', ['clipcode', '--split-bytes', '1', '--split-tokens', '1', str(self.temp_path)]):
+            with self.assertRaises(SystemExit):
+                with patch('sys.stderr'):
+                    main()
+
+    def test_cli_include_untracked_requires_from_index(self):
+        """--include-untracked without --from-index is rejected."""
+        test_args = ['clipcode', '--include-untracked', str(self.temp_path)]
+
+        with patch.object(sys, 'argv', test_args):
+            with self.assertRaises(SystemExit):
+                main()
+
     def test_cli_with_truncate_lines_invalid_format(self):
         """Invalid --truncate-lines format should fail fast."""
         test_args = ['clipcode', '--truncate-lines', '3000', str(self.temp_path)]
@@ -184,7 +384,7 @@ class TestCLIIntegration(unittest.TestCase):
             f.write(content)
         return str(gitignore_path)
     
-    @patch('subprocess.run')
+    @patch('subprocess.Popen')
     def test_integration_with_gitignore(self, mock_subprocess):
         """Test full integration with gitignore filtering."""
         # Create test files
@@ -196,20 +396,19 @@ class TestCLIIntegration(unittest.TestCase):
         # Create .gitignore
         self.create_gitignore("*.log\n__pycache__/")
         
-        # Mock subprocess.run to capture clipboard content
-        mock_subprocess.return_value = MagicMock()
+        # Mock subprocess.Popen to capture clipboard content
+        mock_subprocess.return_value.wait.return_value = 0
         
         test_args = ['clipcode', str(self.temp_path)]
         
         with patch.object(sys, 'argv', test_args):
             main()
         
-        # Verify subprocess.run was called (clipboard operation)
+        # Verify subprocess.Popen was called (clipboard operation)
         mock_subprocess.assert_called_once()
         
         # Get the content that would be copied to clipboard
-        call_args = mock_subprocess.call_args
-        clipboard_content = call_args[1]['input'].decode('utf-8')
+        clipboard_content = clipboard_text(mock_subprocess)
         
         # Verify content includes main.py but excludes ignored files
         self.assertIn("main.py", clipboard_content)
@@ -218,7 +417,7 @@ class TestCLIIntegration(unittest.TestCase):
         self.assertNotIn("__pycache__", clipboard_content)
         self.assertNotIn(".git", clipboard_content)
     
-    @patch('subprocess.run')
+    @patch('subprocess.Popen')
     def test_integration_without_gitignore(self, mock_subprocess):
         """Test integration when ignoring gitignore files."""
         # Create test files
@@ -230,8 +429,8 @@ class TestCLIIntegration(unittest.TestCase):
         # Create .gitignore (should be ignored)
         self.create_gitignore("*.log\n__pycache__/")
         
-        # Mock subprocess.run
-        mock_subprocess.return_value = MagicMock()
+        # Mock subprocess.Popen
+        mock_subprocess.return_value.wait.return_value = 0
         
         test_args = ['clipcode', '--no-respect-gitignore', str(self.temp_path)]
         
@@ -239,8 +438,7 @@ class TestCLIIntegration(unittest.TestCase):
             main()
         
         # Get clipboard content
-        call_args = mock_subprocess.call_args
-        clipboard_content = call_args[1]['input'].decode('utf-8')
+        clipboard_content = clipboard_text(mock_subprocess)
         
         # Verify content includes files that would normally be ignored
         # (except .git which is always excluded)
@@ -249,7 +447,7 @@ class TestCLIIntegration(unittest.TestCase):
         self.assertIn("__pycache__", clipboard_content)
         self.assertNotIn(".git", clipboard_content)  # .git always excluded
     
-    @patch('subprocess.run')
+    @patch('subprocess.Popen')
     def test_integration_with_extensions_and_gitignore(self, mock_subprocess):
         """Test integration with both extension filtering and gitignore."""
         # Create test files
@@ -262,8 +460,8 @@ class TestCLIIntegration(unittest.TestCase):
         # Create .gitignore
         self.create_gitignore("*.log\ntest.py")
         
-        # Mock subprocess.run
-        mock_subprocess.return_value = MagicMock()
+        # Mock subprocess.Popen
+        mock_subprocess.return_value.wait.return_value = 0
         
         test_args = ['clipcode', str(self.temp_path), 'py', 'js']
         
@@ -271,8 +469,7 @@ class TestCLIIntegration(unittest.TestCase):
             main()
         
         # Get clipboard content
-        call_args = mock_subprocess.call_args
-        clipboard_content = call_args[1]['input'].decode('utf-8')
+        clipboard_content = clipboard_text(mock_subprocess)
         
         # Should include main.py and script.js
         self.assertIn("main.py", clipboard_content)
@@ -0,0 +1,122 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode.compact import (
+    LICENSE_HEADERS,
+    PYTHON_COMMENTS,
+    WHITESPACE,
+    Compactor,
+    compact_whitespace,
+    strip_python_comments,
+)
+from clipcode.exporter import export_files_to_clipboard
+from clipcode.loader import LoadedFile
+from tests.clipboard import clipboard_text
+
+LICENSE = "# Copyright (c) 2024 Example\n# Licensed under the MIT License.\n"
+
+
+class TestCompactWhitespace(unittest.TestCase):
+
+    def test_trailing_space_and_blank_runs(self):
+        text = "\n\na = 1   \n\n\n\nb = 2\t\n\n"
+
+        self.assertEqual(compact_whitespace(text), "a = 1\n\nb = 2")
+
+
+class TestStripPythonComments(unittest.TestCase):
+
+    def test_comments_and_docstrings_are_removed(self):
+        source = (
+            '#!/usr/bin/env python\n'
+            '"""Module doc."""\n'
+            'import os  # trailing\n'
+            '\n'
+            'class A:\n'
+            '    """Doc\n'
+            '    over two lines."""\n'
+            '\n'
+            '    def f(self):\n'
+            '        """Only a docstring."""\n'
+            '\n'
+            '    def g(self):\n'
+            '        # comment\n'
+            '        x = "kept"\n'
+            '        return x\n'
+        )
+
+        result = strip_python_comments(source)
+
+        self.assertEqual(
+            result,
+            '#!/usr/bin/env python\n'
+            'import os  \n'
+            '\n'
+            'class A:\n'
+            '\n'
+            '    def f(self):\n'
+            '        ...\n'
+            '\n'
+            '    def g(self):\n'
+            '        x = "kept"\n'
+            '        return x\n',
+        )
+        compile(result, "<compacted>", "exec")
+
+    def test_hash_inside_string_is_kept(self):
+        source = 'url = "http://host/#anchor"  # c\n'
+
+        self.assertEqual(strip_python_comments(source), 'url = "http://host/#anchor"  \n')
+
+
+class TestCompactor(unittest.TestCase):
+
+    def test_levels(self):
+        text = LICENSE + '"""Doc."""\nx = 1   \n\n\n\ny = 2  # c\n'
+        results = {}
+        for level in (WHITESPACE, LICENSE_HEADERS, PYTHON_COMMENTS):
+            compactor = Compactor(level)
+            compactor.compact("first.py", LoadedFile(text, 9, 9))
+            results[level] = compactor.compact("second.py", LoadedFile(text, 9, 9)).content
+
+        self.assertEqual(results[WHITESPACE], LICENSE + '"""Doc."""\nx = 1\n\ny = 2  # c')
+        self.assertEqual(results[LICENSE_HEADERS], '"""Doc."""\nx = 1\n\ny = 2  # c')
+        self.assertEqual(results[PYTHON_COMMENTS], "x = 1\n\ny = 2")
+
+    def test_untokenizable_python_falls_back_to_whitespace(self):
+        text = 'def f(:\n    """x"""   \n'
+
+        self.assertEqual(Compactor(PYTHON_COMMENTS).compact("a.py", LoadedFile(text, 2, 2)).content,
+                         'def f(:\n    """x"""')
+
+    def test_report_counts_bytes(self):
+        compactor = Compactor(WHITESPACE)
+        compactor.compact("a.txt", LoadedFile("ä   \n\n\n\nb", 5, 5))
+
+        self.assertEqual((compactor.bytes_before, compactor.bytes_after), (10, 5))
+        self.assertIn("10 → 5 Bytes", compactor.report())
+
+
+class TestCompactExport(unittest.TestCase):
+
+    @patch("subprocess.Popen")
+    def test_export_with_compaction_reports_savings(self, mock_popen):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            (Path(temp_dir) / "a.py").write_text('# comment\nx = 1\n\n\n\n"""doc"""\n', encoding="utf-8")
+            mock_popen.return_value.wait.return_value = 0
+
+            with patch("builtins.print") as mock_print:
+                export_files_to_clipboard(temp_dir, None, compact=PYTHON_COMMENTS)
+
+            self.assertIn("```python\nx = 1\n```", clipboard_text(mock_popen))
+            self.assertTrue(any("Kompaktierung (Stufe 3)" in str(c) for c in mock_print.call_args_list))
+        finally:
+            import shutil
+            shutil.rmtree(temp_dir)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import io
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode import exporter, loader
+from clipcode.cli import _run
+from clipcode.daemon import default_socket_path, forward, serve
+
+_OLD = 1_000_000_000
+
+
+class TestSocketPath(unittest.TestCase):
+
+    def test_environment_override(self):
+        with patch.dict(os.environ, {"CLIPCODE_SOCKET": "/tmp/custom.sock", "XDG_RUNTIME_DIR": "/run/user/1"}):
+            self.assertEqual(default_socket_path(), "/tmp/custom.sock")
+
+    def test_runtime_dir(self):
+        with patch.dict(os.environ, {"XDG_RUNTIME_DIR": "/run/user/1"}):
+            os.environ.pop("CLIPCODE_SOCKET", None)
+            self.assertEqual(default_socket_path(), "/run/user/1/clipcode.sock")
+
+
+class TestForwardWithoutDaemon(unittest.TestCase):
+
+    def test_missing_socket_falls_back(self):
+        self.assertIsNone(forward(["."], socket_path="/nonexistent/clipcode.sock"))
+
+    def test_stale_socket_falls_back(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        stale = os.path.join(temp_dir, "stale.sock")
+        Path(stale).touch()
+
+        self.assertIsNone(forward(["."], socket_path=stale))
+
+    def test_terminal_bound_options_run_locally(self):
+        with patch("os.path.exists") as mock_exists:
+            self.assertIsNone(forward(["--watch", "."], socket_path="/any.sock"))
+            self.assertIsNone(forward(["--clipboard", "osc52", "."], socket_path="/any.sock"))
+        mock_exists.assert_not_called()
+
+
+@unittest.skipUnless(hasattr(os, "getuid"), "Unix sockets required")
+class TestServe(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        self.socket_path = str(self.temp_path / "clipcode.sock")
+        self.project = self.temp_path / "project"
+        for name, content in (("a.py", "a = 1\n"), ("pkg/b.py", "b = 1\n")):
+            path = self.project / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content, encoding="utf-8")
+            os.utime(path, (_OLD, _OLD))
+        for directory in (self.project, self.project / "pkg"):
+            os.utime(directory, (_OLD, _OLD))
+
+        self.stop = threading.Event()
+        ready = threading.Event()
+        self.server_stderr = io.StringIO()
+        with patch.object(sys, "stderr", self.server_stderr):
+            self.thread = threading.Thread(
+                target=serve, args=(_run, self.socket_path), kwargs={"stop": self.stop, "ready": ready}
+            )
+            self.thread.start()
+            self.assertTrue(ready.wait(5))
+
+    def tearDown(self):
+        self.stop.set()
+        self.thread.join()
+        exporter._resident = None
+        shutil.rmtree(self.temp_dir)
+
+    def call(self, *argv: str) -> tuple[int, bytes, bytes]:
+        out, err = io.BytesIO(), io.BytesIO()
+        code = forward(list(argv), self.socket_path, out, err)
+        return code, out.getvalue(), err.getvalue()
+
+    def test_streams_stdout_and_exit_code(self):
+        code, out, err = self.call("--stdout", str(self.project), "py")
+
+        self.assertEqual(code, 0)
+        self.assertIn(b"a = 1", out)
+        self.assertIn(b"b = 1", out)
+
+    def test_relative_paths_use_client_directory(self):
+        cwd = os.getcwd()
+        os.chdir(self.project)
+        try:
+            code, _, err = self.call("-o", "out.md", ".", "py")
+        finally:
+            os.chdir(cwd)
+
+        self.assertEqual(code, 0, err)
+        self.assertIn("a = 1", (self.project / "out.md").read_text(encoding="utf-8"))
+
+    def test_argument_errors_are_reported(self):
+        code, _, err = self.call("--jobs", "0", str(self.project))
+
+        self.assertEqual(code, 2)
+        self.assertIn(b"--jobs", err)
+
+    def test_second_call_reuses_resident_state(self):
+        self.call("--stdout", str(self.project), "py")
+
+        with patch.object(loader, "load_file", wraps=loader.load_file) as mock_load:
+            code, out, _ = self.call("--stdout", str(self.project), "py")
+
+        self.assertEqual(code, 0)
+        self.assertIn(b"b = 1", out)
+        mock_load.assert_not_called()
+
+    def test_second_daemon_refuses_to_start(self):
+        with patch.object(sys, "stderr", io.StringIO()) as err:
+            self.assertEqual(serve(_run, self.socket_path), 1)
+
+        self.assertIn("läuft bereits", err.getvalue())
+
+
+if __name__ == '__main__':
+    unittest.main()
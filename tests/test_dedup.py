@@ -0,0 +1,146 @@
+import builtins
+import hashlib
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode.dedup import ContentIndex, find_duplicates
+from clipcode.exporter import export_files_to_clipboard
+from clipcode.loader import LoadedFile
+from tests.clipboard import clipboard_text
+
+
+class TestFindDuplicates(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, name: str, content: str) -> str:
+        path = self.temp_path / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding="utf-8")
+        return str(path)
+
+    def test_hardlinks_and_symlinks_share_an_inode(self):
+        original = self.create_file("a.py", "x = 1\n")
+        hardlink = str(self.temp_path / "b.py")
+        symlink = str(self.temp_path / "c.py")
+        os.link(original, hardlink)
+        os.symlink(original, symlink)
+
+        with patch("builtins.open") as mock_open:
+            result = find_duplicates([original, hardlink, symlink])
+
+        self.assertEqual(result.same_file, {hardlink: original, symlink: original})
+        self.assertEqual(result.same_size, set())
+        mock_open.assert_not_called()
+
+    def test_files_sharing_a_size_are_hash_candidates(self):
+        first = self.create_file("vendor/a/util.py", "def f():\n    pass\n")
+        copy = self.create_file("vendor/b/util.py", "def f():\n    pass\n")
+        other = self.create_file("other.py", "def other():\n    pass\n")
+        empty, empty_too = self.create_file("e1.py", ""), self.create_file("e2.py", "")
+
+        result = find_duplicates([first, copy, other, empty, empty_too])
+
+        self.assertEqual(result.same_file, {})
+        self.assertEqual(result.same_size, {first, copy})
+
+
+class TestContentIndex(unittest.TestCase):
+
+    def test_identical_content_maps_to_first_occurrence(self):
+        index = ContentIndex()
+        same = LoadedFile("def f():\n    pass\n", 2, 2, digest=b"1")
+        other = LoadedFile("def g():\n    pass\n", 2, 2, digest=b"2")
+
+        self.assertIsNone(index.original("vendor/a/util.py", same))
+        self.assertIsNone(index.original("other.py", other))
+        self.assertEqual(index.original("vendor/b/util.py", same), "vendor/a/util.py")
+
+    def test_empty_files_and_missing_digests_are_kept(self):
+        index = ContentIndex()
+        empty = LoadedFile("", 0, 0, digest=b"e")
+        unhashed = LoadedFile("x\n", 1, 1)
+
+        for path in ("a.py", "b.py"):
+            self.assertIsNone(index.original(path, empty))
+            self.assertIsNone(index.original(path, unhashed))
+
+
+class TestDedupExport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        for name in ("a/stub.py", "b/stub.py"):
+            (self.temp_path / name).parent.mkdir(parents=True, exist_ok=True)
+            (self.temp_path / name).write_text("GENERATED = True\n", encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def _export(self, mock_popen, **kwargs) -> str:
+        mock_popen.return_value.wait.return_value = 0
+        with patch("builtins.print"):
+            export_files_to_clipboard(str(self.temp_path), None, respect_gitignore=False, **kwargs)
+        return clipboard_text(mock_popen)
+
+    @patch("subprocess.Popen")
+    def test_later_copies_become_references(self, mock_popen):
+        content = self._export(mock_popen)
+
+        # Traversal order decides which copy counts as the first occurrence
+        paths = [str(self.temp_path / name) for name in ("a/stub.py", "b/stub.py")]
+        first, second = sorted(paths, key=lambda path: content.index(f"### {path}\n"))
+        self.assertEqual(content.count("GENERATED = True"), 1)
+        self.assertIn(f"### {second}\n🔁 Identisch mit {first}\n---\n", content)
+
+    @patch("subprocess.Popen")
+    def test_each_copy_is_opened_once(self, mock_popen):
+        real_open = builtins.open
+        opened = []
+
+        def tracking_open(file, *args, **kwargs):
+            opened.append(str(file))
+            return real_open(file, *args, **kwargs)
+
+        with patch("builtins.open", tracking_open):
+            self._export(mock_popen)
+
+        for name in ("a/stub.py", "b/stub.py"):
+            self.assertEqual(opened.count(str(self.temp_path / name)), 1, name)
+
+    @patch("subprocess.Popen")
+    def test_only_size_collisions_are_hashed(self, mock_popen):
+        (self.temp_path / "unique.py").write_text("print('only one of its size')\n", encoding="utf-8")
+        real_blake2b = hashlib.blake2b
+        hashed = []
+
+        def tracking_blake2b(data=b"", **kwargs):
+            hashed.append(bytes(data))
+            return real_blake2b(data, **kwargs)
+
+        with patch("clipcode.loader.hashlib.blake2b", tracking_blake2b):
+            self._export(mock_popen)
+
+        self.assertEqual(hashed, [b"GENERATED = True\n"] * 2)
+
+    @patch("subprocess.Popen")
+    def test_dedup_can_be_disabled(self, mock_popen):
+        content = self._export(mock_popen, dedup=False)
+
+        self.assertEqual(content.count("GENERATED = True"), 2)
+        self.assertNotIn("Identisch mit", content)
+
+
+if __name__ == "__main__":
+    unittest.main()
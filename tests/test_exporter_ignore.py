@@ -2,9 +2,12 @@ import unittest
 import tempfile
 import os
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
+from clipcode import file_utils
 from clipcode.exporter import export_files_to_clipboard
+from clipcode.git_index import GitIndexError
+from tests.clipboard import clipboard_text
 
 
 class TestExporterIgnorePatterns(unittest.TestCase):
@@ -24,8 +27,8 @@ class TestExporterIgnorePatterns(unittest.TestCase):
         file_path.write_text(content, encoding="utf-8")
         return file_path
 
-    @patch("subprocess.run")
-    def test_ignore_patterns_exclude_files(self, mock_run):
+    @patch("subprocess.Popen")
+    def test_ignore_patterns_exclude_files(self, mock_popen):
         """Stellt sicher, dass Dateien, die durch -i/--ignore angegeben sind, ausgeschlossen werden."""
         # Dateien erstellen
         keep_py = self._create_file("keep.py", "print('keep')")
@@ -33,7 +36,7 @@ class TestExporterIgnorePatterns(unittest.TestCase):
         log_file = self._create_file("logs/app.log", "log")
 
         # Clipboard Call abfangen
-        mock_run.return_value = MagicMock()
+        mock_popen.return_value.wait.return_value = 0
 
         export_files_to_clipboard(
             root_path=str(self.temp_path),
@@ -43,22 +46,21 @@ class TestExporterIgnorePatterns(unittest.TestCase):
         )
 
         # Inhalt aus dem Clipboard-Aufruf extrahieren
-        call_args = mock_run.call_args
-        clipboard_content = call_args[1]["input"].decode("utf-8")
+        clipboard_content = clipboard_text(mock_popen)
 
         self.assertIn("keep.py", clipboard_content)
         self.assertNotIn("ignore_me.py", clipboard_content)
         self.assertNotIn("app.log", clipboard_content)
 
-    @patch("subprocess.run")
-    def test_ignore_patterns_override_gitignore_negation(self, mock_run):
+    @patch("subprocess.Popen")
+    def test_ignore_patterns_override_gitignore_negation(self, mock_popen):
         """Explizite Patterns haben Vorrang vor .gitignore-Negationen."""
         # Dateien anlegen
         overridden_file = self._create_file("important.py", "print('important')")
         # .gitignore mit Negation (!important.py) – würde die Datei eigentlich erzwingen
         (self.temp_path / ".gitignore").write_text("*.py\n!important.py\n", encoding="utf-8")
 
-        mock_run.return_value = MagicMock()
+        mock_popen.return_value.wait.return_value = 0
 
         export_files_to_clipboard(
             root_path=str(self.temp_path),
@@ -67,18 +69,18 @@ class TestExporterIgnorePatterns(unittest.TestCase):
             ignore_patterns=["important.py"],
         )
 
-        clipboard_content = mock_run.call_args[1]["input"].decode("utf-8")
+        clipboard_content = clipboard_text(mock_popen)
 
         # Trotz Negation soll Datei ausgeschlossen werden
         self.assertNotIn("important.py", clipboard_content)
 
-    @patch("subprocess.run")
-    def test_large_file_is_truncated_and_marked_outside_codeblock(self, mock_run):
+    @patch("subprocess.Popen")
+    def test_large_file_is_truncated_and_marked_outside_codeblock(self, mock_popen):
         """Große Dateien werden gekürzt und außerhalb des Codeblocks markiert."""
         many_lines = "\n".join(f"line {i}" for i in range(1, 21))
         self._create_file("large.py", many_lines)
 
-        mock_run.return_value = MagicMock()
+        mock_popen.return_value.wait.return_value = 0
 
         export_files_to_clipboard(
             root_path=str(self.temp_path),
@@ -89,7 +91,7 @@ class TestExporterIgnorePatterns(unittest.TestCase):
             truncate_to=5,
         )
 
-        clipboard_content = mock_run.call_args[1]["input"].decode("utf-8")
+        clipboard_content = clipboard_text(mock_popen)
 
         self.assertIn("large.py", clipboard_content)
         self.assertIn("line 1", clipboard_content)
@@ -101,14 +103,38 @@ class TestExporterIgnorePatterns(unittest.TestCase):
         marker_pos = clipboard_content.find("⚠️ Datei gekürzt")
         self.assertGreater(marker_pos, code_end)
 
-    @patch("subprocess.run")
-    def test_large_file_is_ignored_when_truncate_target_is_zero(self, mock_run):
+    @patch("subprocess.Popen")
+    def test_head_and_tail_truncation_reports_omitted_range(self, mock_popen):
+        """Kopf- und Endbereich bleiben erhalten, die Lücke wird benannt."""
+        many_lines = "\n".join(f"line {i}" for i in range(1, 21))
+        self._create_file("large.py", many_lines)
+
+        mock_popen.return_value.wait.return_value = 0
+
+        export_files_to_clipboard(
+            root_path=str(self.temp_path),
+            extensions=None,
+            respect_gitignore=False,
+            ignore_patterns=None,
+            truncate_from=10,
+            truncate_to=3,
+            truncate_tail=2,
+        )
+
+        clipboard_content = clipboard_text(mock_popen)
+
+        self.assertIn("line 3\n⋮\nline 19\nline 20\n```", clipboard_content)
+        self.assertNotIn("line 4\n", clipboard_content)
+        self.assertIn("⚠️ Datei gekürzt: 20 → 5 Zeilen (Grenze: > 10), ausgelassen: Zeilen 4–18.", clipboard_content)
+
+    @patch("subprocess.Popen")
+    def test_large_file_is_ignored_when_truncate_target_is_zero(self, mock_popen):
         """Große Dateien werden ignoriert, wenn truncate_to=0 gesetzt ist."""
         many_lines = "\n".join(f"line {i}" for i in range(1, 21))
         self._create_file("large.py", many_lines)
         self._create_file("small.py", "small\nfile")
 
-        mock_run.return_value = MagicMock()
+        mock_popen.return_value.wait.return_value = 0
 
         export_files_to_clipboard(
             root_path=str(self.temp_path),
@@ -119,18 +145,18 @@ class TestExporterIgnorePatterns(unittest.TestCase):
             truncate_to=0,
         )
 
-        clipboard_content = mock_run.call_args[1]["input"].decode("utf-8")
+        clipboard_content = clipboard_text(mock_popen)
 
         self.assertIn("small.py", clipboard_content)
         self.assertNotIn("large.py", clipboard_content)
 
-    @patch("subprocess.run")
-    def test_file_at_threshold_is_not_truncated(self, mock_run):
+    @patch("subprocess.Popen")
+    def test_file_at_threshold_is_not_truncated(self, mock_popen):
         """Bei exakt truncate_from Zeilen erfolgt keine Kürzung (nur > Grenze)."""
         ten_lines = "\n".join(f"line {i}" for i in range(1, 11))
         self._create_file("exact.py", ten_lines)
 
-        mock_run.return_value = MagicMock()
+        mock_popen.return_value.wait.return_value = 0
 
         export_files_to_clipboard(
             root_path=str(self.temp_path),
@@ -141,12 +167,134 @@ class TestExporterIgnorePatterns(unittest.TestCase):
             truncate_to=5,
         )
 
-        clipboard_content = mock_run.call_args[1]["input"].decode("utf-8")
+        clipboard_content = clipboard_text(mock_popen)
 
         self.assertIn("exact.py", clipboard_content)
         self.assertIn("line 10", clipboard_content)
         self.assertNotIn("⚠️ Datei gekürzt", clipboard_content)
 
+    @patch("subprocess.Popen")
+    def test_ignored_directories_are_pruned_during_traversal(self, mock_popen):
+        """Per .gitignore, -i oder .git ausgeschlossene Verzeichnisse werden nicht betreten."""
+        self._create_file("src/main.py", "print('main')")
+        self._create_file("node_modules/pkg/index.js", "x")
+        self._create_file("vendor/lib.py", "x")
+        self._create_file(".git/config", "x")
+        (self.temp_path / ".gitignore").write_text("node_modules/\n", encoding="utf-8")
+
+        mock_popen.return_value.wait.return_value = 0
+        walked = []
+        real_scan_dir = file_utils._scan_dir
+
+        def tracking_scan_dir(dir_path):
+            walked.append(os.path.relpath(dir_path, self.temp_dir))
+            return real_scan_dir(dir_path)
+
+        with patch("clipcode.file_utils._scan_dir", tracking_scan_dir):
+            export_files_to_clipboard(
+                root_path=str(self.temp_path),
+                extensions=None,
+                respect_gitignore=True,
+                ignore_patterns=["vendor"],
+            )
+
+        clipboard_content = clipboard_text(mock_popen)
+        self.assertIn("main.py", clipboard_content)
+        self.assertNotIn("index.js", clipboard_content)
+        self.assertNotIn("lib.py", clipboard_content)
+        self.assertIn("src", walked)
+        for pruned in ("node_modules", "vendor", ".git"):
+            self.assertNotIn(pruned, walked)
+
+    @patch("subprocess.Popen")
+    def test_pruning_keeps_negated_files_in_partially_ignored_directory(self, mock_popen):
+        """Ein Verzeichnis, dessen Inhalt per 'dir/*' ignoriert wird, bleibt begehbar."""
+        self._create_file("build/keep.txt", "keep")
+        self._create_file("build/drop.txt", "drop")
+        (self.temp_path / ".gitignore").write_text("build/*\n!build/keep.txt\n", encoding="utf-8")
+
+        mock_popen.return_value.wait.return_value = 0
+
+        export_files_to_clipboard(
+            root_path=str(self.temp_path),
+            extensions=None,
+            respect_gitignore=True,
+        )
+
+        clipboard_content = clipboard_text(mock_popen)
+        self.assertIn("keep.txt", clipboard_content)
+        self.assertNotIn("drop.txt", clipboard_content)
+
+    @patch("subprocess.Popen")
+    def test_nested_gitignore_is_applied(self, mock_popen):
+        """Verschachtelte .gitignore-Dateien gelten für ihren Teilbaum."""
+        self._create_file("main.py", "print('main')")
+        self._create_file("pkg/generated.py", "x")
+        self._create_file("pkg/module.py", "x")
+        self._create_file("other/generated.py", "x")
+        (self.temp_path / "pkg" / ".gitignore").write_text("generated.py\n", encoding="utf-8")
+
+        mock_popen.return_value.wait.return_value = 0
+
+        export_files_to_clipboard(
+            root_path=str(self.temp_path),
+            extensions=None,
+            respect_gitignore=True,
+        )
+
+        clipboard_content = clipboard_text(mock_popen)
+        self.assertIn("module.py", clipboard_content)
+        self.assertIn(os.path.join("other", "generated.py"), clipboard_content)
+        self.assertNotIn(os.path.join("pkg", "generated.py"), clipboard_content)
+
+    @patch("subprocess.Popen")
+    def test_from_index_outside_repository_falls_back_to_walk(self, mock_popen):
+        """Ohne Repository wird mit Hinweis auf die Traversierung zurückgefallen."""
+        self._create_file("main.py", "print('main')")
+        mock_popen.return_value.wait.return_value = 0
+
+        with patch("clipcode.exporter.find_files_from_index", side_effect=GitIndexError("kein Repository")), \
+                patch("builtins.print") as mock_print:
+            export_files_to_clipboard(
+                root_path=str(self.temp_path),
+                extensions=None,
+                respect_gitignore=False,
+                from_index=True,
+            )
+
+        clipboard_content = clipboard_text(mock_popen)
+        self.assertIn("main.py", clipboard_content)
+        self.assertTrue(any("git-Index" in str(c) for c in mock_print.call_args_list))
+
+    @patch("subprocess.Popen")
+    def test_from_index_applies_ignore_patterns_but_not_gitignore(self, mock_popen):
+        """Versionierte Dateien werden per -i, aber nicht per .gitignore ausgeschlossen."""
+        from tests.test_git_index import _build_index
+
+        self._create_file("tracked.log", "tracked log")
+        self._create_file("src/main.py", "print('main')")
+        self._create_file("secret/key.txt", "secret")
+        (self.temp_path / ".gitignore").write_text("*.log\n", encoding="utf-8")
+        (self.temp_path / ".git").mkdir()
+        (self.temp_path / ".git" / "index").write_bytes(
+            _build_index([".gitignore", "secret/key.txt", "src/main.py", "tracked.log"])
+        )
+        mock_popen.return_value.wait.return_value = 0
+
+        export_files_to_clipboard(
+            root_path=str(self.temp_path),
+            extensions=None,
+            respect_gitignore=True,
+            ignore_patterns=["secret"],
+            from_index=True,
+        )
+
+        clipboard_content = clipboard_text(mock_popen)
+        self.assertIn("main.py", clipboard_content)
+        self.assertIn("tracked.log", clipboard_content)
+        self.assertNotIn("key.txt", clipboard_content)
+        self.assertNotIn("### " + str(self.temp_path / ".gitignore"), clipboard_content)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,118 @@
+import builtins
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode.exporter import export_files_to_clipboard
+from clipcode.file_utils import decode_content, read_file_content
+from tests.clipboard import clipboard_text
+
+
+class TestExporterFileLoading(unittest.TestCase):
+    """Tests für das Einlesen, Klassifizieren und Dekodieren beim Export."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def _create_file(self, relative_path: str, data: bytes):
+        file_path = self.temp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_bytes(data)
+        return str(file_path)
+
+    def _export(self, mock_popen, **kwargs) -> str:
+        mock_popen.return_value.wait.return_value = 0
+        export_files_to_clipboard(str(self.temp_path), None, respect_gitignore=False, **kwargs)
+        return clipboard_text(mock_popen)
+
+    @patch("subprocess.Popen")
+    def test_each_file_is_opened_once(self, mock_popen):
+        """Klassifizierung und Inhalt stammen aus demselben Lesevorgang."""
+        paths = [
+            self._create_file("text.py", b"print('x')\n"),
+            self._create_file("latin.txt", "Viele Grüße aus München".encode("latin1")),
+            self._create_file("binary.bin", b"\x00\x01\x02" * 100),
+        ]
+        real_open = builtins.open
+        opened = []
+
+        def tracking_open(file, *args, **kwargs):
+            opened.append(str(file))
+            return real_open(file, *args, **kwargs)
+
+        with patch("builtins.open", tracking_open):
+            self._export(mock_popen)
+
+        for path in paths:
+            self.assertEqual(opened.count(path), 1, path)
+
+    @patch("subprocess.Popen")
+    def test_latin1_fallback_and_binary_skip(self, mock_popen):
+        """Nicht-UTF-8-Text wird als latin1 dekodiert, Binärdateien entfallen."""
+        self._create_file("latin.txt", "Viele Grüße aus München".encode("latin1"))
+        self._create_file("binary.bin", b"\x00\x01\x02" * 100)
+
+        content = self._export(mock_popen)
+
+        self.assertIn("Viele Grüße aus München", content)
+        self.assertNotIn("binary.bin", content)
+
+    @patch("subprocess.Popen")
+    def test_crlf_and_cr_line_endings_are_normalized(self, mock_popen):
+        """Wie beim Lesen im Textmodus enthalten die Codeblöcke nur \\n."""
+        self._create_file("windows.txt", b"a\r\nb\r\n")
+        self._create_file("mac.txt", b"c\rd\r")
+
+        content = self._export(mock_popen)
+
+        self.assertNotIn("\r", content)
+        self.assertIn("```\na\nb\n\n```", content)
+        self.assertIn("```\nc\nd\n\n```", content)
+
+    @patch("subprocess.Popen")
+    def test_utf16_file_with_bom_is_exported(self, mock_popen):
+        """UTF-16-Dateien mit BOM gelten als Text und werden korrekt dekodiert."""
+        self._create_file("windows.txt", "\ufeffZeile äöü".encode("utf-16-le"))
+
+        content = self._export(mock_popen)
+
+        self.assertIn("```\nZeile äöü\n```", content)
+
+    @patch("subprocess.Popen")
+    def test_svg_is_skipped_without_reading(self, mock_popen):
+        """SVG-Dateien werden übersprungen, ohne sie zu öffnen."""
+        svg = self._create_file("icon.svg", b"<svg></svg>")
+        real_open = builtins.open
+        opened = []
+
+        def tracking_open(file, *args, **kwargs):
+            opened.append(str(file))
+            return real_open(file, *args, **kwargs)
+
+        with patch("builtins.open", tracking_open):
+            content = self._export(mock_popen)
+
+        self.assertNotIn("icon.svg", content)
+        self.assertNotIn(svg, opened)
+
+
+class TestDecodeContent(unittest.TestCase):
+
+    def test_decode_utf8(self):
+        self.assertEqual(decode_content("äöü".encode("utf-8")), "äöü")
+
+    def test_decode_falls_back_to_latin1(self):
+        self.assertEqual(decode_content(b"\xe4\xf6\xfc"), "äöü")
+
+    def test_read_file_content_reports_errors(self):
+        self.assertTrue(read_file_content("/nonexistent/clipcode").startswith("[Fehler beim Lesen der Datei:"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+import base64
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode.exporter import _ClipboardSink, _Osc52Sink, _detect_clipboard, export_files_to_clipboard
+from tests.clipboard import clipboard_text
+
+
+class TestClipboardSink(unittest.TestCase):
+    """Runs the sink against a small Python process that stores its stdin."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.target = Path(self.temp_dir) / "clipboard.txt"
+        self.command = [
+            sys.executable, "-c",
+            f"import sys; data = sys.stdin.buffer.read(); open({str(self.target)!r}, 'wb').write(data)",
+        ]
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_sections_are_streamed_into_stdin(self):
+        sink = _ClipboardSink(self.command)
+        sink.write("## Projektdateien\n")
+        sink.write("\n### a.py\nä\n")
+        sink.close()
+
+        self.assertEqual(self.target.read_text(encoding="utf-8"), "## Projektdateien\n\n### a.py\nä\n")
+
+    def test_failing_command_raises(self):
+        sink = _ClipboardSink([sys.executable, "-c", "import sys; sys.stdin.read(); sys.exit(3)"])
+        sink.write("x")
+        with self.assertRaises(subprocess.CalledProcessError):
+            sink.close()
+
+    def test_abort_does_not_hand_over_partial_output(self):
+        sink = _ClipboardSink(self.command)
+        sink.write("partial")
+        sink.abort()
+
+        self.assertFalse(self.target.exists())
+
+
+class TestExporterClipboardErrors(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        (Path(self.temp_dir) / "main.py").write_text("print('x')\n", encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    @patch("subprocess.Popen")
+    def test_missing_clipboard_program_is_reported(self, mock_popen):
+        mock_popen.side_effect = FileNotFoundError("wl-copy")
+
+        with patch("builtins.print") as mock_print:
+            export_files_to_clipboard(self.temp_dir, None)
+
+        mock_print.assert_called_once()
+        self.assertIn("❌ Fehler beim Kopieren in die Zwischenablage", mock_print.call_args.args[0])
+
+    @patch("subprocess.Popen")
+    def test_nonzero_exit_is_reported(self, mock_popen):
+        mock_popen.return_value.wait.return_value = 1
+
+        with patch("builtins.print") as mock_print:
+            export_files_to_clipboard(self.temp_dir, None)
+
+        self.assertIn("main.py", clipboard_text(mock_popen))
+        self.assertIn("❌ Fehler beim Kopieren in die Zwischenablage", mock_print.call_args.args[0])
+
+    @patch("subprocess.Popen")
+    def test_unexpected_error_aborts_clipboard_process(self, mock_popen):
+        mock_popen.return_value.wait.return_value = 0
+
+        with patch("clipcode.exporter.get_syntax_highlight_tag", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                export_files_to_clipboard(self.temp_dir, None)
+
+        mock_popen.return_value.kill.assert_called_once()
+
+
+class TestOutputSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        (self.temp_path / "src").mkdir()
+        (self.temp_path / "src" / "main.py").write_text("print('x')\n", encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_output_file(self):
+        target = self.temp_path / "export.md"
+
+        with patch("builtins.print") as mock_print:
+            export_files_to_clipboard(str(self.temp_path / "src"), None, output=str(target))
+
+        content = target.read_text(encoding="utf-8")
+        self.assertTrue(content.startswith("## Projektdateien\n\n### "))
+        self.assertIn("print('x')", content)
+        self.assertIn(str(target), mock_print.call_args.args[0])
+
+    def test_stdout_keeps_status_messages_off_stdout(self):
+        stdout = io.TextIOWrapper(io.BytesIO(), encoding="utf-8")
+
+        with patch("sys.stdout", stdout), patch("sys.stderr", io.StringIO()) as stderr:
+            export_files_to_clipboard(str(self.temp_path / "src"), None, to_stdout=True)
+
+        written = stdout.buffer.getvalue().decode("utf-8")
+        self.assertTrue(written.startswith("## Projektdateien\n"))
+        self.assertIn("print('x')", written)
+        self.assertEqual(stderr.getvalue(), "")
+
+    def test_unwritable_output_fails_before_file_search(self):
+        with patch("clipcode.exporter._export_file_list") as mock_files, \
+                patch("builtins.print") as mock_print:
+            export_files_to_clipboard(str(self.temp_path), None, output=str(self.temp_path / "missing" / "x.md"))
+
+        mock_files.assert_not_called()
+        self.assertIn("❌ Fehler beim Schreiben der Ausgabedatei", mock_print.call_args.args[0])
+
+    def test_osc52_sequence(self):
+        tty = self.temp_path / "tty"
+        sink = _Osc52Sink(str(tty))
+        payload = "ä" * 300_000
+        sink.write(payload)
+        sink.close()
+
+        data = tty.read_bytes()
+        self.assertTrue(data.startswith(b"\x1b]52;c;") and data.endswith(b"\x07"))
+        self.assertEqual(base64.b64decode(data[7:-1]).decode("utf-8"), payload)
+
+    def test_clipboard_detection(self):
+        available = {"wl-copy", "xsel"}
+        with patch("shutil.which", side_effect=lambda name: name if name in available else None):
+            with patch.dict(os.environ, {"WAYLAND_DISPLAY": "wayland-0", "DISPLAY": ":0"}):
+                self.assertEqual(_detect_clipboard(), "wl-copy")
+            with patch.dict(os.environ, {"DISPLAY": ":0"}):
+                os.environ.pop("WAYLAND_DISPLAY", None)
+                self.assertEqual(_detect_clipboard(), "xsel")
+
+    @patch("subprocess.Popen")
+    def test_explicit_clipboard_backend(self, mock_popen):
+        mock_popen.return_value.wait.return_value = 0
+
+        with patch("builtins.print"):
+            export_files_to_clipboard(str(self.temp_path / "src"), None, clipboard="xclip")
+
+        self.assertEqual(mock_popen.call_args.args[0], ["xclip", "-selection", "clipboard"])
+        self.assertIn("print('x')", clipboard_text(mock_popen))
+
+
+class TestSplitExport(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        self.src = self.temp_path / "src"
+        self.src.mkdir()
+        for name in ("a.py", "b.py", "c.py"):
+            (self.src / name).write_text(f"# {name}\n" + "x = 1\n" * 60, encoding="utf-8")
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def _export(self, **kwargs):
+        with patch("builtins.print"):
+            export_files_to_clipboard(str(self.src), None, respect_gitignore=False, walk_threads=2, **kwargs)
+
+    def test_parts_keep_sections_whole(self):
+        self._export(output=str(self.temp_path / "export.md"), split_bytes=600)
+
+        parts = sorted(self.temp_path.glob("export.*.md"))
+        self.assertEqual([p.name for p in parts], ["export.001.md", "export.002.md", "export.003.md"])
+        names = []
+        for number, part in enumerate(parts, start=1):
+            content = part.read_text(encoding="utf-8")
+            self.assertTrue(content.startswith(f"## Projektdateien (Teil {number})\n"))
+            self.assertLessEqual(len(content.encode("utf-8")), 600)
+            self.assertEqual(content.count("```python"), 1)
+            names.extend(name for name in ("a.py", "b.py", "c.py") if f"# {name}\n" in content)
+        self.assertEqual(sorted(names), ["a.py", "b.py", "c.py"])
+
+    def test_oversized_section_is_split_at_lines(self):
+        self._export(output=str(self.temp_path / "export.md"), split_bytes=200)
+
+        parts = sorted(self.temp_path.glob("export.*.md"))
+        self.assertGreater(len(parts), 3)
+        combined = ""
+        for part in parts:
+            content = part.read_text(encoding="utf-8")
+            self.assertLessEqual(len(content.encode("utf-8")), 200)
+            combined += content.split("\n", 1)[1]
+        self.assertEqual(combined.count("x = 1\n"), 180)
+
+    def test_split_parts_have_balanced_fences(self):
+        self._export(output=str(self.temp_path / "export.md"), split_bytes=200)
+
+        parts = sorted(self.temp_path.glob("export.*.md"))
+        continued = 0
+        for part in parts:
+            content = part.read_text(encoding="utf-8")
+            lines = content.splitlines()
+            fences = [line for line in lines if line.startswith("```")]
+            self.assertLessEqual(len(content.encode("utf-8")), 200)
+            self.assertEqual(len(fences) % 2, 0, content)
+            # Openers carry the language, closers are bare
+            self.assertEqual(fences[0::2], ["```python"] * (len(fences) // 2), content)
+            self.assertEqual(fences[1::2], ["```"] * (len(fences) // 2), content)
+            if lines[1].endswith(" (Fortsetzung)"):
+                continued += 1
+                self.assertTrue(lines[1].startswith("### "))
+                self.assertEqual(lines[2], "```python")
+        self.assertGreater(continued, 0)
+
+    def test_first_part_is_written_before_later_files_load(self):
+        from clipcode import exporter
+        real_load_files = exporter.load_files
+        seen_parts = []
+
+        def tracking_load_files(*args, **kwargs):
+            for index, item in enumerate(real_load_files(*args, **kwargs)):
+                if index == 2:
+                    seen_parts.append((self.temp_path / "export.001.md").read_text(encoding="utf-8"))
+                yield item
+
+        with patch("clipcode.exporter.load_files", tracking_load_files):
+            self._export(output=str(self.temp_path / "export.md"), split_bytes=600)
+
+        # Part 1 is complete on disk before the third file is loaded
+        self.assertEqual(seen_parts, [(self.temp_path / "export.001.md").read_text(encoding="utf-8")])
+        self.assertIn("# a.py", seen_parts[0])
+
+    @patch("subprocess.Popen")
+    def test_clipboard_parts_wait_for_enter(self, mock_popen):
+        mock_popen.return_value.wait.return_value = 0
+
+        with patch("builtins.input") as mock_input:
+            self._export(split_tokens=250, clipboard="wl-copy")
+
+        self.assertEqual(mock_popen.call_count, 3)
+        self.assertEqual(mock_input.call_count, 2)
+        self.assertEqual(clipboard_text(mock_popen).count("## Projektdateien (Teil "), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
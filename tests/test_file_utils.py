@@ -0,0 +1,275 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode import file_utils
+from clipcode.file_utils import (
+    DirCache,
+    TreeFilter,
+    find_all_files,
+    find_files_with_extensions,
+    matches_extension,
+    normalize_extensions,
+)
+
+
+class _SkipNames(TreeFilter):
+    """Test filter that skips entries by name and records entered directories."""
+
+    def __init__(self, *names: str):
+        self.names = set(names)
+        self.entered: list[str] = []
+
+    def enter(self, dir_path, rel_dir, parent_scope):
+        self.entered.append(rel_dir)
+        return rel_dir
+
+    def skip_dir(self, path, rel, scope):
+        return os.path.basename(path) in self.names
+
+    def skip_file(self, path, rel, scope):
+        return os.path.basename(path) in self.names
+
+
+class TestFileTraversal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, relative_path: str, content: str = "test content"):
+        """Helper method to create a file in the temp directory."""
+        file_path = self.temp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding='utf-8')
+        return str(file_path)
+
+    def test_find_all_files_without_filter(self):
+        """All files are found when no directory filter is given."""
+        expected = {self.create_file("a.py"), self.create_file("sub/b.txt")}
+
+        self.assertEqual(set(find_all_files(self.temp_dir)), expected)
+
+    def test_skipped_directories_are_not_descended(self):
+        """Directories rejected by skip_dir are pruned before they are listed."""
+        keep = self.create_file("src/main.py")
+        self.create_file("node_modules/pkg/index.js")
+        tree_filter = _SkipNames("node_modules")
+
+        files = find_all_files(self.temp_dir, tree_filter)
+
+        self.assertEqual(files, [keep])
+        self.assertEqual(sorted(tree_filter.entered), ["", "src"])
+
+    def test_scope_is_passed_from_parent_directory(self):
+        """The scope returned by enter() reaches the filters of that directory."""
+        self.create_file("a/b/c.txt")
+        seen = {}
+
+        class _Recorder(TreeFilter):
+            def enter(self, dir_path, rel_dir, parent_scope):
+                seen[rel_dir] = parent_scope
+                return rel_dir
+
+        find_all_files(self.temp_dir, _Recorder())
+
+        self.assertEqual(seen, {"": None, "a": "", "a/b": "a"})
+
+    def test_extensions_with_skip_dir(self):
+        """Extension filtering and directory pruning work together."""
+        keep = self.create_file("src/main.py")
+        self.create_file("src/notes.md")
+        self.create_file("build/gen.py")
+
+        files = find_files_with_extensions(self.temp_dir, ["py"], _SkipNames("build"))
+
+        self.assertEqual(files, [keep])
+
+    def test_same_files_and_order_as_os_walk(self):
+        """The scandir walker lists the same files in the same order as os.walk."""
+        for rel in ("b.txt", "a/x.py", "a/b/y.py", "c/z.py", "a/b/c/d/e.py"):
+            self.create_file(rel)
+
+        expected = [os.path.join(d, f) for d, _, names in os.walk(self.temp_dir) for f in names]
+
+        self.assertEqual(find_all_files(self.temp_dir), expected)
+
+    def test_relative_root_and_trailing_separator(self):
+        """Paths keep the root exactly as given."""
+        self.create_file("src/a.py")
+        cwd = os.getcwd()
+        os.chdir(self.temp_dir)
+        try:
+            self.assertEqual(find_all_files("."), [os.path.join(".", "src", "a.py")])
+            self.assertEqual(find_all_files("src" + os.sep), [os.path.join("src", "a.py")])
+        finally:
+            os.chdir(cwd)
+
+    @unittest.skipUnless(hasattr(os, "symlink"), "symlinks not supported")
+    def test_symlinked_directories_are_not_descended(self):
+        """Like os.walk, symlinks to directories are neither files nor descended."""
+        target = self.create_file("real/a.py")
+        os.symlink(self.temp_path / "real", self.temp_path / "link")
+
+        self.assertEqual(find_all_files(self.temp_dir), [target])
+
+    def test_multi_dot_extensions(self):
+        """Multi-dot suffixes like .d.ts and .test.py are matched."""
+        exts = normalize_extensions(["d.ts", "test.py", "PY"])
+
+        self.assertTrue(matches_extension("index.d.ts", exts))
+        self.assertTrue(matches_extension("module.test.py", exts))
+        self.assertTrue(matches_extension("Main.Py", exts))
+        self.assertTrue(matches_extension(".py", exts))
+        self.assertFalse(matches_extension("index.ts", exts))
+        self.assertFalse(matches_extension("test.pyc", exts))
+        self.assertFalse(matches_extension("py", exts))
+
+    def test_find_files_with_multi_dot_extension(self):
+        """find_files_with_extensions honours multi-dot suffixes."""
+        keep = self.create_file("types/index.d.ts")
+        self.create_file("src/index.ts")
+
+        self.assertEqual(find_files_with_extensions(self.temp_dir, ["d.ts"]), [keep])
+
+
+class TestParallelTraversal(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        for a in range(5):
+            for b in range(4):
+                for name in ("x.py", "y.txt", "z.log"):
+                    file_path = self.temp_path / f"d{a}" / f"e{b}" / name
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    file_path.write_text("x", encoding='utf-8')
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def test_parallel_matches_serial_order(self):
+        """The threaded walk yields the same files in the same order as one thread."""
+        serial = find_all_files(self.temp_dir)
+
+        for workers in (2, 4, 8):
+            with self.subTest(workers=workers):
+                self.assertEqual(find_all_files(self.temp_dir, workers=workers), serial)
+                self.assertEqual(
+                    find_files_with_extensions(self.temp_dir, ["py", "log"], workers=workers),
+                    find_files_with_extensions(self.temp_dir, ["py", "log"]),
+                )
+
+    def test_parallel_applies_filter_per_directory(self):
+        """Pruning and per-directory scopes work with several workers."""
+        from clipcode.gitignore_utils import GitignoreScopes
+
+        (self.temp_path / ".gitignore").write_text("d1/\n*.log\n", encoding='utf-8')
+        (self.temp_path / "d2" / ".gitignore").write_text("*.txt\n", encoding='utf-8')
+
+        serial = find_files_with_extensions(self.temp_dir, ["py", "txt", "log"], GitignoreScopes(self.temp_dir))
+        parallel = find_files_with_extensions(
+            self.temp_dir, ["py", "txt", "log"], GitignoreScopes(self.temp_dir), workers=3
+        )
+
+        self.assertEqual(parallel, serial)
+        self.assertFalse(any(os.sep + "d1" + os.sep in p for p in parallel))
+        self.assertFalse(any(p.endswith(".log") for p in parallel))
+        self.assertFalse(any(os.sep + "d2" + os.sep in p and p.endswith(".txt") for p in parallel))
+
+    def test_filter_errors_are_raised(self):
+        """An exception inside a worker is re-raised in the caller."""
+        class _Failing(TreeFilter):
+            def enter(self, dir_path, rel_dir, parent_scope):
+                if rel_dir == "d3":
+                    raise RuntimeError("boom")
+                return None
+
+        with self.assertRaises(RuntimeError):
+            find_all_files(self.temp_dir, _Failing(), workers=4)
+
+
+class TestDirCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        for a in range(3):
+            for b in range(2):
+                for name in ("x.py", "y.txt"):
+                    file_path = self.temp_path / f"d{a}" / f"e{b}" / name
+                    file_path.parent.mkdir(parents=True, exist_ok=True)
+                    file_path.write_text("x", encoding='utf-8')
+        (self.temp_path / ".gitignore").write_text("*.txt\n", encoding='utf-8')
+        self.age_directories()
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def age_directories(self):
+        """Directories modified in the last seconds are never cached."""
+        for dirpath, _, _ in os.walk(self.temp_dir):
+            os.utime(dirpath, (1_000_000_000, 1_000_000_000))
+
+    def walk(self, dir_cache: DirCache) -> tuple[list[str], list[str]]:
+        from clipcode.gitignore_utils import GitignoreScopes
+
+        with patch.object(file_utils, "_scan_dir", wraps=file_utils._scan_dir) as mock_scan:
+            files = find_all_files(self.temp_dir, GitignoreScopes(self.temp_dir), dir_cache=dir_cache)
+        return files, [call.args[0] for call in mock_scan.call_args_list]
+
+    def warm_cache(self) -> tuple[list[str], DirCache]:
+        cold = DirCache("key")
+        files, _ = self.walk(cold)
+        return files, DirCache("key", cold.visited)
+
+    def test_unchanged_tree_is_not_listed_again(self):
+        cold_files, warm = self.warm_cache()
+
+        files, scanned = self.walk(warm)
+
+        self.assertEqual(files, cold_files)
+        self.assertEqual(scanned, [])
+        self.assertFalse(warm.changed)
+
+    def test_only_changed_directories_are_listed(self):
+        _, warm = self.warm_cache()
+        new_file = self.temp_path / "d1" / "e0" / "new.py"
+        new_file.write_text("x", encoding='utf-8')
+
+        files, scanned = self.walk(warm)
+
+        self.assertEqual(scanned, [str(self.temp_path / "d1" / "e0")])
+        self.assertIn(str(new_file), files)
+
+    def test_edited_gitignore_revalidates_its_subtree(self):
+        cold_files, warm = self.warm_cache()
+        self.assertFalse(any(f.endswith(".txt") for f in cold_files))
+        # Rewriting an existing file does not change the directory mtime
+        (self.temp_path / ".gitignore").write_text("d2/\n", encoding='utf-8')
+
+        files, scanned = self.walk(warm)
+
+        self.assertTrue(any(f.endswith(".txt") for f in files))
+        self.assertFalse(any(os.sep + "d2" + os.sep in f for f in files))
+        self.assertEqual(len(scanned), 7)
+
+    def test_other_key_lists_everything(self):
+        cold_files, warm = self.warm_cache()
+
+        files, scanned = self.walk(DirCache("other", warm.entries))
+
+        self.assertEqual(files, cold_files)
+        self.assertEqual(len(scanned), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
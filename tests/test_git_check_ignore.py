@@ -0,0 +1,129 @@
+import os
+import shutil
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode.exporter import export_files_to_clipboard
+from clipcode.file_utils import find_all_files
+from clipcode.git_check_ignore import GitCheckIgnore, GitCheckIgnoreError, start_check_ignore
+from clipcode.gitignore_utils import GitignoreScopes
+from tests.clipboard import clipboard_text
+
+
+@unittest.skipUnless(shutil.which("git"), "git binary not available")
+class TestGitCheckIgnore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        subprocess.run(["git", "init", "-q", self.temp_dir], check=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, relative_path: str, content: str = "x"):
+        file_path = self.temp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding="utf-8")
+        return str(file_path)
+
+    def test_check_reports_ignored_paths_in_order(self):
+        """A batch of paths is answered in order through one process."""
+        self.create_file(".gitignore", "*.log\n!keep.log\nbuild/\n")
+        self.create_file("build/out.txt")
+
+        with GitCheckIgnore(self.temp_dir) as engine:
+            verdicts = engine.check(["a.log", "keep.log", "main.py", "build"])
+            again = engine.check(["b.log"])
+
+        self.assertEqual(verdicts, [True, False, False, True])
+        self.assertEqual(again, [True])
+
+    def test_info_exclude_is_honoured(self):
+        """Rules from .git/info/exclude apply, unlike with the builtin engine."""
+        (self.temp_path / ".git" / "info").mkdir(exist_ok=True)
+        (self.temp_path / ".git" / "info" / "exclude").write_text("secret.txt\n", encoding="utf-8")
+
+        with GitCheckIgnore(self.temp_dir) as engine:
+            self.assertEqual(engine.check(["secret.txt", "public.txt"]), [True, False])
+
+    def test_small_batches_are_written_without_threads(self):
+        self.create_file(".gitignore", "*.log\n")
+
+        with GitCheckIgnore(self.temp_dir) as engine, patch("threading.Thread") as mock_thread:
+            verdicts = [engine.check([f"dir{i}/a.log", f"dir{i}/a.py"]) for i in range(50)]
+
+        self.assertEqual(verdicts, [[True, False]] * 50)
+        mock_thread.assert_not_called()
+
+    def test_large_batch_does_not_deadlock(self):
+        """Batches larger than the pipe buffers are streamed without blocking."""
+        self.create_file(".gitignore", "*.log\n")
+        paths = [f"dir/file_{i:05d}.{'log' if i % 2 else 'py'}" for i in range(20000)]
+
+        with GitCheckIgnore(self.temp_dir) as engine:
+            verdicts = engine.check(paths)
+
+        self.assertEqual(verdicts, [bool(i % 2) for i in range(20000)])
+
+    def test_same_files_as_builtin_engine(self):
+        """Both engines select the same files on the same tree."""
+        self.create_file(".gitignore", "*.log\nbuild/\n/dist\ncache/*\n!cache/keep.txt\n")
+        self.create_file("pkg/.gitignore", "generated.py\n")
+        for rel in ("main.py", "a.log", "build/x.py", "dist/y.py", "cache/keep.txt",
+                    "cache/drop.txt", "pkg/generated.py", "pkg/module.py", "sub/dist/z.py"):
+            self.create_file(rel)
+
+        with GitCheckIgnore(self.temp_dir) as engine:
+            git_files = sorted(find_all_files(self.temp_dir, engine))
+        builtin_files = sorted(find_all_files(self.temp_dir, GitignoreScopes(self.temp_dir)))
+
+        self.assertEqual(git_files, builtin_files)
+
+    def test_outside_repository(self):
+        """Outside a repository the engine cannot be started."""
+        outside = tempfile.mkdtemp()
+        try:
+            with patch.dict(os.environ, {"GIT_CEILING_DIRECTORIES": os.path.dirname(outside)}):
+                self.assertIsNone(start_check_ignore(outside))
+        finally:
+            shutil.rmtree(outside)
+
+
+class TestGitEngineFallback(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_missing_git_binary(self):
+        """A missing git binary raises GitCheckIgnoreError."""
+        with self.assertRaises(GitCheckIgnoreError):
+            GitCheckIgnore(self.temp_dir, git="clipcode-no-such-git")
+
+    @patch("subprocess.Popen")
+    def test_exporter_falls_back_to_builtin_engine(self, mock_popen):
+        """Without git the export still honours .gitignore via the builtin engine."""
+        (self.temp_path / ".gitignore").write_text("*.log\n", encoding="utf-8")
+        (self.temp_path / "main.py").write_text("print('main')", encoding="utf-8")
+        (self.temp_path / "debug.log").write_text("log", encoding="utf-8")
+        mock_popen.return_value.wait.return_value = 0
+
+        with patch("clipcode.exporter.start_check_ignore", return_value=None), \
+                patch("builtins.print") as mock_print:
+            export_files_to_clipboard(self.temp_dir, None, ignore_engine="git")
+
+        clipboard_content = clipboard_text(mock_popen)
+        self.assertIn("main.py", clipboard_content)
+        self.assertNotIn("debug.log", clipboard_content)
+        self.assertTrue(any("check-ignore" in str(c) for c in mock_print.call_args_list))
+
+
+if __name__ == "__main__":
+    unittest.main()
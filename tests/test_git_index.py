@@ -0,0 +1,192 @@
+import hashlib
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import unittest
+from pathlib import Path
+
+from clipcode.git_index import (
+    GitIndexError,
+    find_files_from_index,
+    find_git_dir,
+    read_index,
+)
+
+
+def _build_index(paths: list[str], version: int = 2, modes: dict[str, int] | None = None) -> bytes:
+    """Builds a minimal git index file with the given (sorted) paths."""
+    modes = modes or {}
+    body = bytearray(struct.pack(">4sII", b"DIRC", version, len(paths)))
+    previous = b""
+    for path in paths:
+        name = path.encode("utf-8")
+        mode = modes.get(path, 0o100644)
+        entry = struct.pack(">10I20sH", 0, 0, 1_700_000_000, 5, 0, 0, mode, 0, 0, 42, b"\0" * 20, min(len(name), 0xFFF))
+        if version == 4:
+            common = os.path.commonprefix([previous, name])
+            strip = len(previous) - len(common)
+            varint = bytearray([strip & 0x7F])
+            strip >>= 7
+            while strip:
+                strip -= 1
+                varint.insert(0, 0x80 | (strip & 0x7F))
+                strip >>= 7
+            body += entry + bytes(varint) + name[len(common):] + b"\0"
+        else:
+            length = len(entry) + len(name)
+            body += entry + name + b"\0" * (8 - length % 8)
+        previous = name
+    body += hashlib.sha1(body).digest()
+    return bytes(body)
+
+
+class TestReadIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_index(self, data: bytes) -> str:
+        index_path = self.temp_path / "index"
+        index_path.write_bytes(data)
+        return str(index_path)
+
+    def test_read_index_v2(self):
+        """Version 2 entries are padded to multiples of eight bytes."""
+        paths = ["README.md", "src/a.py", "src/package/module_with_long_name.py"]
+        entries = list(read_index(self.write_index(_build_index(paths, 2))))
+
+        self.assertEqual([e.path for e in entries], paths)
+        self.assertEqual(entries[0].size, 42)
+        self.assertEqual(entries[0].mtime_ns, 1_700_000_000_000_000_005)
+
+    def test_read_index_v4_prefix_compression(self):
+        """Version 4 names are prefix-compressed against the previous entry."""
+        paths = ["src/a.py", "src/ab.py", "src/b/c.py", "tests/x" * 30]
+        entries = list(read_index(self.write_index(_build_index(paths, 4))))
+
+        self.assertEqual([e.path for e in entries], paths)
+
+    def test_submodules_are_skipped(self):
+        """Gitlink entries do not correspond to files."""
+        paths = ["lib/sub", "main.py"]
+        data = _build_index(paths, 2, modes={"lib/sub": 0o160000})
+
+        self.assertEqual([e.path for e in read_index(self.write_index(data))], ["main.py"])
+
+    def test_invalid_signature(self):
+        """Non-index files raise GitIndexError."""
+        with self.assertRaises(GitIndexError):
+            list(read_index(self.write_index(b"NOPE" + b"\0" * 20)))
+
+    def test_truncated_index(self):
+        """A truncated index raises GitIndexError instead of returning garbage."""
+        data = _build_index(["a.py", "b.py"], 2)[:50]
+
+        with self.assertRaises(GitIndexError):
+            list(read_index(self.write_index(data)))
+
+
+class TestFindFilesFromIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        (self.temp_path / ".git").mkdir()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, relative_path: str, content: str = "x"):
+        file_path = self.temp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding="utf-8")
+        return str(file_path)
+
+    def write_index(self, paths: list[str], version: int = 2):
+        (self.temp_path / ".git" / "index").write_bytes(_build_index(paths, version))
+
+    def test_lists_tracked_files_below_root(self):
+        """Only entries below the requested subdirectory are returned."""
+        self.write_index(["README.md", "src/a.py", "src/b.ts", "tests/t.py"])
+
+        files = find_files_from_index(str(self.temp_path / "src"))
+
+        self.assertEqual(files, [
+            os.path.join(str(self.temp_path / "src"), "a.py"),
+            os.path.join(str(self.temp_path / "src"), "b.ts"),
+        ])
+
+    def test_extension_filter(self):
+        """Extensions are matched like in the filesystem walk."""
+        self.write_index(["README.md", "src/a.py", "src/b.ts"])
+
+        files = find_files_from_index(self.temp_dir, ["py"])
+
+        self.assertEqual(files, [os.path.join(self.temp_dir, "src", "a.py")])
+
+    def test_include_untracked(self):
+        """Untracked files are added once, tracked ones are not duplicated."""
+        self.create_file("src/a.py")
+        new_file = self.create_file("src/new.py")
+        self.write_index(["src/a.py"])
+
+        files = find_files_from_index(self.temp_dir, ["py"], include_untracked=True)
+
+        self.assertEqual(sorted(files), sorted([os.path.join(self.temp_dir, "src", "a.py"), new_file]))
+
+    def test_find_git_dir_follows_gitfile(self):
+        """A .git file with a gitdir pointer is resolved (worktrees, submodules)."""
+        worktree = self.temp_path / "worktree"
+        worktree.mkdir()
+        (worktree / ".git").write_text("gitdir: ../.git/worktrees/wt\n", encoding="utf-8")
+
+        git_dir, root = find_git_dir(str(worktree / "sub"))
+
+        self.assertEqual(root, str(worktree))
+        self.assertEqual(git_dir, str(self.temp_path / ".git" / "worktrees" / "wt"))
+
+    def test_outside_repository(self):
+        """Directories outside any repository raise GitIndexError."""
+        shutil.rmtree(self.temp_path / ".git")
+
+        with self.assertRaises(GitIndexError):
+            find_files_from_index(self.temp_dir)
+
+
+@unittest.skipUnless(shutil.which("git"), "git binary not available")
+class TestIndexWrittenByGit(unittest.TestCase):
+    """Cross-checks the parser against index files written by git itself."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        subprocess.run(["git", "init", "-q", self.temp_dir], check=True)
+        for rel in ("a.py", "src/b.py", "src/deep/dir/c.txt", "ümlaut.md"):
+            file_path = self.temp_path / rel
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            file_path.write_text(rel, encoding="utf-8")
+        subprocess.run(["git", "-C", self.temp_dir, "add", "."], check=True)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_all_versions_match_ls_files(self):
+        expected = subprocess.run(
+            ["git", "-C", self.temp_dir, "-c", "core.quotePath=false", "ls-files"],
+            check=True, capture_output=True, text=True,
+        ).stdout.splitlines()
+        for version in ("2", "3", "4"):
+            subprocess.run(["git", "-C", self.temp_dir, "update-index", "--index-version", version], check=True)
+            with self.subTest(version=version):
+                entries = read_index(str(self.temp_path / ".git" / "index"))
+                self.assertEqual([e.path for e in entries], expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
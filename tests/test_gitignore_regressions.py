@@ -2,7 +2,7 @@ import os
 import sys
 import tempfile
 from pathlib import Path
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch
 
 import pytest
 
@@ -62,6 +62,7 @@ def test_cli_with_dot_should_respect_gitignore_in_cwd():
     Aktuell: target/* wird aufgenommen (Bug). Dieser Test soll derzeit FAILen.
     """
     from clipcode.cli import main as cli_main
+    from tests.clipboard import clipboard_text
 
     temp = _make_temp_dir()
     try:
@@ -76,13 +77,13 @@ def test_cli_with_dot_should_respect_gitignore_in_cwd():
         cwd_before = Path.cwd()
         os.chdir(temp)
         try:
-            with patch("subprocess.run") as mock_run:
-                mock_run.return_value = MagicMock()
+            with patch("subprocess.Popen") as mock_popen:
+                mock_popen.return_value.wait.return_value = 0
                 with patch.object(sys, "argv", ["clipcode", "."]):
                     cli_main()
 
                 # Clipboard-Inhalt prüfen
-                clipboard_content = mock_run.call_args[1]["input"].decode("utf-8")
+                clipboard_content = clipboard_text(mock_popen)
                 assert "target/" not in clipboard_content
                 assert "foo.rlib" not in clipboard_content
         finally:
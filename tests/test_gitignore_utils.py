@@ -2,8 +2,11 @@ import unittest
 import tempfile
 import os
 from pathlib import Path
+from unittest.mock import patch
 from clipcode.gitignore_utils import (
     GitignoreParser,
+    GitignoreRegistry,
+    GitignoreScopes,
     find_gitignore_files,
     should_ignore_file,
     filter_files_by_gitignore
@@ -136,6 +139,66 @@ class TestGitignoreParser(unittest.TestCase):
         self.assertTrue(parser.is_ignored(pyo_file))
         self.assertFalse(parser.is_ignored(py_file))
 
+    def test_last_match_wins(self):
+        """Later rules override earlier ones, in both directions."""
+        self.create_gitignore("*.log\n!keep.log\nkeep.log")
+        parser = GitignoreParser(str(self.temp_path / '.gitignore'))
+
+        self.assertTrue(parser.is_ignored(self.create_file("keep.log")))
+        self.assertTrue(parser.is_ignored(self.create_file("other.log")))
+
+    def test_double_star_patterns(self):
+        """Test '**' as leading, inner and trailing path component."""
+        self.create_gitignore("**/generated\ndocs/**/*.html\nvendor/**")
+        parser = GitignoreParser(str(self.temp_path / '.gitignore'))
+
+        self.assertTrue(parser.is_ignored(self.create_file("a/b/generated")))
+        self.assertTrue(parser.is_ignored(self.create_file("docs/index.html")))
+        self.assertTrue(parser.is_ignored(self.create_file("docs/api/v1/ref.html")))
+        self.assertTrue(parser.is_ignored(self.create_file("vendor/lib/x.py")))
+        self.assertFalse(parser.is_ignored(self.create_file("src/docs/index.html")))
+
+    def test_anchored_pattern_does_not_match_nested_path(self):
+        """Patterns containing a slash are relative to the .gitignore directory."""
+        self.create_gitignore("src/*.tmp")
+        parser = GitignoreParser(str(self.temp_path / '.gitignore'))
+
+        self.assertTrue(parser.is_ignored(self.create_file("src/a.tmp")))
+        self.assertFalse(parser.is_ignored(self.create_file("lib/src/a.tmp")))
+        self.assertFalse(parser.is_ignored(self.create_file("src/sub/a.tmp")))
+
+    def test_negation_cannot_reinclude_inside_excluded_directory(self):
+        """Like git, files below an excluded directory stay excluded."""
+        self.create_gitignore("build/\n!build/keep.txt")
+        parser = GitignoreParser(str(self.temp_path / '.gitignore'))
+
+        self.assertTrue(parser.is_ignored(self.create_file("build/keep.txt")))
+
+    def test_negation_reincludes_below_excluded_contents(self):
+        """Excluding only the contents of a directory allows re-inclusion."""
+        self.create_gitignore("build/*\n!build/keep.txt")
+        parser = GitignoreParser(str(self.temp_path / '.gitignore'))
+
+        self.assertFalse(parser.is_ignored(self.create_file("build/keep.txt")))
+        self.assertTrue(parser.is_ignored(self.create_file("build/other.txt")))
+
+    def test_directory_pattern_does_not_match_file(self):
+        """A trailing slash restricts the pattern to directories."""
+        self.create_gitignore("cache/")
+        parser = GitignoreParser(str(self.temp_path / '.gitignore'))
+
+        self.assertFalse(parser.is_ignored(self.create_file("cache")))
+        self.assertTrue(parser.is_ignored(str(self.temp_path / "cache"), is_dir=True))
+
+    def test_match_reports_undecided_paths(self):
+        """match() distinguishes ignored, re-included and unmatched paths."""
+        self.create_gitignore("*.log\n!keep.log")
+        parser = GitignoreParser(str(self.temp_path / '.gitignore'))
+
+        self.assertIs(parser.match("debug.log", False), True)
+        self.assertIs(parser.match("keep.log", False), False)
+        self.assertIsNone(parser.match("main.py", False))
+
 
 class TestGitignoreUtilityFunctions(unittest.TestCase):
     
@@ -316,5 +379,157 @@ config/local.py
         self.assertNotIn("local.py", filtered_names)
 
 
+class TestGitignoreRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, relative_path: str, content: str = ""):
+        """Helper method to create a file."""
+        file_path = self.temp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding='utf-8')
+        return str(file_path)
+
+    def test_registry_returns_cached_parser(self):
+        """The same unchanged .gitignore is parsed only once."""
+        gitignore = self.create_file(".gitignore", "*.log\n")
+        registry = GitignoreRegistry()
+
+        self.assertIs(registry.get(gitignore), registry.get(gitignore))
+        self.assertEqual(len(registry), 1)
+
+    def test_registry_reparses_changed_file(self):
+        """A change in size or mtime invalidates the cached parser."""
+        gitignore = self.create_file(".gitignore", "*.log\n")
+        registry = GitignoreRegistry()
+        first = registry.get(gitignore)
+
+        Path(gitignore).write_text("*.log\n*.tmp\n", encoding='utf-8')
+        second = registry.get(gitignore)
+
+        self.assertIsNot(first, second)
+        self.assertTrue(second.is_ignored(self.create_file("a.tmp")))
+
+    def test_filter_reads_each_gitignore_once(self):
+        """Filtering many files costs one parse per .gitignore, not one per file."""
+        self.create_file(".gitignore", "*.log\n")
+        files = [self.create_file(f"src/file{i}.py") for i in range(20)]
+
+        with patch.object(GitignoreParser, '_parse_gitignore', autospec=True,
+                          side_effect=GitignoreParser._parse_gitignore) as mock_parse:
+            filter_files_by_gitignore(files, str(self.temp_path))
+
+        parsed = [call.args[0].gitignore_path for call in mock_parse.call_args_list]
+        self.assertEqual(len(parsed), len(set(parsed)))
+
+    def test_filter_accepts_shared_registry(self):
+        """A registry passed in by the caller is reused across calls."""
+        self.create_file(".gitignore", "*.log\n")
+        files = [self.create_file("keep.py"), self.create_file("drop.log")]
+        registry = GitignoreRegistry()
+
+        first = filter_files_by_gitignore(files, str(self.temp_path), registry)
+        cached = len(registry)
+        second = filter_files_by_gitignore(files, str(self.temp_path), registry)
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(registry), cached)
+        self.assertEqual([Path(f).name for f in first], ["keep.py"])
+
+
+class TestGitignoreScopes(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, relative_path: str, content: str = ""):
+        """Helper method to create a file."""
+        file_path = self.temp_path / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding='utf-8')
+        return str(file_path)
+
+    def test_nested_gitignore_applies_to_subtree_only(self):
+        """Rules of a nested .gitignore are relative to its directory."""
+        self.create_file("sub/.gitignore", "*.tmp\n/local.txt\n")
+        scopes = GitignoreScopes(self.temp_dir)
+        root = scopes.enter(self.temp_dir, "", None)
+        sub = scopes.enter(str(self.temp_path / "sub"), "sub", root)
+
+        self.assertTrue(scopes.is_ignored("sub/a.tmp", False, sub))
+        self.assertTrue(scopes.is_ignored("sub/local.txt", False, sub))
+        self.assertFalse(scopes.is_ignored("a.tmp", False, root))
+        self.assertFalse(scopes.is_ignored("sub/deeper/local.txt", False, sub))
+
+    def test_deeper_gitignore_takes_precedence(self):
+        """A nested negation re-includes what an outer .gitignore excluded."""
+        self.create_file(".gitignore", "*.log\n")
+        self.create_file("logs/.gitignore", "!keep.log\n")
+        scopes = GitignoreScopes(self.temp_dir)
+        root = scopes.enter(self.temp_dir, "", None)
+        logs = scopes.enter(str(self.temp_path / "logs"), "logs", root)
+
+        self.assertFalse(scopes.is_ignored("logs/keep.log", False, logs))
+        self.assertTrue(scopes.is_ignored("logs/other.log", False, logs))
+        self.assertTrue(scopes.is_ignored("keep.log", False, root))
+
+    def test_directory_without_gitignore_reuses_parent_scope(self):
+        """Entering a directory without .gitignore allocates no new scope."""
+        self.create_file(".gitignore", "*.log\n")
+        (self.temp_path / "plain").mkdir()
+        scopes = GitignoreScopes(self.temp_dir)
+        root = scopes.enter(self.temp_dir, "", None)
+
+        self.assertIs(scopes.enter(str(self.temp_path / "plain"), "plain", root), root)
+
+    def test_ancestor_gitignore_applies_to_root(self):
+        """.gitignore files above the walk root are matched with the root's prefix."""
+        self.create_file(".gitignore", "/project/generated/\n")
+        project = self.temp_path / "project"
+        (project / "generated").mkdir(parents=True)
+        scopes = GitignoreScopes(str(project))
+        root = scopes.enter(str(project), "", None)
+
+        self.assertTrue(scopes.is_ignored("generated", True, root))
+        self.assertFalse(scopes.is_root_ignored())
+        self.assertTrue(GitignoreScopes(str(project / "generated")).is_root_ignored())
+
+    def test_nested_parsers_are_not_kept_after_leaving(self):
+        """Nested .gitignore parsers live only as long as their scope."""
+        import gc
+        import weakref
+
+        self.create_file(".gitignore", "*.log\n")
+        rel = ""
+        for depth in range(20):
+            rel = f"{rel}/d{depth}" if rel else f"d{depth}"
+            self.create_file(f"{rel}/.gitignore", "*.tmp\n")
+        registry = GitignoreRegistry()
+        scopes = GitignoreScopes(self.temp_dir, registry)
+        scope = scopes.enter(self.temp_dir, "", None)
+        rel = ""
+        for depth in range(20):
+            rel = f"{rel}/d{depth}" if rel else f"d{depth}"
+            scope = scopes.enter(str(self.temp_path / rel), rel, scope)
+        self.assertTrue(scopes.is_ignored(f"{rel}/x.tmp", False, scope))
+        deepest = weakref.ref(scope.parser)
+
+        del scope
+        gc.collect()
+        self.assertIsNone(deepest())
+        self.assertEqual(len(registry), 1)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,239 @@
+import builtins
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode import loader
+from clipcode.loader import LoadedFile, load_file, load_files
+
+
+class TestLoadFile(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, name: str, data: bytes) -> str:
+        file_path = self.temp_path / name
+        file_path.write_bytes(data)
+        return str(file_path)
+
+    def lines(self, count: int, trailing_newline: bool = True) -> bytes:
+        text = "\n".join(f"line {i}" for i in range(1, count + 1))
+        return (text + ("\n" if trailing_newline else "")).encode("utf-8")
+
+    def test_small_file_is_returned_unchanged(self):
+        path = self.create_file("a.py", b"print('x')\n")
+
+        loaded = load_file(path, 10, 5)
+
+        self.assertEqual(loaded.content, "print('x')\n")
+        self.assertEqual((loaded.line_count, loaded.kept_lines, loaded.truncated), (1, 1, False))
+
+    def test_empty_file(self):
+        loaded = load_file(self.create_file("empty.txt", b""), 10, 5)
+
+        self.assertEqual((loaded.content, loaded.line_count), ("", 0))
+
+    def test_threshold_is_exclusive(self):
+        """Exactly truncate_from lines are kept, with or without trailing newline."""
+        for trailing in (True, False):
+            with self.subTest(trailing_newline=trailing):
+                loaded = load_file(self.create_file("exact.txt", self.lines(10, trailing)), 10, 5)
+                self.assertFalse(loaded.truncated)
+                self.assertEqual(loaded.line_count, 10)
+
+    def test_unterminated_last_line_counts(self):
+        """A last line without newline pushes the file over the limit."""
+        loaded = load_file(self.create_file("over.txt", self.lines(11, False)), 10, 5)
+
+        self.assertTrue(loaded.truncated)
+        self.assertEqual(loaded.line_count, 11)
+        self.assertEqual(loaded.content, "\n".join(f"line {i}" for i in range(1, 6)))
+
+    def test_large_file_is_truncated_with_exact_line_count(self):
+        """Files spanning many read chunks are counted without being kept."""
+        path = self.create_file("big.sql", self.lines(200_000))
+
+        loaded = load_file(path, 3000, 500)
+
+        self.assertEqual(loaded.line_count, 200_000)
+        self.assertEqual(loaded.kept_lines, 500)
+        self.assertTrue(loaded.content.startswith("line 1\n"))
+        self.assertTrue(loaded.content.endswith("\nline 500"))
+
+    def test_crlf_line_endings(self):
+        path = self.create_file("win.txt", b"a\r\nb\r\nc\r\nd\r\n")
+
+        loaded = load_file(path, 3, 2)
+
+        self.assertEqual((loaded.line_count, loaded.content), (4, "a\nb"))
+
+    def test_cr_only_line_endings(self):
+        path = self.create_file("mac.txt", b"a\rb\rc\rd\r")
+
+        loaded = load_file(path, 3, 2, truncate_tail=1)
+
+        self.assertEqual((loaded.line_count, loaded.content, loaded.tail), (4, "a\nb", "d"))
+
+    def test_crlf_split_across_chunks_counts_once(self):
+        """A CR at the end of one read chunk and its LF at the start of the next form one break."""
+        head = b"x" * (loader._CHUNK_SIZE - 1) + b"\r\n"
+        rest = b"line\r\n" * 10 + b"last\r"
+        path = self.create_file("chunks.txt", head + rest)
+
+        small = load_file(path, 20, 20)
+        big = load_file(path, 5, 2, truncate_tail=1)
+
+        self.assertEqual(small.line_count, 12)
+        self.assertNotIn("\r", small.content)
+        self.assertEqual((big.line_count, big.tail), (12, "last"))
+
+    def test_drop_mode_stops_reading_early(self):
+        """With truncate_to == 0 the rest of a large file is never read."""
+        path = self.create_file("huge.log", self.lines(500_000))
+        size = Path(path).stat().st_size
+        real_open = builtins.open
+        consumed = []
+
+        class _CountingFile:
+            def __init__(self, f):
+                self._f = f
+
+            def read(self, n=-1):
+                data = self._f.read(n)
+                consumed.append(len(data))
+                return data
+
+            def readinto(self, buffer):
+                n = self._f.readinto(buffer)
+                consumed.append(n)
+                return n
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._f.close()
+
+        with patch("builtins.open", lambda *a, **k: _CountingFile(real_open(*a, **k))):
+            loaded = load_file(path, 100, 0)
+
+        self.assertIsNone(loaded)
+        self.assertLess(sum(consumed), size // 10)
+
+    def test_bom_encoded_file_is_truncated_by_decoded_lines(self):
+        data = "\n".join(f"zeile {i}" for i in range(1, 21)).encode("utf-16")
+
+        loaded = load_file(self.create_file("utf16.txt", data), 10, 3)
+
+        self.assertEqual(loaded.line_count, 20)
+        self.assertEqual(loaded.content, "zeile 1\nzeile 2\nzeile 3")
+
+    def test_head_and_tail_windows(self):
+        """The tail window is taken from the end; omitted lines are reported exactly."""
+        for trailing in (True, False):
+            with self.subTest(trailing_newline=trailing):
+                path = self.create_file("log.txt", self.lines(200_000, trailing))
+
+                loaded = load_file(path, 3000, 300, truncate_tail=200)
+
+                self.assertEqual(loaded.line_count, 200_000)
+                self.assertEqual((loaded.head_lines, loaded.tail_lines, loaded.kept_lines), (300, 200, 500))
+                self.assertTrue(loaded.content.endswith("\nline 300"))
+                self.assertEqual(loaded.tail, "\n".join(f"line {i}" for i in range(199_801, 200_001)))
+                self.assertEqual(loaded.omitted, (301, 199_800))
+
+    def test_tail_only_and_crlf(self):
+        path = self.create_file("win.txt", b"a\r\nb\r\nc\r\nd\r\n")
+
+        loaded = load_file(path, 3, 0, truncate_tail=2)
+
+        self.assertEqual((loaded.content, loaded.tail, loaded.omitted), ("", "c\nd", (1, 2)))
+
+    def test_bom_encoded_file_with_tail(self):
+        data = "\n".join(f"zeile {i}" for i in range(1, 21)).encode("utf-16")
+
+        loaded = load_file(self.create_file("utf16.txt", data), 10, 2, truncate_tail=2)
+
+        self.assertEqual((loaded.tail, loaded.omitted), ("zeile 19\nzeile 20", (3, 18)))
+
+    def test_binary_and_unreadable_files(self):
+        self.assertIsNone(load_file(self.create_file("x.bin", b"\x00" * 10)))
+        self.assertIsNone(load_file(str(self.temp_path / "missing.txt")))
+
+
+class TestLoadFiles(unittest.TestCase):
+
+    def test_parallel_results_keep_input_order(self):
+        """Later files finishing first are held back until their turn."""
+        paths = [f"f{i}" for i in range(30)]
+
+        def fake_load(path, *args, **kwargs):
+            time.sleep((30 - int(path[1:])) * 0.001)
+            return LoadedFile(path, 1, 1)
+
+        with patch("clipcode.loader.load_file", side_effect=fake_load):
+            result = [(path, loaded.content) for path, loaded in load_files(paths, jobs=8)]
+
+        self.assertEqual(result, [(p, p) for p in paths])
+
+    def test_errors_are_raised_in_order(self):
+        def fake_load(path, *args, **kwargs):
+            if path == "bad":
+                raise RuntimeError("boom")
+            return LoadedFile(path, 1, 1)
+
+        with patch("clipcode.loader.load_file", side_effect=fake_load):
+            results = load_files(["a", "bad", "c"], jobs=2)
+            self.assertEqual(next(results)[0], "a")
+            with self.assertRaises(RuntimeError):
+                next(results)
+
+    def _run_with_blocked_head(self, max_in_flight: int) -> int:
+        """Blocks f0 until f1..f7 finished, then returns the load count after two items."""
+        release = threading.Event()
+        calls = []
+
+        def fake_load(path, *args, **kwargs):
+            calls.append(path)
+            if path == "f0":
+                release.wait(5)
+            return LoadedFile("x" * 10, 1, 1)
+
+        paths = [f"f{i}" for i in range(20)]
+        with patch("clipcode.loader.load_file", side_effect=fake_load):
+            results = load_files(paths, jobs=2, max_in_flight=max_in_flight)
+            first = []
+            consumer = threading.Thread(target=lambda: first.append(next(results)))
+            consumer.start()
+            deadline = time.monotonic() + 5
+            while len(calls) < 8 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            time.sleep(0.02)
+            release.set()
+            consumer.join()
+            next(results)
+            # Submitted loads start asynchronously in the pool
+            deadline = time.monotonic() + 0.2
+            while len(calls) < 9 and time.monotonic() < deadline:
+                time.sleep(0.001)
+            count = len(calls)
+            results.close()
+        return count
+
+    def test_in_flight_bytes_cap_stops_new_loads(self):
+        """A full reassembly buffer blocks new loads; the window alone allows them."""
+        self.assertEqual(self._run_with_blocked_head(max_in_flight=1), 8)
+        self.assertEqual(self._run_with_blocked_head(max_in_flight=1 << 20), 9)
+
+
+if __name__ == "__main__":
+    unittest.main()
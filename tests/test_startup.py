@@ -0,0 +1,68 @@
+import os
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# Cumulative import time of clipcode for `clipcode --help` in microseconds.
+# Measured ~20 ms; importing the exporter at startup took ~120 ms.
+IMPORT_BUDGET_US = 60_000
+
+# Modules only an actual export needs
+HEAVY_MODULES = (
+    "clipcode.exporter",
+    "clipcode.watch",
+    "clipcode.loader",
+    "clipcode.cache",
+    "clipcode.changes",
+    "clipcode.file_utils",
+    "clipcode.gitignore_utils",
+    "concurrent.futures",
+    "sqlite3",
+    "subprocess",
+)
+
+
+def import_times(*args: str) -> list[tuple[str, int, int]]:
+    """Runs `python -X importtime -m clipcode args` and returns (module, depth, cumulative µs)."""
+    env = dict(os.environ, PYTHONPATH=str(SRC_DIR), CLIPCODE_SOCKET=str(SRC_DIR / "no-daemon.sock"))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "clipcode", *args],
+        capture_output=True,
+        text=True,
+        env=env,
+    )
+    assert result.returncode == 0, result.stderr
+    entries = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip(" ")) - 1) // 2
+        entries.append((module, depth, int(cumulative)))
+    return entries
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_help_does_not_import_exporter(self):
+        modules = {module for module, _, _ in import_times("--help")}
+
+        self.assertIn("clipcode.cli", modules)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, modules)
+
+    def test_help_import_time_budget(self):
+        entries = import_times("--help")
+        start = next(i for i, (module, _, _) in enumerate(entries) if module == "clipcode")
+        # Everything imported at top level from the clipcode package onwards
+        total = sum(cumulative for _, depth, cumulative in entries[start:] if depth == 0)
+
+        self.assertLess(total, IMPORT_BUDGET_US, f"clipcode --help imports took {total} µs")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from clipcode import loader
+from clipcode.watch import watch_files
+from clipcode.inotify import IN_CREATE, Inotify
+
+
+def _wait_for(condition, timeout: float = 5.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+class TestInotify(unittest.TestCase):
+
+    def test_reports_created_entries_by_name(self):
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        with Inotify() as inotify:
+            wd = inotify.add_watch(temp_dir, IN_CREATE)
+            Path(temp_dir, "new.py").write_text("x")
+
+            events = inotify.read(1.0)
+
+        self.assertIn((wd, IN_CREATE, "new.py"), events)
+
+    def test_read_times_out_without_events(self):
+        with Inotify() as inotify:
+            self.assertEqual(inotify.read(0.01), [])
+
+
+@unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux-only")
+class TestWatchFiles(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.temp_path = Path(self.temp_dir)
+        self.project = self.temp_path / "project"
+        self.output = self.temp_path / "out.md"
+        self.create_file("a.py", "a = 1\n")
+        self.create_file("pkg/b.py", "b = 1\n")
+        self.create_file("notes.txt", "text\n")
+
+        self.stop = threading.Event()
+        self.load_patch = patch.object(loader, "load_file", wraps=loader.load_file)
+        self.mock_load = self.load_patch.start()
+        self.print_patch = patch('builtins.print')
+        self.print_patch.start()
+        self.thread = threading.Thread(
+            target=watch_files,
+            args=(str(self.project), ["py"]),
+            kwargs={"output": str(self.output), "debounce": 0.05, "stop": self.stop},
+        )
+        self.thread.start()
+        self.assertTrue(self.wait_for_output(lambda text: "b = 1" in text))
+
+    def tearDown(self):
+        self.stop.set()
+        self.thread.join()
+        self.print_patch.stop()
+        self.load_patch.stop()
+        shutil.rmtree(self.temp_dir)
+
+    def create_file(self, relative_path: str, content: str):
+        file_path = self.project / relative_path
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        file_path.write_text(content, encoding="utf-8")
+
+    def wait_for_output(self, condition) -> bool:
+        def check():
+            try:
+                return condition(self.output.read_text(encoding="utf-8"))
+            except OSError:
+                return False
+        return _wait_for(check)
+
+    def loaded_names(self) -> list[str]:
+        return [os.path.basename(call.args[0]) for call in self.mock_load.call_args_list]
+
+    def test_modified_file_is_the_only_one_reloaded(self):
+        self.mock_load.reset_mock()
+
+        self.create_file("a.py", "a = 2\n")
+
+        self.assertTrue(self.wait_for_output(lambda text: "a = 2" in text and "b = 1" in text))
+        self.assertEqual(set(self.loaded_names()), {"a.py"})
+
+    def test_new_directory_and_file_are_picked_up(self):
+        self.create_file("pkg/sub/c.py", "c = 1\n")
+
+        self.assertTrue(self.wait_for_output(lambda text: "c = 1" in text))
+
+    def test_deleted_file_disappears(self):
+        os.remove(self.project / "pkg" / "b.py")
+
+        self.assertTrue(self.wait_for_output(lambda text: "b = 1" not in text and "a = 1" in text))
+
+    def test_gitignore_change_reevaluates_subtree(self):
+        self.create_file(".gitignore", "pkg/\n")
+
+        self.assertTrue(self.wait_for_output(lambda text: "b = 1" not in text and "a = 1" in text))
+
+        self.create_file(".gitignore", "a.py\n")
+
+        self.assertTrue(self.wait_for_output(lambda text: "b = 1" in text and "a = 1" not in text))
+
+
+if __name__ == '__main__':
+    unittest.main()